@@ -0,0 +1,91 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import Worker
+from users.checks import uses_process_local_cache
+
+
+def _work(poll_interval):
+    Worker(poll_interval).run()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs (jobs.Job) in --workers processes until stopped "
+        "with SIGTERM/SIGINT; each worker finishes its current job first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.JOB_WORKERS,
+            help="Worker processes (default JOB_WORKERS).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Seconds an idle worker waits before looking for jobs again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due in this process, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        if uses_process_local_cache():
+            # Jobs change partners and users the web processes have cached.
+            self.stderr.write(
+                "The cache is per-process (LocMemCache): changes made by jobs "
+                "won't invalidate what the web workers have cached. Configure "
+                "a shared CACHE_BACKEND when running run_workers next to them."
+            )
+        if options["once"]:
+            count = Worker(options["poll_interval"]).run(once=True)
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs."))
+            return
+        if options["workers"] <= 1:
+            Worker(options["poll_interval"]).run()
+            return
+        self.supervise(options["workers"], options["poll_interval"])
+
+    def supervise(self, count, poll_interval):
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        stopping = False
+
+        def stop(*args):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        def start():
+            process = context.Process(target=_work, args=(poll_interval,))
+            process.start()
+            return process
+
+        processes = [start() for _ in range(count)]
+        self.stdout.write(f"Started {count} workers.")
+        while not stopping:
+            time.sleep(1)
+            for index, process in enumerate(processes):
+                if not process.is_alive() and not stopping:
+                    self.stderr.write(
+                        f"Worker {process.pid} exited ({process.exitcode}); restarting."
+                    )
+                    processes[index] = start()
+        for process in processes:
+            process.terminate()  # SIGTERM: finish the current job
+        for process in processes:
+            process.join()
+        self.stdout.write("Workers stopped.")
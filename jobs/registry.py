@@ -0,0 +1,44 @@
+"""
+Registering and enqueuing background jobs.
+
+    # <app>/tasks.py, imported by JobsConfig.ready()
+    @task("partners.import", max_attempts=1)
+    def import_partners(job):
+        ...
+        return {"created": 10}  # stored as job.result (JSON)
+
+    job = enqueue("partners.import", {"file": name}, user=request.user)
+
+An exception raised by the function fails the attempt; the job is retried
+with exponential backoff until it has run `max_attempts` times. Functions
+that aren't safe to run twice should register max_attempts=1.
+"""
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+TASKS = {}
+
+
+def task(name, max_attempts=None):
+    def register(func):
+        func.job_name = name
+        func.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        TASKS[name] = func
+        return func
+
+    return register
+
+
+def enqueue(name, payload=None, user=None, run_at=None):
+    if name not in TASKS:
+        raise ValueError(f"No task registered as {name!r}.")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=TASKS[name].max_attempts,
+        run_at=run_at or timezone.now(),
+    )
@@ -0,0 +1,132 @@
+import signal
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+
+from .models import Job
+from .registry import enqueue, task
+from .worker import Worker, claim, requeue_stale, run
+
+
+@task("tests.succeed_on", max_attempts=3)
+def succeed_on(job):
+    if job.attempts < job.payload["attempt"]:
+        raise RuntimeError(f"attempt {job.attempts} failed")
+    return {"attempt": job.attempts}
+
+
+@override_settings(JOB_RETRY_BACKOFF=60)
+class WorkerTests(TestCase):
+    def run_claimed(self, fails=False):
+        job = claim("tests")
+        if fails:
+            # Failed attempts are logged with their traceback.
+            with self.assertLogs("jobs.worker", "ERROR"):
+                self.assertFalse(run(job))
+        else:
+            self.assertTrue(run(job))
+        job.refresh_from_db()
+        return job
+
+    def make_due(self, job):
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+
+    def test_claims_each_due_job_once(self):
+        later = enqueue(
+            "tests.succeed_on",
+            {"attempt": 1},
+            run_at=timezone.now() + timedelta(hours=1),
+        )
+        due = enqueue("tests.succeed_on", {"attempt": 1})
+        job = claim("first")
+        self.assertEqual(job.pk, due.pk)
+        self.assertEqual(
+            (job.status, job.attempts, job.locked_by), ("running", 1, "first")
+        )
+        self.assertIsNone(claim("second"))
+        self.make_due(later)
+        self.assertEqual(claim("second").pk, later.pk)
+
+    def test_retries_with_backoff_until_it_succeeds(self):
+        job = enqueue("tests.succeed_on", {"attempt": 2})
+        job = self.run_claimed(fails=True)
+        self.assertEqual((job.status, job.attempts), ("queued", 1))
+        self.assertEqual(job.error, "RuntimeError: attempt 1 failed")
+        self.assertGreaterEqual(job.run_at, timezone.now() + timedelta(seconds=55))
+        self.assertIsNone(claim("tests"))
+
+        self.make_due(job)
+        job = self.run_claimed()
+        self.assertEqual(
+            (job.status, job.result, job.error), ("succeeded", {"attempt": 2}, "")
+        )
+        self.assertEqual(job.locked_by, "")
+
+    def test_fails_after_its_last_attempt(self):
+        job = enqueue("tests.succeed_on", {"attempt": 4})
+        for _ in range(3):
+            self.make_due(job)
+            job = self.run_claimed(fails=True)
+        self.assertEqual((job.status, job.attempts), ("failed", 3))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unknown_task_fails(self):
+        job = Job.objects.create(name="tests.missing", max_attempts=1)
+        job = self.run_claimed(fails=True)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("tests.missing", job.error)
+
+    @override_settings(JOB_TIMEOUT=300)
+    def test_requeues_jobs_that_stopped_beating(self):
+        job = enqueue("tests.succeed_on", {"attempt": 1})
+        claim("gone")
+        self.assertEqual(requeue_stale(), 0)
+        stale = timezone.now() - timedelta(seconds=301)
+        Job.objects.filter(pk=job.pk).update(locked_at=stale)
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ("queued", ""))
+
+        claim("gone")
+        Job.objects.filter(pk=job.pk).update(locked_at=stale, attempts=3)
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+
+    def test_late_finish_of_a_requeued_job_is_ignored(self):
+        job = enqueue("tests.succeed_on", {"attempt": 1})
+        claimed = claim("slow")
+        Job.objects.filter(pk=job.pk).update(locked_by="other")
+        self.assertTrue(run(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ("running", "other"))
+
+
+# Not in a transaction: the loop closes old connections between jobs.
+class WorkerLoopTests(TransactionTestCase):
+    def test_worker_runs_due_jobs(self):
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+        for _ in range(2):
+            enqueue("tests.succeed_on", {"attempt": 1})
+        self.assertEqual(Worker().run(once=True), 2)
+        self.assertEqual(Job.objects.filter(status="succeeded").count(), 2)
+
+
+class JobViewTests(TestCase):
+    def test_only_the_creator_and_sys_admins_see_a_job(self):
+        owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        other = User.objects.create_user("other", "other@example.com", "pw")
+        admin = User.objects.create_user(
+            "admin", "admin@example.com", "pw", is_sys_admin=True
+        )
+        job = enqueue("tests.succeed_on", {"attempt": 1}, user=owner)
+        for user, status in ((owner, 200), (admin, 200), (other, 404)):
+            client = APIClient()
+            client.force_authenticate(user)
+            with self.subTest(user=user.username):
+                self.assertEqual(client.get(f"/api/jobs/{job.pk}/").status_code, status)
@@ -0,0 +1,40 @@
+from django.urls import reverse
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+
+from strategybackend.prefetch import PrefetchPlannerMixin
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(PrefetchPlannerMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Background job status:
+    - GET → jobs you started (every job for sys admins)
+    - GET /id → status, attempts and, once finished, the result or error
+
+    Endpoints that run work in the background answer 202 with the job and
+    its URL in the Location header.
+    """
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation (manage.py generate_schema) has no request.
+            return queryset.none()
+        if getattr(self.request.user, "is_sys_admin", False):
+            return queryset
+        return queryset.filter(created_by=self.request.user)
+
+
+def accepted(job):
+    """The 202 response of an endpoint that queued `job`."""
+    return Response(
+        JobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": reverse("jobs-detail", args=[job.pk])},
+    )
@@ -0,0 +1,211 @@
+"""
+Claiming and running jobs (manage.py run_workers).
+
+Workers poll the job table; no broker is involved. On PostgreSQL a job is
+claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers
+take different jobs without waiting on each other. SQLite has no row
+locks: there a worker claims a job with a conditional UPDATE (status still
+"queued") and moves on to the next candidate if another worker won it.
+
+While a job runs, a heartbeat thread refreshes its locked_at every
+JOB_HEARTBEAT_INTERVAL seconds, however long the job takes. A job whose
+worker died stops getting heartbeats; once it has had none for JOB_TIMEOUT
+seconds any worker puts it back in the queue (or fails it if it has no
+attempts left).
+"""
+
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import TASKS
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    """Seconds before attempt `attempts` + 1: doubling, capped, jittered."""
+    delay = min(
+        settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.JOB_RETRY_BACKOFF_MAX,
+    )
+    # Spread retries of jobs that failed together.
+    return delay + random.uniform(0, delay / 10)
+
+
+def _due(now):
+    return Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now).order_by(
+        "run_at"
+    )
+
+
+def _claimed(now, worker_id):
+    return {
+        "status": Job.Status.RUNNING,
+        "attempts": F("attempts") + 1,
+        "locked_by": worker_id,
+        "locked_at": now,
+        "started_at": now,
+    }
+
+
+def claim(worker_id):
+    """The next due job, marked running for `worker_id`; None if there is none."""
+    now = timezone.now()
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pk = (
+                _due(now)
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if pk is None:
+                return None
+            Job.objects.filter(pk=pk).update(**_claimed(now, worker_id))
+    else:
+        for pk in _due(now).values_list("pk", flat=True)[:10]:
+            if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+                **_claimed(now, worker_id)
+            ):
+                break
+        else:
+            return None
+    return Job.objects.select_related("created_by").get(pk=pk)
+
+
+def _finish(job, **values):
+    # Unless the job was meanwhile given up on as stale and claimed again.
+    return Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by
+    ).update(locked_by="", locked_at=None, **values)
+
+
+class Heartbeat(threading.Thread):
+    """While in use, keeps refreshing the claimed `job`'s locked_at."""
+
+    def __init__(self, job, interval=None):
+        super().__init__(name=f"job-heartbeat-{job.pk}", daemon=True)
+        self.job = job
+        self.interval = interval or settings.JOB_HEARTBEAT_INTERVAL
+        self.stopped = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(
+                        pk=self.job.pk,
+                        status=Job.Status.RUNNING,
+                        locked_by=self.job.locked_by,
+                    ).update(locked_at=timezone.now())
+                except Exception:
+                    # Try again next beat; the job itself carries on.
+                    logger.exception("Heartbeat of job %s failed.", self.job.pk)
+        finally:
+            # This thread's own connection.
+            connection.close()
+
+
+def run(job):
+    """Run a claimed job; returns True if it succeeded."""
+    func = TASKS.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f"No task registered as {job.name!r}.")
+        with Heartbeat(job):
+            result = func(job)
+    except Exception as exc:
+        logger.exception(
+            "Job %s (%s) failed on attempt %s.", job.pk, job.name, job.attempts
+        )
+        error = f"{type(exc).__name__}: {exc}"
+        if job.attempts < job.max_attempts:
+            _finish(
+                job,
+                status=Job.Status.QUEUED,
+                error=error,
+                run_at=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+            )
+        else:
+            _finish(
+                job,
+                status=Job.Status.FAILED,
+                error=error,
+                finished_at=timezone.now(),
+            )
+        return False
+    _finish(
+        job,
+        status=Job.Status.SUCCEEDED,
+        result=result,
+        error="",
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def requeue_stale():
+    """Release jobs whose heartbeat stopped; returns how many."""
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOB_TIMEOUT),
+    )
+    released = {"locked_by": "", "locked_at": None}
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        error="The worker running this job stopped responding.",
+        finished_at=now,
+        **released,
+    )
+    return failed + stale.update(status=Job.Status.QUEUED, run_at=now, **released)
+
+
+class Worker:
+    def __init__(self, poll_interval=None):
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self.stopping = False
+
+    def stop(self, *args):
+        # The job in progress is finished first.
+        self.stopping = True
+
+    def run(self, once=False):
+        """Run jobs until stopped; with `once`, until none is due. Returns the count."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        count = 0
+        while not self.stopping:
+            close_old_connections()
+            job = claim(self.id)
+            if job is not None:
+                run(job)
+                count += 1
+                continue
+            if once:
+                break
+            requeue_stale()
+            time.sleep(self.poll_interval)
+        close_old_connections()
+        return count
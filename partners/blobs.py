@@ -0,0 +1,144 @@
+"""
+Content-addressed storage of partner document files.
+
+Every file is stored once, in default storage under blobs/<aa>/<sha256>, and
+recorded as a DocumentBlob; PartnerDocument rows reference the blob, so the
+same PDF attached to twenty partners is one file and uploading it again
+costs no storage write. Digests are computed while the request streams in
+(HashingMemoryFileUploadHandler / HashingTemporaryFileUploadHandler in
+FILE_UPLOAD_HANDLERS), or by partners.uploads for chunked uploads, so
+storing a file never reads it back.
+
+store_blob() locks the blob row and collect_garbage() skips locked rows, so
+a blob being referenced is never collected from under the new document.
+"""
+
+import hashlib
+import mimetypes
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import DocumentBlob, PartnerDocument
+
+BLOB_PREFIX = "blobs"
+
+
+class HashingUploadMixin:
+    """Sets `.sha256` on the uploaded file, hashed chunk by chunk as it arrives."""
+
+    def new_file(self, *args, **kwargs):
+        # Before super(): the memory handler claims the file by raising
+        # StopFutureHandlers from new_file().
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        data = super().receive_data_chunk(raw_data, start)
+        if data is None:
+            # This handler kept the chunk.
+            self.digest.update(raw_data)
+        return data
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.digest.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def blob_name(sha256):
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256}"
+
+
+def blob_url(blob):
+    return default_storage.url(blob_name(blob.sha256))
+
+
+def file_digest(file):
+    """SHA-256 of `file`: the one computed during the upload, else read once."""
+    sha256 = getattr(file, "sha256", None)
+    if sha256 is None:
+        digest = hashlib.sha256()
+        for chunk in file.chunks():
+            digest.update(chunk)
+        sha256 = digest.hexdigest()
+        file.seek(0)
+    return sha256
+
+
+def guess_content_type(file, file_name=""):
+    content_type = getattr(file, "content_type", None)
+    if not content_type or content_type == "application/octet-stream":
+        content_type = mimetypes.guess_type(file_name)[0] or content_type
+    return content_type or ""
+
+
+def get_blob(sha256):
+    """
+    The existing blob with this digest, locked, or None. Must be called in
+    a transaction that references the blob before committing.
+    """
+    return DocumentBlob.objects.select_for_update().filter(pk=sha256.lower()).first()
+
+
+def store_blob(file, sha256=None, content_type=None, file_name=""):
+    """
+    The DocumentBlob for `file`, writing it to storage only if that content
+    isn't stored yet. Like get_blob(), call it inside transaction.atomic()
+    and create the referencing document before the transaction commits.
+    """
+    sha256 = sha256 or file_digest(file)
+    if content_type is None:
+        content_type = guess_content_type(file, file_name or file.name or "")
+    blob, _ = DocumentBlob.objects.select_for_update().get_or_create(
+        sha256=sha256,
+        defaults={"size": file.size, "content_type": content_type},
+    )
+    name = blob_name(sha256)
+    # Also rewrites a blob whose row survived a failed collection.
+    if not default_storage.exists(name):
+        default_storage.save(name, file)
+    return blob
+
+
+def unreferenced_blobs():
+    return DocumentBlob.objects.filter(
+        ~Exists(PartnerDocument.objects.filter(blob=OuterRef("pk")))
+    )
+
+
+def collect_garbage(batch_size=500, dry_run=False):
+    """Delete blobs no document references, with their files; returns the count."""
+    if dry_run:
+        return unreferenced_blobs().count()
+    total = 0
+    while True:
+        with transaction.atomic():
+            # Rows store_blob() has locked are about to gain a reference.
+            digests = list(
+                unreferenced_blobs()
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not digests:
+                return total
+            DocumentBlob.objects.filter(pk__in=digests).delete()
+            # Still inside the lock: a concurrent store_blob() for the same
+            # digest waits, then finds no row and writes the file again.
+            for sha256 in digests:
+                default_storage.delete(blob_name(sha256))
+        total += len(digests)
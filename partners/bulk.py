@@ -0,0 +1,273 @@
+import codecs
+import csv
+import json
+import uuid
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from users.models import Department
+from users.scope import get_department_ids
+
+from .models import (
+    Partner,
+    PartnerDepartment,
+    PartnerProfile,
+    RiskLevelHistory,
+    StatusHistory,
+)
+from .serializers import PartnerProfileSerializer, PartnerSerializer
+from .signals import bump_partner_detail
+from .summary import refresh_summaries
+
+IMPORT_FORMATS = ("csv", "jsonl")
+PROFILE_FIELDS = set(PartnerProfileSerializer.Meta.fields) - {"id"}
+
+
+def guess_format(filename):
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    return None
+
+
+def iter_rows(upload, fmt):
+    """
+    Yield (row, error) pairs from an uploaded CSV or JSONL file, one line at
+    a time, so memory use doesn't depend on the file size.
+
+    CSV cells that are empty are dropped so model defaults apply; the
+    `departments` column holds department IDs separated by ";".
+    """
+    lines = codecs.iterdecode(upload, "utf-8-sig")
+    if fmt == "csv":
+        for row in csv.DictReader(lines):
+            yield {
+                key.strip(): value
+                for key, value in row.items()
+                if key and value not in (None, "")
+            }, None
+        return
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield None, {"non_field_errors": [f"Invalid JSON: {exc}"]}
+            continue
+        if not isinstance(row, dict):
+            yield None, {"non_field_errors": ["Each line must be a JSON object."]}
+            continue
+        yield row, None
+
+
+class PartnerImporter:
+    """
+    Validate rows with PartnerSerializer/PartnerProfileSerializer and write
+    them with bulk_create, one transaction per batch.
+
+    A failing row is reported and skipped. A batch that fails in the
+    database is retried one row per transaction, so only the rows the
+    database rejects are reported and the rest of the batch is created.
+    """
+
+    def __init__(self, user, batch_size=500, max_errors=1000):
+        self.user = user
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.batch = []
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        if getattr(user, "is_sys_admin", False):
+            department_ids = Department.objects.values_list("id", flat=True)
+        else:
+            department_ids = get_department_ids(user)
+        self.allowed_departments = {str(pk) for pk in department_ids}
+
+    def run(self, rows):
+        for number, (row, error) in enumerate(rows, start=1):
+            if error is not None:
+                self.fail(number, error)
+                continue
+            self.add(number, row)
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+        self.flush()
+        return self.report()
+
+    def fail(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": number, "errors": errors})
+
+    def clean_departments(self, value):
+        if value in (None, ""):
+            return [], None
+        if isinstance(value, str):
+            value = [part for part in value.split(";") if part.strip()]
+        if not isinstance(value, list):
+            return None, ["departments must be a list of IDs."]
+        cleaned = []
+        for raw in value:
+            try:
+                department_id = str(uuid.UUID(str(raw).strip()))
+            except ValueError:
+                return None, [f"'{raw}' is not a valid department ID."]
+            if department_id not in self.allowed_departments:
+                return None, [f"Department '{raw}' not found or not allowed."]
+            if department_id not in cleaned:
+                cleaned.append(department_id)
+        return cleaned, None
+
+    def add(self, number, row):
+        row = dict(row)
+        departments, department_errors = self.clean_departments(
+            row.pop("departments", None)
+        )
+        profile_data = row.pop("profile", None)
+        if profile_data is None:
+            profile_data = {k: row.pop(k) for k in list(row) if k in PROFILE_FIELDS}
+
+        errors = {}
+        partner_serializer = PartnerSerializer(data=row)
+        if not partner_serializer.is_valid():
+            errors.update(partner_serializer.errors)
+        profile_serializer = None
+        if profile_data:
+            profile_serializer = PartnerProfileSerializer(data=profile_data)
+            if not profile_serializer.is_valid():
+                errors["profile"] = profile_serializer.errors
+        if department_errors:
+            errors["departments"] = department_errors
+        if errors:
+            self.fail(number, errors)
+            return
+
+        partner = Partner(created_by=self.user, **partner_serializer.validated_data)
+        profile = None
+        if profile_serializer is not None:
+            profile = PartnerProfile(
+                partner=partner, **profile_serializer.validated_data
+            )
+        links = [
+            PartnerDepartment(partner=partner, department_id=department_id)
+            for department_id in departments
+        ]
+        self.batch.append((number, partner, profile, links))
+
+    def flush(self):
+        if not self.batch:
+            return
+        batch, self.batch = self.batch, []
+        try:
+            self.write(batch)
+        except DatabaseError as exc:
+            if len(batch) == 1:
+                self.fail(batch[0][0], {"non_field_errors": [str(exc)]})
+                return
+            # Find the rows the database rejects; the others still go in.
+            for row in batch:
+                try:
+                    self.write([row])
+                except DatabaseError as exc:
+                    self.fail(row[0], {"non_field_errors": [str(exc)]})
+                else:
+                    self.created += 1
+            return
+        self.created += len(batch)
+
+    def write(self, batch):
+        with transaction.atomic():
+            Partner.objects.bulk_create([partner for _, partner, _, _ in batch])
+            PartnerProfile.objects.bulk_create(
+                [profile for _, _, profile, _ in batch if profile is not None]
+            )
+            PartnerDepartment.objects.bulk_create(
+                [link for _, _, _, links in batch for link in links]
+            )
+            # bulk_create() sends no signals.
+            refresh_summaries(partner.pk for _, partner, _, _ in batch)
+
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+# ----------------------
+# Bulk status / risk level changes
+# ----------------------
+
+# Partner field -> (history model, old value column, new value column)
+TRANSITIONS = {
+    "status": (StatusHistory, "old_status", "new_status"),
+    "risk_level": (RiskLevelHistory, "old_risk", "new_risk"),
+}
+MAX_TRANSITION_IDS = 10000
+
+
+def parse_partner_ids(values):
+    """[(raw value, UUID or None)] without duplicates, in request order."""
+    parsed = {}
+    for value in values:
+        try:
+            parsed.setdefault(str(value), uuid.UUID(str(value)))
+        except ValueError:
+            parsed.setdefault(str(value), None)
+    return list(parsed.items())
+
+
+def bulk_transition(partners, values, field, new_value, user):
+    """
+    Set `field` to `new_value` on the partners with the IDs in `values`
+    that `partners` (the caller's permitted queryset) contains: one locking
+    SELECT, one UPDATE of the rows that actually change and one bulk_create
+    of their history. Returns an outcome per ID: "changed" (with the old
+    value), "unchanged", "not_found" (missing or not permitted) or
+    "invalid_id".
+    """
+    History, old_column, new_column = TRANSITIONS[field]
+    ids = parse_partner_ids(values)
+    with transaction.atomic():
+        current = dict(
+            partners.filter(pk__in=[pk for _, pk in ids if pk is not None])
+            .select_for_update()
+            .values_list("pk", field)
+        )
+        changing = [pk for pk, value in current.items() if value != new_value]
+        if changing:
+            Partner.objects.filter(pk__in=changing).update(
+                **{field: new_value, "updated_at": timezone.now()}
+            )
+            History.objects.bulk_create(
+                History(
+                    partner_id=pk,
+                    changed_by=user,
+                    **{old_column: current[pk], new_column: new_value},
+                )
+                for pk in changing
+            )
+            # update() and bulk_create() send no signals.
+            refresh_summaries(changing)
+            bump_partner_detail(*changing)
+
+    results = []
+    for value, pk in ids:
+        if pk is None:
+            results.append({"id": value, "outcome": "invalid_id"})
+        elif pk not in current:
+            results.append({"id": value, "outcome": "not_found"})
+        elif current[pk] == new_value:
+            results.append({"id": value, "outcome": "unchanged"})
+        else:
+            results.append({"id": value, "outcome": "changed", old_column: current[pk]})
+    return {field: new_value, "changed": len(changing), "results": results}
@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from users.authz import CacheStats
+
+# Signals orphan a payload by deleting its version key. Other web workers and
+# run_workers only see that through a shared cache (see users.checks); on a
+# per-process one they serve the old detail for up to
+# PARTNER_DETAIL_CACHE_TIMEOUT.
+DETAIL_VERSION_KEY = "partners:detail:version:{partner_id}"
+DETAIL_KEY = "partners:detail:{partner_id}:{version}"
+
+stats = CacheStats()
+
+
+def _version_key(partner_id):
+    return DETAIL_VERSION_KEY.format(partner_id=partner_id)
+
+
+def get_detail_version(partner_id):
+    """
+    Current version stamp of a partner's detail payload.
+
+    Stamps are fresh timestamps rather than counters, so a version key that
+    was evicted can never come back with a value an old payload is stored
+    under.
+    """
+    key = _version_key(partner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_detail_version(partner_id):
+    key = _version_key(partner_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def get_cached_detail(partner_id):
+    """Return (payload or None, version) for `partner_id`."""
+    version = get_detail_version(partner_id)
+    payload = cache.get(DETAIL_KEY.format(partner_id=partner_id, version=version))
+    if payload is None:
+        stats.misses += 1
+    else:
+        stats.hits += 1
+    return payload, version
+
+
+async def aget_cached_detail(partner_id):
+    version = await aget_detail_version(partner_id)
+    payload = await cache.aget(
+        DETAIL_KEY.format(partner_id=partner_id, version=version)
+    )
+    if payload is None:
+        stats.misses += 1
+    else:
+        stats.hits += 1
+    return payload, version
+
+
+def set_cached_detail(partner_id, version, payload):
+    cache.set(
+        DETAIL_KEY.format(partner_id=partner_id, version=version),
+        payload,
+        settings.PARTNER_DETAIL_CACHE_TIMEOUT,
+    )
+
+
+async def aset_cached_detail(partner_id, version, payload):
+    await cache.aset(
+        DETAIL_KEY.format(partner_id=partner_id, version=version),
+        payload,
+        settings.PARTNER_DETAIL_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_partner_detail(*partner_ids):
+    """Orphan the cached detail payload of the given partners."""
+    cache.delete_many([_version_key(pk) for pk in partner_ids if pk is not None])
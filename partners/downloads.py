@@ -0,0 +1,154 @@
+"""
+Serving partner document files after the permission check.
+
+With DOCUMENT_ACCEL_REDIRECT on (behind nginx) the response is just an
+X-Accel-Redirect header naming the file under the internal
+DOCUMENT_ACCEL_REDIRECT_LOCATION; nginx streams the bytes (Range requests
+included) while the worker moves on. Otherwise the file is streamed by a
+FileResponse, with single byte-range requests answered with 206 Partial
+Content. Either way If-None-Match is checked first: blob files have their
+SHA-256 as a strong ETag, so revalidating costs a 304 and no file access.
+"""
+
+import mimetypes
+import re
+from urllib.parse import quote, unquote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.utils.http import content_disposition_header, parse_etags
+
+from .blobs import blob_name
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """Reads `length` bytes of `file` from `start`, for a 206 FileResponse."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def storage_name(document):
+    """Name of the document's file in default storage, or None if it's a link."""
+    if document.blob_id:
+        return blob_name(document.blob_id)
+    # Uploaded before content-addressed storage; storage URLs are
+    # percent-encoded, storage names are not.
+    if document.file_url.startswith(settings.MEDIA_URL):
+        return unquote(document.file_url.removeprefix(settings.MEDIA_URL))
+    return None
+
+
+def get_etag(document, name):
+    if document.blob_id:
+        return f'"{document.blob_id}"'
+    modified = default_storage.get_modified_time(name)
+    return f'W/"{int(modified.timestamp()):x}-{default_storage.size(name):x}"'
+
+
+def not_modified(request, etag):
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    # Weak comparison, as If-None-Match requires.
+    return "*" in etags or etag.removeprefix("W/") in (
+        tag.removeprefix("W/") for tag in etags
+    )
+
+
+def parse_range(header, size):
+    """
+    The inclusive (start, end) of a single "bytes=" range, or None for the
+    whole file; ValueError if it lies outside the file.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match:
+        # Absent, malformed or multiple ranges: send the whole file.
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes.
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError
+    return start, end
+
+
+def serve_document(request, document):
+    name = storage_name(document)
+    if name is None:
+        return HttpResponseRedirect(document.file_url)
+
+    file_name = document.file_name or name.rsplit("/", 1)[-1]
+    content_type = (
+        (document.blob.content_type if document.blob_id else "")
+        or mimetypes.guess_type(file_name)[0]
+        or "application/octet-stream"
+    )
+    etag = get_etag(document, name)
+    headers = {
+        "ETag": etag,
+        # Cached copies are revalidated, so revoked access takes effect.
+        "Cache-Control": "private, no-cache",
+    }
+    if not_modified(request, etag):
+        return HttpResponse(status=304, headers=headers)
+
+    headers["Content-Disposition"] = content_disposition_header(True, file_name)
+    if settings.DOCUMENT_ACCEL_REDIRECT:
+        location = settings.DOCUMENT_ACCEL_REDIRECT_LOCATION.rstrip("/")
+        return HttpResponse(
+            content_type=content_type,
+            headers={**headers, "X-Accel-Redirect": f"{location}/{quote(name)}"},
+        )
+
+    size = default_storage.size(name)
+    headers["Accept-Ranges"] = "bytes"
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if not if_range or if_range == etag:
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except ValueError:
+            return HttpResponse(
+                status=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+    file = default_storage.open(name, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFile(file, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = end - start + 1
+    # After FileResponse's own guesses (e.g. Content-Disposition from the
+    # storage file name), so these win.
+    for header, value in headers.items():
+        response[header] = value
+    return response
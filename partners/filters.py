@@ -0,0 +1,32 @@
+from rest_framework.filters import BaseFilterBackend
+
+from users.scope import get_department_ids
+
+from .models import PartnerDepartment
+
+
+class DepartmentScopeFilter(BaseFilterBackend):
+    """
+    Restrict a queryset to partners linked to the caller's departments.
+
+    The view sets `department_scope_field` to the lookup that reaches the
+    partner id ("pk" for Partner, "partner_id" for documents, MOUs, ...).
+    The restriction is a single semi-join against PartnerDepartment, so it
+    adds no per-row queries and never duplicates rows. Sys admins bypass it.
+    """
+
+    default_scope_field = "partner_id"
+
+    def filter_queryset(self, request, queryset, view):
+        user = request.user
+        if getattr(user, "is_sys_admin", False):
+            return queryset
+        department_ids = get_department_ids(user)
+        if not department_ids:
+            return queryset.none()
+
+        field = getattr(view, "department_scope_field", self.default_scope_field)
+        partner_ids = PartnerDepartment.objects.filter(
+            department_id__in=department_ids
+        ).values("partner_id")
+        return queryset.filter(**{f"{field}__in": partner_ids})
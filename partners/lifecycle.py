@@ -0,0 +1,134 @@
+"""
+Date-driven status changes (manage.py sweep_lifecycle, or the
+partners.sweep_lifecycle job).
+
+Each transition is one set-based statement over the rows that are due,
+found through a partial index that only holds rows still able to move,
+so a sweep costs O(rows changed) however many MOUs and projects exist.
+On PostgreSQL the UPDATE and the LifecycleTransition inserts are a single
+statement (UPDATE ... RETURNING feeding INSERT ... SELECT); elsewhere due
+rows are moved in batches of an UPDATE plus one bulk_create.
+"""
+
+from collections import namedtuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import MOU, LifecycleTransition, Project, ProjectPartner
+
+# `model` rows in status `old` whose `date_field` is `lookup` today move to `new`.
+Transition = namedtuple(
+    "Transition", ["object_type", "model", "old", "new", "date_field", "lookup"]
+)
+
+ObjectType = LifecycleTransition.ObjectType
+
+# In order: a planned project whose end date has also passed is completed
+# before the start-date transition could make it ongoing.
+TRANSITIONS = (
+    Transition(ObjectType.MOU, MOU, "active", "expired", "end_date", "lt"),
+    Transition(ObjectType.PROJECT, Project, "planned", "completed", "end_date", "lt"),
+    Transition(ObjectType.PROJECT, Project, "ongoing", "completed", "end_date", "lt"),
+    Transition(ObjectType.PROJECT, Project, "planned", "ongoing", "start_date", "lte"),
+    Transition(
+        ObjectType.PROJECT_PARTNER,
+        ProjectPartner,
+        "active",
+        "completed",
+        "end_date",
+        "lt",
+    ),
+)
+
+OPERATORS = {"lt": "<", "lte": "<="}
+
+
+def label(transition):
+    return f"{transition.object_type}:{transition.old}->{transition.new}"
+
+
+def due(transition, today):
+    return transition.model.objects.filter(
+        status=transition.old,
+        **{f"{transition.date_field}__{transition.lookup}": today},
+    )
+
+
+def _sweep_postgresql(transition, today, now):
+    quote = connection.ops.quote_name
+    model = transition.model
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                UPDATE {quote(model._meta.db_table)}
+                SET status = %s, updated_at = %s
+                WHERE status = %s
+                  AND {quote(transition.date_field)} {OPERATORS[transition.lookup]} %s
+                RETURNING id
+            )
+            INSERT INTO {quote(LifecycleTransition._meta.db_table)}
+                (id, object_type, object_id, old_status, new_status, changed_at)
+            SELECT gen_random_uuid(), %s, id, %s, %s, %s FROM moved
+            """,
+            [
+                transition.new,
+                now,
+                transition.old,
+                today,
+                transition.object_type,
+                transition.old,
+                transition.new,
+                now,
+            ],
+        )
+        return cursor.rowcount
+
+
+def _sweep_batches(transition, today, now, batch_size):
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(due(transition, today).values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                return total
+            transition.model.objects.filter(pk__in=ids, status=transition.old).update(
+                status=transition.new, updated_at=now
+            )
+            LifecycleTransition.objects.bulk_create(
+                LifecycleTransition(
+                    object_type=transition.object_type,
+                    object_id=pk,
+                    old_status=transition.old,
+                    new_status=transition.new,
+                )
+                for pk in ids
+            )
+        total += len(ids)
+
+
+def sweep(today=None, batch_size=1000):
+    """Apply every due transition; returns {label: rows changed}."""
+    today = today or timezone.localdate()
+    now = timezone.now()
+    counts = {}
+    for transition in TRANSITIONS:
+        if connection.vendor == "postgresql":
+            with transaction.atomic():
+                counts[label(transition)] = _sweep_postgresql(transition, today, now)
+        else:
+            counts[label(transition)] = _sweep_batches(
+                transition, today, now, batch_size
+            )
+    return counts
+
+
+def pending(today=None):
+    """
+    Rows due per transition, without changing them. Counted independently:
+    a planned project past both dates shows under two transitions, though
+    sweep() only completes it.
+    """
+    today = today or timezone.localdate()
+    return {label(t): due(t, today).count() for t in TRANSITIONS}
@@ -0,0 +1,122 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users.tokens import RefreshToken
+
+DEFAULT_PATHS = ["/api/partners/", "/api/mous/"]
+
+
+def parse_targets(values):
+    targets = []
+    for value in values:
+        name, sep, url = value.partition("=")
+        if not sep or not url.startswith(("http://", "https://")):
+            raise CommandError(
+                f"--target must look like name=http://host:port: {value}"
+            )
+        targets.append((name, url.rstrip("/")))
+    return targets
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the read endpoints of one or more running servers (e.g. "
+        "gunicorn/WSGI against uvicorn/ASGI) at increasing concurrency and "
+        "print throughput and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=base URL, repeatable, e.g. wsgi=http://127.0.0.1:8000",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            help="Endpoint to request, repeatable (requests rotate over them). "
+            f"Default: {', '.join(DEFAULT_PATHS)}",
+        )
+        parser.add_argument(
+            "--user",
+            help="Sign requests with a fresh access token for this username.",
+        )
+        parser.add_argument("--token", help="Use this access token instead.")
+        parser.add_argument(
+            "--concurrency",
+            default="1,8,32,128",
+            help="Comma-separated numbers of concurrent clients.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests per target and concurrency level.",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        targets = parse_targets(options["target"])
+        paths = options["path"] or DEFAULT_PATHS
+        levels = [int(level) for level in options["concurrency"].split(",")]
+        headers = {"Accept": "application/json"}
+        token = options["token"]
+        if token is None and options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}.")
+            token = str(RefreshToken.for_user(user).access_token)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        self.stdout.write(
+            f"{'target':<10} {'conc':>5} {'req/s':>9} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for name, base_url in targets:
+            for level in levels:
+                row = self.run_level(
+                    base_url, paths, headers, level, options["requests"], options
+                )
+                self.stdout.write(f"{name:<10} {level:>5} " + row)
+
+    def run_level(self, base_url, paths, headers, concurrency, total, options):
+        def fetch(number):
+            url = base_url + paths[number % len(paths)]
+            request = urllib.request.Request(url, headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(
+                    request, timeout=options["timeout"]
+                ) as response:
+                    response.read()
+                    ok = 200 <= response.status < 300
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return time.perf_counter() - start, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = [seconds * 1000 for seconds, _ in results]
+        errors = sum(1 for _, ok in results if not ok)
+        return (
+            f"{total / elapsed:>9.1f} {statistics.median(latencies):>8.1f} "
+            f"{percentile(latencies, 0.95):>8.1f} {percentile(latencies, 0.99):>8.1f} "
+            f"{errors:>7}"
+        )
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+def iter_list_views(patterns, prefix=""):
+    """Yield (route, viewset class) for every router-registered list endpoint."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_list_views(
+                pattern.url_patterns, prefix + str(pattern.pattern)
+            )
+        elif isinstance(pattern, URLPattern):
+            callback = pattern.callback
+            actions = getattr(callback, "actions", None) or {}
+            view_class = getattr(callback, "cls", None)
+            if (
+                actions.get("get") == "list"
+                and view_class is not None
+                and issubclass(view_class, GenericAPIView)
+            ):
+                yield prefix + str(pattern.pattern), view_class
+
+
+def is_full_scan(plan):
+    if connection.vendor == "postgresql":
+        return "Seq Scan" in plan
+    # SQLite: "SCAN <table>" without "USING ... INDEX" reads the whole table.
+    return any(
+        " SCAN " in f" {line} " and "USING" not in line for line in plan.splitlines()
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the first-page query of every list endpoint, "
+        "to catch missing or unused indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Explain as this username (applies department scoping). "
+            "Defaults to an unsaved sys admin.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="EXPLAIN ANALYZE (PostgreSQL only; executes the query).",
+        )
+        parser.add_argument(
+            "--fail-on-seq-scan",
+            action="store_true",
+            help="Exit with an error if any plan contains a full table scan.",
+        )
+
+    def get_user(self, username):
+        User = get_user_model()
+        if not username:
+            return User(username="explain", is_sys_admin=True)
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"User '{username}' does not exist.")
+
+    def build_queryset(self, viewset_class, user):
+        request = Request(APIRequestFactory().get("/"))
+        request.user = user
+        view = viewset_class(
+            action="list", request=request, args=(), kwargs={}, format_kwarg=None
+        )
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        if paginator is None:
+            return queryset
+        # Same ORDER BY ... LIMIT the paginator issues for page one.
+        paginator.keys = paginator.get_keys(request, queryset, view)
+        page_size = paginator.get_page_size(request)
+        return queryset.order_by(*paginator.get_order_by())[: page_size + 1]
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options["analyze"] = True
+
+        seen = set()
+        full_scans = []
+        for route, viewset_class in iter_list_views(get_resolver().url_patterns):
+            if viewset_class in seen:
+                continue
+            seen.add(viewset_class)
+
+            queryset = self.build_queryset(viewset_class, user)
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"{viewset_class.__name__}  /{route}")
+            )
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(plan + "\n")
+            if is_full_scan(plan):
+                full_scans.append(viewset_class.__name__)
+
+        if full_scans:
+            message = "Full table scans in: " + ", ".join(full_scans)
+            if options["fail_on_seq_scan"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("No full table scans."))
@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from partners.blobs import collect_garbage
+from partners.uploads import expire_uploads, remove_orphaned_staging_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored document files no PartnerDocument references any more, "
+        "resumable uploads abandoned for --stale-hours and their staging "
+        "files. Safe to run while uploads are in progress, e.g. nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-hours",
+            type=float,
+            default=24,
+            help="Abort uploads that received no chunk for this long.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Blobs deleted per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the unreferenced blobs.",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = collect_garbage(dry_run=True)
+            self.stdout.write(f"{count} unreferenced blobs.")
+            return
+
+        before = timezone.now() - timedelta(hours=options["stale_hours"])
+        uploads = expire_uploads(before)
+        staged = remove_orphaned_staging_files(before)
+        blobs = collect_garbage(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {blobs} unreferenced blobs, {uploads} stale uploads "
+                f"and {staged} orphaned staging files."
+            )
+        )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from strategybackend.schema import (
+    code_hash,
+    generate_schema,
+    read_schema_file,
+    write_schema_file,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI document served at /swagger.json/. Skipped when "
+        "the file on disk already matches the current code."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Write here instead of settings.OPENAPI_SCHEMA_FILE.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate even if the file is up to date.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Don't write; exit with an error if the file is missing or stale.",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        current = read_schema_file(output)
+        if options["check"]:
+            if current is None:
+                raise CommandError("OpenAPI schema file is missing or stale.")
+            self.stdout.write(f"Schema is up to date ({code_hash()[:12]}).")
+            return
+        if current is not None and not options["force"]:
+            self.stdout.write(f"Schema is up to date ({code_hash()[:12]}), skipped.")
+            return
+
+        schema = generate_schema()
+        write_schema_file(schema, output)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(schema.body)} bytes (etag {schema.etag[:12]}, "
+                f"code {schema.code_hash[:12]})."
+            )
+        )
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from partners.partitions import (
+    ensure_partitions,
+    expire_partitions,
+    expired_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the coming months' partitions of the status and risk level "
+        "history (PostgreSQL) and, with a retention window, detach the "
+        "months before it, archive them as gzipped CSV and drop them. Run "
+        "it daily or at least monthly, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.HISTORY_PARTITIONS_AHEAD,
+            help="Months to create partitions for beyond the current one.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=settings.HISTORY_RETENTION_MONTHS,
+            help="Months of history to keep, the current one included (0: all).",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.HISTORY_ARCHIVE_DIR,
+            help="Where expired months are written before being dropped.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the partitions that would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("History partitioning needs PostgreSQL.")
+        if options["months_ahead"] < 0 or options["retain_months"] < 0:
+            raise CommandError("--months-ahead and --retain-months can't be negative.")
+
+        retain_months = options["retain_months"]
+        if options["dry_run"]:
+            expired = expired_partitions(retain_months) if retain_months else []
+            for _, name in expired:
+                self.stdout.write(f"Would archive {name}")
+            self.stdout.write(f"{len(expired)} partitions past retention.")
+            return
+
+        for name in ensure_partitions(options["months_ahead"]):
+            self.stdout.write(f"Created {name}")
+        archives = []
+        if retain_months:
+            archives = expire_partitions(retain_months, options["archive_dir"])
+        for path in archives:
+            self.stdout.write(f"Archived {path}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Partitions ready; archived {len(archives)}.")
+        )
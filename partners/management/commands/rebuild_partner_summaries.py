@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from partners.models import Partner
+from partners.summary import rebuild_summaries, refresh_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the PartnerSummary read model behind the partner list, "
+        "for backfills and to repair rows written around the signals "
+        "(raw SQL, queryset.update(), ...)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partner",
+            action="append",
+            help="Only rebuild this partner (ID, repeatable).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Partners recomputed per statement.",
+        )
+
+    def handle(self, *args, **options):
+        if options["partner"]:
+            partner_ids = list(
+                Partner.objects.filter(pk__in=options["partner"]).values_list(
+                    "pk", flat=True
+                )
+            )
+            count = refresh_summaries(partner_ids)
+        else:
+            # Each batch is one upsert committed on its own, so rebuilding a
+            # large table doesn't hold one long transaction.
+            count = rebuild_summaries(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} partner summaries."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from partners.stats import (
+    MATERIALIZED_VIEW,
+    has_materialized_view,
+    refresh_materialized_views,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the PostgreSQL materialized view behind /api/partners/stats/ "
+        "(used when STATS_MATERIALIZED_VIEW is on). Run it periodically, e.g. "
+        "from cron every few minutes; readers are not blocked while it runs."
+    )
+
+    def handle(self, *args, **options):
+        if not has_materialized_view():
+            raise CommandError(
+                f"{MATERIALIZED_VIEW} does not exist (PostgreSQL only; run migrate)."
+            )
+        refresh_materialized_views()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {MATERIALIZED_VIEW}."))
@@ -0,0 +1,58 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from partners.lifecycle import pending, sweep
+from partners.tasks import schedule_sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire MOUs, start and complete projects and complete project "
+        "partners whose start or end date has passed, recording each change "
+        "as a LifecycleTransition. --schedule queues it as a daily "
+        "background job instead (run by run_workers)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            help="Sweep as of this day (YYYY-MM-DD) instead of today.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows moved per statement where the database can't do it in one.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that are due.",
+        )
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            help="Queue the daily sweep job (if it isn't queued already).",
+        )
+
+    def handle(self, *args, **options):
+        if options["schedule"]:
+            job = schedule_sweep()
+            if job is None:
+                self.stdout.write("The sweep job is already queued.")
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Queued the sweep job for {job.run_at}.")
+                )
+            return
+
+        if options["dry_run"]:
+            counts = pending(options["date"])
+        else:
+            counts = sweep(options["date"], batch_size=options["batch_size"])
+        for transition, count in counts.items():
+            self.stdout.write(f"{transition}: {count}")
+        verb = "Due" if options["dry_run"] else "Changed"
+        self.stdout.write(self.style.SUCCESS(f"{verb}: {sum(counts.values())} rows."))
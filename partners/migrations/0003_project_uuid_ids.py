@@ -0,0 +1,113 @@
+import uuid
+
+from django.db import migrations, models
+
+
+class AlterIdToUUID(migrations.AlterField):
+    """
+    AlterField from an integer primary key to a UUID that also works on
+    PostgreSQL, which has no bigint <-> uuid cast: the id and every foreign
+    key pointing at it are converted by zero-padding their hex value, e.g.
+    42 -> 00000000-0000-0000-0000-00000000002a, and back. Other databases
+    use the plain AlterField (see 0013_repair_project_ids for SQLite).
+    """
+
+    TO_UUID = "lpad(to_hex({column}), 32, '0')::uuid"
+    # Only ids that came from integers fit; others collide or overflow.
+    TO_BIGINT = "('x' || right(replace({column}::text, '-', ''), 16))::bit(64)::bigint"
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = from_state.apps.get_model(app_label, self.model_name)
+        self.convert(schema_editor, model, "uuid", self.TO_UUID)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = to_state.apps.get_model(app_label, self.model_name)
+        self.convert(schema_editor, model, "bigint", self.TO_BIGINT)
+
+    def convert(self, schema_editor, model, db_type, using):
+        table = model._meta.db_table
+        column = model._meta.get_field(self.name).column
+        introspection = schema_editor.connection.introspection
+        quote = schema_editor.quote_name
+        with schema_editor.connection.cursor() as cursor:
+            references = [
+                (other, name, constraint["columns"][0])
+                for other in introspection.table_names(cursor)
+                for name, constraint in introspection.get_constraints(
+                    cursor, other
+                ).items()
+                if constraint["foreign_key"] == (table, column)
+            ]
+
+        def alter(table, column):
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(column)} "
+                f"TYPE {db_type} USING {using.format(column=quote(column))}"
+            )
+
+        for other, name, _ in references:
+            schema_editor.execute(
+                f"ALTER TABLE {quote(other)} DROP CONSTRAINT {quote(name)}"
+            )
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(column)} "
+            "DROP IDENTITY IF EXISTS"
+        )
+        alter(table, column)
+        if db_type == "bigint":
+            # Back to BigAutoField: numbering resumes after the highest id.
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(column)} "
+                "ADD GENERATED BY DEFAULT AS IDENTITY"
+            )
+            schema_editor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, %s), "
+                f"coalesce(max({quote(column)}), 0) + 1, false) FROM {quote(table)}",
+                [table, column],
+            )
+        for other, name, other_column in references:
+            alter(other, other_column)
+            schema_editor.execute(
+                f"ALTER TABLE {quote(other)} ADD CONSTRAINT {quote(name)} "
+                f"FOREIGN KEY ({quote(other_column)}) "
+                f"REFERENCES {quote(table)} ({quote(column)}) "
+                "DEFERRABLE INITIALLY DEFERRED"
+            )
+
+
+class Migration(migrations.Migration):
+    """
+    0003_alter_project_id_alter_projectpartner_id, which can't run on
+    PostgreSQL. Databases that applied it keep it; the others run this.
+    """
+
+    replaces = [("partners", "0003_alter_project_id_alter_projectpartner_id")]
+
+    dependencies = [
+        ("partners", "0002_project_projectpartner"),
+    ]
+
+    operations = [
+        AlterIdToUUID(
+            model_name="project",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        AlterIdToUUID(
+            model_name="projectpartner",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+    ]
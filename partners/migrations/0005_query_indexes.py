@@ -0,0 +1,120 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partners", "0004_mou"),
+        ("users", "0007_role_level"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mou",
+            index=models.Index(fields=["start_date", "id"], name="mou_start_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="partner",
+            index=models.Index(fields=["created_at", "id"], name="partner_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="partner",
+            index=models.Index(fields=["updated_at", "id"], name="partner_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="partner",
+            index=models.Index(
+                fields=["status", "created_at"], name="partner_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="partner",
+            index=models.Index(
+                fields=["type", "created_at"], name="partner_type_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="partner",
+            index=models.Index(
+                fields=["risk_level", "created_at"], name="partner_risk_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="partnerdepartment",
+            index=models.Index(
+                fields=["department", "partner"], name="partnerdept_dept_partner_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="partnerdocument",
+            index=models.Index(
+                fields=["uploaded_at", "id"], name="document_uploaded_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="partnerdocument",
+            index=models.Index(
+                fields=["partner", "-uploaded_at"], name="document_partner_uploaded_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["created_at", "id"], name="project_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["status", "created_at"], name="project_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["start_date"], name="project_start_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["end_date"], name="project_end_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="projectpartner",
+            index=models.Index(
+                fields=["created_at", "id"], name="projpartner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projectpartner",
+            index=models.Index(
+                fields=["project", "role"], name="projpartner_project_role_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projectpartner",
+            index=models.Index(
+                fields=["partner", "status"], name="projpartner_partner_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projectpartner",
+            index=models.Index(fields=["role"], name="projpartner_role_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="projectpartner",
+            index=models.Index(fields=["status"], name="projpartner_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="risklevelhistory",
+            index=models.Index(
+                fields=["partner", "-changed_at"], name="risk_hist_partner_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="statushistory",
+            index=models.Index(
+                fields=["partner", "-changed_at"], name="status_hist_partner_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,149 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:00
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# table -> [(column, weight)]; the first column also gets a trigram index.
+SEARCH_DOCUMENTS = {
+    "partners_partner": [("name", "A")],
+    "partners_project": [("name", "A"), ("description", "B")],
+    "partners_mou": [("title", "A"), ("description", "B")],
+}
+
+
+def _tsvector(columns, prefix=""):
+    return " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def _postgres_forwards(cursor):
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    trigram = cursor.fetchone() is not None
+    if trigram:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, columns in SEARCH_DOCUMENTS.items():
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_tsvector(columns, "NEW.")};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """)
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+            """)
+        cursor.execute(f"UPDATE {table} SET search_vector = {_tsvector(columns)}")
+        cursor.execute(
+            f"CREATE INDEX {table}_search_idx ON {table} USING gin (search_vector)"
+        )
+        if trigram:
+            cursor.execute(
+                f"CREATE INDEX {table}_trgm_idx ON {table} "
+                f"USING gin ({columns[0][0]} gin_trgm_ops)"
+            )
+
+
+def _postgres_backwards(cursor):
+    for table in SEARCH_DOCUMENTS:
+        cursor.execute(f"DROP INDEX IF EXISTS {table}_trgm_idx")
+        cursor.execute(f"DROP INDEX IF EXISTS {table}_search_idx")
+        cursor.execute(
+            f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}"
+        )
+        cursor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+def _sqlite_forwards(cursor):
+    # FTS5 shadow tables for local runs; the id column maps back to the row.
+    cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+    if not cursor.fetchone()[0]:
+        return
+    for table, columns in SEARCH_DOCUMENTS.items():
+        names = ", ".join(column for column, _ in columns)
+        new_values = ", ".join(f"new.{column}" for column, _ in columns)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {table}_fts USING fts5("
+            f"id UNINDEXED, {names}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {table}_fts (id, {names}) VALUES (new.id, {new_values});
+            END
+            """)
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_fts_update AFTER UPDATE ON {table} BEGIN
+                DELETE FROM {table}_fts WHERE id = old.id;
+                INSERT INTO {table}_fts (id, {names}) VALUES (new.id, {new_values});
+            END
+            """)
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN
+                DELETE FROM {table}_fts WHERE id = old.id;
+            END
+            """)
+        cursor.execute(
+            f"INSERT INTO {table}_fts (id, {names}) SELECT id, {names} FROM {table}"
+        )
+
+
+def _sqlite_backwards(cursor):
+    for table in SEARCH_DOCUMENTS:
+        for suffix in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "postgresql":
+            _postgres_forwards(cursor)
+        elif vendor == "sqlite":
+            _sqlite_forwards(cursor)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "postgresql":
+            _postgres_backwards(cursor)
+        elif vendor == "sqlite":
+            _sqlite_backwards(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partners", "0005_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mou",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="partner",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_summaries(apps, schema_editor):
+    from partners.summary import rebuild_summaries
+
+    rebuild_summaries(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partners", "0006_search_vectors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PartnerSummary",
+            fields=[
+                (
+                    "partner",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="partners.partner",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("NGO", "NGO"),
+                            ("GOV", "Government"),
+                            ("EMBASSY", "Embassy"),
+                            ("CORPORATE", "Corporate"),
+                            ("OTHER", "Other"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("approved", "Approved"),
+                            ("suspended", "Suspended"),
+                            ("blacklisted", "Blacklisted"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "risk_level",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("critical", "Critical"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "created_by_username",
+                    models.CharField(blank=True, max_length=150, null=True),
+                ),
+                ("department_names", models.JSONField(default=list)),
+                ("document_count", models.PositiveIntegerField(default=0)),
+                ("project_count", models.PositiveIntegerField(default=0)),
+                ("mou_count", models.PositiveIntegerField(default=0)),
+                (
+                    "last_old_status",
+                    models.CharField(blank=True, max_length=50, null=True),
+                ),
+                (
+                    "last_new_status",
+                    models.CharField(blank=True, max_length=50, null=True),
+                ),
+                ("last_status_changed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["created_at", "partner"], name="summary_created_idx"
+                    ),
+                    models.Index(
+                        fields=["updated_at", "partner"], name="summary_updated_idx"
+                    ),
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="summary_status_created_idx",
+                    ),
+                    models.Index(
+                        fields=["type", "created_at"], name="summary_type_created_idx"
+                    ),
+                    models.Index(
+                        fields=["risk_level", "created_at"],
+                        name="summary_risk_created_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# One row per (department, type, status, risk level) with the number of
+# partners, plus the overall counts under department_id NULL. Read by
+# partners.stats when STATS_MATERIALIZED_VIEW is on; refreshed by
+# `manage.py refresh_stats_views`.
+CREATE_VIEW = """
+CREATE MATERIALIZED VIEW partners_partner_stats AS
+SELECT NULL::uuid AS department_id, p.type, p.status, p.risk_level,
+       count(*) AS partners, now() AS refreshed_at
+FROM partners_partner p
+GROUP BY p.type, p.status, p.risk_level
+UNION ALL
+SELECT pd.department_id, p.type, p.status, p.risk_level,
+       count(*) AS partners, now() AS refreshed_at
+FROM partners_partner p
+JOIN partners_partnerdepartment pd ON pd.partner_id = p.id
+GROUP BY pd.department_id, p.type, p.status, p.risk_level
+"""
+
+# REFRESH ... CONCURRENTLY needs a unique index.
+CREATE_INDEX = """
+CREATE UNIQUE INDEX partners_partner_stats_key
+ON partners_partner_stats (department_id, type, status, risk_level)
+"""
+
+
+def create_view(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_VIEW)
+    schema_editor.execute(CREATE_INDEX)
+
+
+def drop_view(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP MATERIALIZED VIEW IF EXISTS partners_partner_stats")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partners", "0007_partner_summary"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_view, drop_view),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:37
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partners", "0010_document_blobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LifecycleTransition",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "object_type",
+                    models.CharField(
+                        choices=[
+                            ("mou", "MOU"),
+                            ("project", "Project"),
+                            ("project_partner", "Project partner"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.UUIDField()),
+                ("old_status", models.CharField(max_length=20)),
+                ("new_status", models.CharField(max_length=20)),
+                ("changed_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="mou",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["status", "end_date"],
+                name="mou_active_end_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("status__in", ["planned", "ongoing"])),
+                fields=["status", "end_date"],
+                name="project_open_end_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("status", "planned")),
+                fields=["status", "start_date"],
+                name="project_planned_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projectpartner",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["status", "end_date"],
+                name="projpartner_active_end_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lifecycletransition",
+            index=models.Index(
+                fields=["object_type", "object_id", "-changed_at"],
+                name="lifecycle_object_idx",
+            ),
+        ),
+    ]
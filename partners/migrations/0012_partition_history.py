@@ -0,0 +1,171 @@
+"""
+Turn StatusHistory and RiskLevelHistory into month-partitioned tables on
+PostgreSQL; partners.partitions describes the layout and keeps it up later.
+
+The DDL lives here rather than in partners.partitions, which imports the
+live models: this migration only sees the historical tables, and rebuilds
+their indexes and foreign keys from what introspection reports on the
+table being replaced, under the same names.
+"""
+
+from datetime import date, datetime, timezone
+from itertools import zip_longest
+
+from django.db import migrations
+from django.db.models import Index
+
+# Month partitions created up front; `manage.py history_partitions` keeps
+# creating them ahead from then on.
+MONTHS_AHEAD = 3
+PARTITION_KEY = "changed_at"
+HISTORY_MODELS = ("StatusHistory", "RiskLevelHistory")
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def bound(month):
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    return f"'{start.isoformat()}'"
+
+
+def table_definitions(schema_editor, table):
+    """
+    The primary key name of `table`, and the statements that recreate its
+    other indexes and foreign keys on a new table of that name.
+    """
+    connection = schema_editor.connection
+    quote = schema_editor.quote_name
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    primary_key, statements = None, []
+    for name, constraint in sorted(constraints.items()):
+        if constraint["primary_key"]:
+            primary_key = name
+        elif constraint["foreign_key"]:
+            (column,) = constraint["columns"]
+            to_table, to_column = constraint["foreign_key"]
+            statements.append(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} "
+                f"FOREIGN KEY ({quote(column)}) "
+                f"REFERENCES {quote(to_table)} ({quote(to_column)}) "
+                "DEFERRABLE INITIALLY DEFERRED"
+            )
+        elif constraint["index"] and not constraint["unique"]:
+            # Introspection reports B-tree indexes by Django's suffix.
+            method = (
+                "btree" if constraint["type"] == Index.suffix else constraint["type"]
+            )
+            if method == "brin":
+                continue
+            columns = ", ".join(
+                f"{quote(column)} {order}".rstrip()
+                for column, order in zip_longest(
+                    constraint["columns"], constraint["orders"] or [], fillvalue=""
+                )
+            )
+            statements.append(
+                f"CREATE INDEX {quote(name)} ON {quote(table)} "
+                f"USING {method} ({columns})"
+            )
+    return primary_key, statements
+
+
+def move_rows(schema_editor, table, old):
+    """Copy `old` into the new `table` and drop it, freeing its names."""
+    quote = schema_editor.quote_name
+    schema_editor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+    schema_editor.execute(f"DROP TABLE {quote(old)}")
+
+
+def partition_table(schema_editor, model):
+    """
+    Rebuild `model`'s table as a partitioned one: month partitions from its
+    oldest row to MONTHS_AHEAD months from now, plus the default partition.
+    """
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    old = f"{table}_unpartitioned"
+    primary_key, statements = table_definitions(schema_editor, table)
+    schema_editor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+    schema_editor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE ({quote(PARTITION_KEY)})"
+    )
+    schema_editor.execute(
+        f"CREATE TABLE {quote(table + '_default')} PARTITION OF {quote(table)} DEFAULT"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT min({quote(PARTITION_KEY)}) FROM {quote(old)}")
+        (oldest,) = cursor.fetchone()
+    this_month = month_start(datetime.now(timezone.utc))
+    month = month_start(oldest.astimezone(timezone.utc)) if oldest else this_month
+    while month <= add_months(this_month, MONTHS_AHEAD):
+        schema_editor.execute(
+            f"CREATE TABLE {quote(f'{table}_p{month:%Y%m}')} "
+            f"PARTITION OF {quote(table)} "
+            f"FOR VALUES FROM ({bound(month)}) TO ({bound(add_months(month, 1))})"
+        )
+        month = add_months(month, 1)
+    move_rows(schema_editor, table, old)
+    # PostgreSQL requires the partition key in the primary key.
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(primary_key)} "
+        f"PRIMARY KEY ({quote(model._meta.pk.column)}, {quote(PARTITION_KEY)})"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX {quote(f'{table}_{PARTITION_KEY}_brin')} ON {quote(table)} "
+        f"USING brin ({quote(PARTITION_KEY)})"
+    )
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def unpartition_table(schema_editor, model):
+    """Undo partition_table(): one plain table with every attached partition's rows."""
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    old = f"{table}_partitioned"
+    primary_key, statements = table_definitions(schema_editor, table)
+    schema_editor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+    schema_editor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS)"
+    )
+    move_rows(schema_editor, table, old)
+    schema_editor.execute(
+        f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(primary_key)} "
+        f"PRIMARY KEY ({quote(model._meta.pk.column)})"
+    )
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def partition_history(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in HISTORY_MODELS:
+        partition_table(schema_editor, apps.get_model("partners", name))
+
+
+def unpartition_history(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in HISTORY_MODELS:
+        unpartition_table(schema_editor, apps.get_model("partners", name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partners", "0011_lifecycle_sweeper"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_history, unpartition_history),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Models whose integer ids 0003 turned into UUIDs.
+MODELS = ("Project", "ProjectPartner")
+
+
+def repair_ids(apps, schema_editor):
+    """
+    On SQLite, 0003 copied integer ids (and the foreign keys to them) into
+    the UUID columns as-is, e.g. "42", which no longer load. Rewrite them
+    as the zero-padded hex value PostgreSQL got, 0000...002a.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    quote = schema_editor.quote_name
+    for name in MODELS:
+        model = apps.get_model("partners", name)
+        columns = [(model._meta.db_table, model._meta.pk.column)] + [
+            (relation.related_model._meta.db_table, relation.field.column)
+            for relation in model._meta.related_objects
+            if not relation.many_to_many
+        ]
+        for table, column in columns:
+            schema_editor.execute(
+                f"UPDATE {quote(table)} "
+                f"SET {quote(column)} = printf('%%032x', CAST({quote(column)} AS INTEGER)) "
+                f"WHERE length({quote(column)}) < 32"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("partners", "0012_partition_history"),
+    ]
+
+    operations = [
+        migrations.RunPython(repair_ids, migrations.RunPython.noop),
+    ]
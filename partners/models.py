@@ -1,5 +1,7 @@
 import uuid
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 
 
@@ -58,6 +60,24 @@ class Partner(models.Model):
         related_name="partners",
         blank=True,
     )
+    # Maintained by database triggers (see migration 0006), used by
+    # partners.search.RankedSearchFilter on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="partner_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="partner_updated_idx"),
+            models.Index(
+                fields=["status", "created_at"], name="partner_status_created_idx"
+            ),
+            models.Index(
+                fields=["type", "created_at"], name="partner_type_created_idx"
+            ),
+            models.Index(
+                fields=["risk_level", "created_at"], name="partner_risk_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -95,6 +115,23 @@ class PartnerProfile(models.Model):
 # ----------------------
 # PartnerDocuments
 # ----------------------
+class DocumentBlob(models.Model):
+    """
+    A stored file, named by its SHA-256 (partners.blobs). Documents with the
+    same content share one blob; its reference count is the number of
+    PartnerDocument rows pointing at it, and blobs nobody references are
+    removed by `manage.py gc_documents`.
+    """
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
 class PartnerDocument(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     partner = models.ForeignKey(
@@ -102,12 +139,67 @@ class PartnerDocument(models.Model):
     )
     file_type = models.CharField(max_length=50)
     file_url = models.TextField()
+    # Original name of an uploaded file; blob is None for link-only
+    # documents and those uploaded before content-addressed storage.
+    file_name = models.CharField(max_length=255, blank=True)
+    blob = models.ForeignKey(
+        DocumentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="documents",
+    )
     uploaded_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, related_name="documents_uploaded"
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["uploaded_at", "id"], name="document_uploaded_idx"),
+            models.Index(
+                fields=["partner", "-uploaded_at"], name="document_partner_uploaded_idx"
+            ),
+        ]
+
+
+class DocumentUpload(models.Model):
+    """
+    A resumable upload in progress (partners.uploads). Chunks are written
+    into a staging file at their offsets; finalizing turns it into a
+    PartnerDocument.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    partner = models.ForeignKey(
+        Partner, on_delete=models.CASCADE, related_name="document_uploads"
+    )
+    file_name = models.CharField(max_length=255)
+    file_type = models.CharField(max_length=50)
+    size = models.BigIntegerField()
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="document_uploads"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class DocumentUploadChunk(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    upload = models.ForeignKey(
+        DocumentUpload, on_delete=models.CASCADE, related_name="chunks"
+    )
+    offset = models.BigIntegerField()
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("upload", "offset")
+
 
+# Partitioned by month of changed_at on PostgreSQL, with (id, changed_at)
+# as the primary key there (see partners.partitions).
 class StatusHistory(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     partner = models.ForeignKey(
@@ -120,7 +212,16 @@ class StatusHistory(models.Model):
     )
     changed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["partner", "-changed_at"], name="status_hist_partner_idx"
+            ),
+        ]
+
 
+# Partitioned by month of changed_at on PostgreSQL, with (id, changed_at)
+# as the primary key there (see partners.partitions).
 class RiskLevelHistory(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     partner = models.ForeignKey(
@@ -133,6 +234,13 @@ class RiskLevelHistory(models.Model):
     )
     changed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["partner", "-changed_at"], name="risk_hist_partner_idx"
+            ),
+        ]
+
 
 class PartnerDepartment(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -142,6 +250,12 @@ class PartnerDepartment(models.Model):
 
     class Meta:
         unique_together = ("partner", "department")
+        indexes = [
+            # Department-scope semi-join: department_id IN (...) -> partner_id
+            models.Index(
+                fields=["department", "partner"], name="partnerdept_dept_partner_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.partner.name} ↔ {self.department.name}"
@@ -163,6 +277,29 @@ class Project(models.Model):
     end_date = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="project_created_idx"),
+            models.Index(
+                fields=["status", "created_at"], name="project_status_created_idx"
+            ),
+            models.Index(fields=["start_date"], name="project_start_date_idx"),
+            models.Index(fields=["end_date"], name="project_end_date_idx"),
+            # Lifecycle sweeper (partners.lifecycle): only rows that can
+            # still move are indexed, so a sweep reads just the due ones.
+            models.Index(
+                fields=["status", "end_date"],
+                condition=Q(status__in=["planned", "ongoing"]),
+                name="project_open_end_date_idx",
+            ),
+            models.Index(
+                fields=["status", "start_date"],
+                condition=Q(status="planned"),
+                name="project_planned_start_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -205,6 +342,22 @@ class ProjectPartner(models.Model):
 
     class Meta:
         unique_together = ("project", "partner", "role")
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="projpartner_created_idx"),
+            models.Index(
+                fields=["project", "role"], name="projpartner_project_role_idx"
+            ),
+            models.Index(
+                fields=["partner", "status"], name="projpartner_partner_status_idx"
+            ),
+            models.Index(fields=["role"], name="projpartner_role_idx"),
+            models.Index(fields=["status"], name="projpartner_status_idx"),
+            models.Index(
+                fields=["status", "end_date"],
+                condition=Q(status="active"),
+                name="projpartner_active_end_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.partner.name} in {self.project.name} as {self.role}"
@@ -234,9 +387,98 @@ class MOU(models.Model):
     document_url = models.TextField(max_length=500, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["-start_date"]
+        indexes = [
+            models.Index(fields=["start_date", "id"], name="mou_start_date_idx"),
+            models.Index(
+                fields=["status", "end_date"],
+                condition=Q(status="active"),
+                name="mou_active_end_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"MOU: {self.title} between {self.partner.name} and Project {self.project.name}"
+
+
+class LifecycleTransition(models.Model):
+    """
+    A status change made by the lifecycle sweeper (partners.lifecycle)
+    because a project, project partner or MOU reached its start or end date.
+    """
+
+    class ObjectType(models.TextChoices):
+        MOU = "mou", "MOU"
+        PROJECT = "project", "Project"
+        PROJECT_PARTNER = "project_partner", "Project partner"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    object_type = models.CharField(max_length=20, choices=ObjectType.choices)
+    object_id = models.UUIDField()
+    old_status = models.CharField(max_length=20)
+    new_status = models.CharField(max_length=20)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["object_type", "object_id", "-changed_at"],
+                name="lifecycle_object_idx",
+            ),
+        ]
+
+
+# ----------------------
+# PartnerSummary (read model)
+# ----------------------
+
+
+class PartnerSummary(models.Model):
+    """
+    One row per partner with everything the partner list shows, so listing
+    is a scan of this table alone. Kept up to date by partners.signals in
+    the same transaction as the write; `manage.py rebuild_partner_summaries`
+    recomputes it (see partners.summary).
+    """
+
+    partner = models.OneToOneField(
+        Partner, on_delete=models.CASCADE, primary_key=True, related_name="summary"
+    )
+    name = models.CharField(max_length=255)
+    type = models.CharField(max_length=50, choices=Partner.PartnerType.choices)
+    status = models.CharField(max_length=50, choices=Partner.PartnerStatus.choices)
+    risk_level = models.CharField(max_length=50, choices=Partner.RiskLevel.choices)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    created_by_username = models.CharField(max_length=150, null=True, blank=True)
+    department_names = models.JSONField(default=list)
+
+    document_count = models.PositiveIntegerField(default=0)
+    project_count = models.PositiveIntegerField(default=0)
+    mou_count = models.PositiveIntegerField(default=0)
+
+    # Latest StatusHistory entry.
+    last_old_status = models.CharField(max_length=50, null=True, blank=True)
+    last_new_status = models.CharField(max_length=50, null=True, blank=True)
+    last_status_changed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "partner"], name="summary_created_idx"),
+            models.Index(fields=["updated_at", "partner"], name="summary_updated_idx"),
+            models.Index(
+                fields=["status", "created_at"], name="summary_status_created_idx"
+            ),
+            models.Index(
+                fields=["type", "created_at"], name="summary_type_created_idx"
+            ),
+            models.Index(
+                fields=["risk_level", "created_at"], name="summary_risk_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Summary of {self.name}"
@@ -0,0 +1,230 @@
+"""
+Monthly partitions of StatusHistory and RiskLevelHistory (PostgreSQL only).
+
+Migration 0012 turns both tables into tables PARTITION BY RANGE (changed_at)
+with one partition per calendar month (UTC), named <table>_pYYYYMM, and a
+<table>_default partition that catches rows no month partition covers yet,
+so an insert never fails. Each partition has its own small B-tree indexes:
+new rows only touch the current month's, which stays in memory however
+much history there is, even with random UUID keys. A BRIN index on
+changed_at serves time-range scans within a partition at a few pages each.
+The primary key is (id, changed_at) in the database, as PostgreSQL requires
+the partition key in it; Django still treats `id` as the key.
+
+ensure_partitions() (manage.py history_partitions) creates the coming
+months' partitions ahead of time and moves any rows that landed in the
+default partition into the month they belong to. expire_partitions()
+applies the retention policy: whole months older than the retention window
+are detached, written to a gzipped CSV file in HISTORY_ARCHIVE_DIR and
+dropped, which costs no DELETE and leaves no bloat behind.
+
+The migration keeps its own copy of the naming below, so that changes here
+never alter what it did.
+"""
+
+import gzip
+import os
+import re
+from datetime import date, datetime, timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import RiskLevelHistory, StatusHistory
+
+HISTORY_MODELS = (StatusHistory, RiskLevelHistory)
+PARTITION_KEY = "changed_at"
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def bound(month):
+    """The timestamptz literal where `month` starts (UTC)."""
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    return f"'{start.isoformat()}'"
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def partition_month(table, name):
+    """The month partition `name` of `table` holds, or None if it's no month."""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})(\d{{2}})", name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def _tables(sql, table):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        return [name for (name,) in cursor.fetchall()]
+
+
+def attached_partitions(table):
+    return _tables(
+        """
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        ORDER BY child.relname
+        """,
+        table,
+    )
+
+
+def detached_partitions(table):
+    """Month tables left detached by an expiry that didn't finish."""
+    names = _tables(
+        """
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND relnamespace = to_regnamespace(current_schema())
+          AND relname LIKE %s AND NOT relispartition
+        ORDER BY relname
+        """,
+        table.replace("_", r"\_") + r"\_p%",
+    )
+    return [name for name in names if partition_month(table, name)]
+
+
+def ensure_partitions(months_ahead=3, today=None):
+    """
+    Create the month partitions up to `months_ahead` months from `today`,
+    and those for rows waiting in the default partition; returns their names.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    created = []
+    for model in HISTORY_MODELS:
+        table = model._meta.db_table
+        if not is_partitioned(table):
+            continue
+        existing = set(attached_partitions(table))
+        months = _default_partition_months(table)
+        this_month = month_start(today)
+        months |= {add_months(this_month, n) for n in range(months_ahead + 1)}
+        for month in sorted(months):
+            name = partition_name(table, month)
+            if name not in existing:
+                create_partition(table, month)
+                created.append(name)
+    return created
+
+
+def _default_partition_months(table):
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {quote(PARTITION_KEY)} "
+            f"AT TIME ZONE 'UTC')::date FROM {quote(default_partition_name(table))}"
+        )
+        return {month for (month,) in cursor.fetchall()}
+
+
+def create_partition(table, month):
+    """
+    Add `table`'s partition for `month`. Rows of that month already in the
+    default partition are moved into it first, as PostgreSQL requires.
+    """
+    quote = connection.ops.quote_name
+    name = partition_name(table, month)
+    lower, upper = bound(month), bound(add_months(month, 1))
+    in_month = f"{quote(PARTITION_KEY)} >= {lower} AND {quote(PARTITION_KEY)} < {upper}"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} "
+            f"(LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {quote(default_partition_name(table))} "
+            f"WHERE {in_month} RETURNING *) "
+            f"INSERT INTO {quote(name)} SELECT * FROM moved"
+        )
+        # Builds the partition's indexes and foreign keys from the parent's.
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} "
+            f"FOR VALUES FROM ({lower}) TO ({upper})"
+        )
+
+
+def expired_partitions(retain_months, today=None):
+    """
+    (table, partition) pairs wholly older than the last `retain_months`
+    months, the current one included, plus any left detached.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = add_months(month_start(today), -(retain_months - 1))
+    expired = []
+    for model in HISTORY_MODELS:
+        table = model._meta.db_table
+        if not is_partitioned(table):
+            continue
+        for name in attached_partitions(table) + detached_partitions(table):
+            month = partition_month(table, name)
+            if month is not None and month < cutoff:
+                expired.append((table, name))
+    return expired
+
+
+def expire_partitions(retain_months, archive_dir=None, today=None):
+    """
+    Detach, archive and drop the partitions older than the retention
+    window; returns the archive files written.
+    """
+    archive_dir = archive_dir or settings.HISTORY_ARCHIVE_DIR
+    os.makedirs(archive_dir, exist_ok=True)
+    quote = connection.ops.quote_name
+    archives = []
+    for table, name in expired_partitions(retain_months, today):
+        if name in attached_partitions(table):
+            # Readers stop seeing the month here; the copy below runs
+            # without holding a lock on the parent table.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}"
+                )
+        path = archive_partition(name, archive_dir)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {quote(name)}")
+        archives.append(path)
+    return archives
+
+
+def archive_partition(name, archive_dir):
+    """Write table `name` to <archive_dir>/<name>.csv.gz; returns the path."""
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor, open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+            with cursor.cursor.copy(
+                f"COPY {quote(name)} TO STDOUT WITH (FORMAT csv, HEADER)"
+            ) as copy:
+                for data in copy:
+                    archive.write(data)
+        raw.flush()
+        os.fsync(raw.fileno())
+    # Only complete archives get the final name, and only then is the
+    # table dropped.
+    os.replace(partial, path)
+    return path
@@ -1,6 +1,8 @@
 from rest_framework import permissions
 
-from rest_framework import permissions
+from users.scope import aget_department_ids, get_department_ids
+
+from .models import PartnerDepartment, Project
 
 
 class IsSysAdminOrDepartmentUser(permissions.BasePermission):
@@ -9,6 +11,11 @@ class IsSysAdminOrDepartmentUser(permissions.BasePermission):
     - SysAdmin can do everything
     - Authenticated department users can create partners
     - Object-level: department users can update/delete only if partner is linked to their department
+
+    The user's department IDs are resolved once per request (see
+    users.scope); the object check is done in memory when the partner's
+    departments are prefetched, otherwise with a single EXISTS query.
+    The `a`-prefixed methods are the same checks for async views.
     """
 
     def has_permission(self, request, view):
@@ -17,8 +24,8 @@ class IsSysAdminOrDepartmentUser(permissions.BasePermission):
         if getattr(request.user, "is_sys_admin", False):
             return True
         # Allow any authenticated department user to create
-        if view.action == "create":
-            return request.user.departments.exists()
+        if view.action in ["create", "bulk_import"]:
+            return bool(get_department_ids(request.user))
         # Allow listing for any authenticated user (optional)
         if view.action in ["list"]:
             return True
@@ -29,4 +36,43 @@ class IsSysAdminOrDepartmentUser(permissions.BasePermission):
         if getattr(request.user, "is_sys_admin", False):
             return True
         # Only department users whose departments are linked to the partner
-        return bool(request.user.departments.all().intersection(obj.departments.all()))
+        department_ids = get_department_ids(request.user)
+        if not department_ids:
+            return False
+
+        prefetched = getattr(obj, "_prefetched_objects_cache", {})
+        if "departments" in prefetched:
+            return any(d.id in department_ids for d in prefetched["departments"])
+        return self.department_links(obj, department_ids).exists()
+
+    async def ahas_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        if getattr(request.user, "is_sys_admin", False):
+            return True
+        if view.action in ["create", "bulk_import"]:
+            return bool(await aget_department_ids(request.user))
+        return True
+
+    async def ahas_object_permission(self, request, view, obj):
+        if getattr(request.user, "is_sys_admin", False):
+            return True
+        department_ids = await aget_department_ids(request.user)
+        if not department_ids:
+            return False
+
+        prefetched = getattr(obj, "_prefetched_objects_cache", {})
+        if "departments" in prefetched:
+            return any(d.id in department_ids for d in prefetched["departments"])
+        return await self.department_links(obj, department_ids).aexists()
+
+    def department_links(self, obj, department_ids):
+        if isinstance(obj, Project):
+            links = PartnerDepartment.objects.filter(
+                partner__project_partners__project_id=obj.pk
+            )
+        else:
+            # Partner, or anything hanging off a partner (documents, MOUs, ...)
+            partner_id = getattr(obj, "partner_id", obj.pk)
+            links = PartnerDepartment.objects.filter(partner_id=partner_id)
+        return links.filter(department_id__in=department_ids)
@@ -0,0 +1,146 @@
+from functools import lru_cache
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+from rest_framework.filters import SearchFilter
+
+from .models import MOU, Partner, PartnerSummary, Project
+
+RANK_ANNOTATION = "search_rank"
+
+# Model -> (title field used for trigram similarity, related models whose
+# matches also count, e.g. an MOU matches when its partner's name does).
+# The indexed text itself is defined by the triggers in migration 0006.
+SEARCH_INDEX = {
+    Partner: ("name", ()),
+    Project: ("name", ()),
+    MOU: ("title", ("partner", "project")),
+}
+
+# Read models searched through the model they summarize: model -> the
+# relation to it. Their primary key is the summarized row's.
+SEARCH_THROUGH = {
+    PartnerSummary: "partner",
+}
+
+
+@lru_cache(maxsize=None)
+def _has_trigram(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+@lru_cache(maxsize=None)
+def _has_fts_table(alias, table):
+    return table in connections[alias].introspection.table_names()
+
+
+def _fts_table(model):
+    return f"{model._meta.db_table}_fts"
+
+
+def _fts_match(text):
+    # Quote every term so FTS5 operators in user input are taken literally;
+    # the trailing * makes each term a prefix match.
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
+def _indexed_model(model):
+    """(model whose index is searched, lookup prefix from `model` to it)"""
+    through = SEARCH_THROUGH.get(model)
+    if through is None:
+        return model, ""
+    return model._meta.get_field(through).related_model, f"{through}__"
+
+
+def is_indexed(model, alias):
+    model, _ = _indexed_model(model)
+    vendor = connections[alias].vendor
+    if model not in SEARCH_INDEX:
+        return False
+    if vendor == "postgresql":
+        return True
+    if vendor == "sqlite":
+        return _has_fts_table(alias, _fts_table(model))
+    return False
+
+
+def _postgres_match(model, text, alias, prefix=""):
+    title_field, _ = SEARCH_INDEX[model]
+    query = SearchQuery(text, config="simple", search_type="websearch")
+    condition = Q(**{f"{prefix}search_vector": query})
+    rank = SearchRank(F(f"{prefix}search_vector"), query)
+    if _has_trigram(alias):
+        condition |= Q(**{f"{prefix}{title_field}__trigram_similar": text})
+        rank = rank + TrigramSimilarity(f"{prefix}{title_field}", text)
+    return condition, rank
+
+
+def _sqlite_match(model, text, outer):
+    # `outer` is the queryset's model; its pk holds the indexed row's id.
+    table = outer._meta.db_table
+    column = outer._meta.pk.column
+    fts = _fts_table(model)
+    match = _fts_match(text)
+    ids = RawSQL(f"SELECT id FROM {fts} WHERE {fts} MATCH %s", [match])
+    # bm25() is lower-is-better; negate so higher ranks sort first.
+    rank = RawSQL(
+        f"SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s "
+        f"AND {fts}.id = {table}.{column}",
+        [match],
+        output_field=FloatField(),
+    )
+    return Q(pk__in=ids), rank
+
+
+def match(model, text, alias):
+    """Return (condition, rank expression) for rows of `model` matching `text`."""
+    indexed, prefix = _indexed_model(model)
+    if connections[alias].vendor == "postgresql":
+        condition, rank = _postgres_match(indexed, text, alias, prefix)
+    else:
+        condition, rank = _sqlite_match(indexed, text, model)
+
+    _, related = SEARCH_INDEX[indexed]
+    for name in related:
+        related_model = indexed._meta.get_field(name).related_model
+        related_condition, _ = match(related_model, text, alias)
+        matching = related_model._default_manager.filter(related_condition)
+        condition |= Q(**{f"{prefix}{name}__in": matching.values("pk")})
+    return condition, rank
+
+
+class RankedSearchFilter(SearchFilter):
+    """
+    Full-text search ranked by relevance.
+
+    - PostgreSQL: trigger-maintained `search_vector` (GIN index) matched with
+      websearch_to_tsquery, OR'ed with pg_trgm similarity on the title field
+      when the extension is installed.
+    - SQLite: an FTS5 shadow table kept in sync by triggers, ranked by bm25.
+    - Anything else (or models without an index) falls back to the regular
+      icontains SearchFilter.
+
+    Matches are annotated with `search_rank`; the paginator orders by it
+    unless the client asked for an explicit ?ordering=.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not is_indexed(queryset.model, queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        condition, rank = match(queryset.model, " ".join(terms), queryset.db)
+        # ts_rank() is float4; cast so the value survives the round trip
+        # through a pagination cursor exactly.
+        rank = Cast(Coalesce(rank, Value(0.0)), FloatField())
+        return queryset.filter(condition).annotate(**{RANK_ANNOTATION: rank})
@@ -1,19 +1,28 @@
 from rest_framework import serializers
 from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
 
 from .models import (
+    DocumentUpload,
     Partner,
     PartnerDocument,
     PartnerProfile,
     StatusHistory,
     RiskLevelHistory,
     PartnerDepartment,
+    PartnerSummary,
     Project,
     ProjectPartner,
     MOU,
 )
 from users.models import Department
 
+from .blobs import blob_url, get_blob, store_blob
+from .downloads import storage_name
+from .filters import DepartmentScopeFilter
+from .uploads import missing_ranges, received_ranges
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -51,30 +60,125 @@ class PartnerProfileSerializer(serializers.ModelSerializer):
 class PartnerDocumentSerializer(serializers.ModelSerializer):
     uploaded_by = serializers.StringRelatedField(read_only=True)  # shows username
     file = serializers.FileField(write_only=True, required=False)
+    # For stored files, the download action rather than their /media/ path.
     file_url = serializers.URLField(required=False)
+    # Sending only the sha256 of a stored file the caller can already see
+    # attaches it without uploading it again.
+    sha256 = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$", source="blob.sha256", required=False, allow_null=True
+    )
+    size = serializers.IntegerField(source="blob.size", read_only=True, allow_null=True)
+    content_type = serializers.CharField(
+        source="blob.content_type", read_only=True, allow_null=True
+    )
+    # Permission-checked; /media/ is not served publicly.
+    download_url = serializers.SerializerMethodField()
 
     class Meta:
         model = PartnerDocument
-        fields = ["id", "file_type", "file", "file_url", "uploaded_by", "uploaded_at"]
+        fields = [
+            "id",
+            "file_type",
+            "file",
+            "file_url",
+            "file_name",
+            "sha256",
+            "size",
+            "content_type",
+            "download_url",
+            "uploaded_by",
+            "uploaded_at",
+        ]
+
+    def get_download_url(self, obj):
+        return reverse("documents-download", args=[obj.pk])
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if storage_name(instance) is not None:
+            data["file_url"] = data["download_url"]
+        return data
+
+    def visible_documents(self):
+        """Documents of the partners the requesting user may see."""
+        return DepartmentScopeFilter().filter_queryset(
+            self.context["request"],
+            PartnerDocument.objects.all(),
+            self.context.get("view"),
+        )
 
     def validate(self, attrs):
         # Custom validation logic
-        if not attrs.get("file") and not attrs.get("file_url"):
-            raise serializers.ValidationError("You must provide a file or a file_url.")
+        if (
+            not attrs.get("file")
+            and not attrs.get("file_url")
+            and not attrs.get("blob", {}).get("sha256")
+        ):
+            raise serializers.ValidationError(
+                "You must provide a file, a file_url or the sha256 of a stored file."
+            )
 
         return attrs
 
     def create(self, validated_data):
         file = validated_data.pop("file", None)
+        sha256 = (validated_data.pop("blob", None) or {}).get("sha256")
+
+        with transaction.atomic():
+            # Referenced before the blob row lock is released (partners.blobs).
+            if file:
+                blob = store_blob(file)
+                validated_data.setdefault("file_name", file.name)
+            elif sha256:
+                # The checksum alone grants nothing: the file must already be
+                # attached to a document the caller can see. Same answer
+                # either way, so it can't tell whether others stored it.
+                visible = self.visible_documents().filter(blob_id=sha256.lower())
+                blob = get_blob(sha256) if visible.exists() else None
+                if blob is None:
+                    raise serializers.ValidationError(
+                        {"sha256": "No document you can see has this file; upload it."}
+                    )
+            else:
+                blob = None
+            if blob is not None:
+                validated_data["blob"] = blob
+                validated_data["file_url"] = blob_url(blob)
+
+            validated_data["uploaded_by"] = self.context["request"].user
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        # The stored file of a document is fixed once created.
+        validated_data.pop("blob", None)
+        return super().update(instance, validated_data)
+
+
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    """A resumable upload (partners.uploads) and which bytes it still needs."""
+
+    received = serializers.SerializerMethodField()
+    missing = serializers.SerializerMethodField()
 
-        if file:
-            from django.core.files.storage import default_storage
+    class Meta:
+        model = DocumentUpload
+        fields = [
+            "id",
+            "file_name",
+            "file_type",
+            "size",
+            "received",
+            "missing",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "created_at", "updated_at"]
 
-            path = default_storage.save(f"partner_documents/{file.name}", file)
-            validated_data["file_url"] = default_storage.url(path)
+    def get_received(self, obj):
+        return sum(end - start for start, end in received_ranges(obj.chunks.all()))
 
-        validated_data["uploaded_by"] = self.context["request"].user
-        return super().create(validated_data)
+    def get_missing(self, obj):
+        return missing_ranges(obj.size, received_ranges(obj.chunks.all()))
 
 
 class StatusHistorySerializer(serializers.ModelSerializer):
@@ -83,6 +187,7 @@ class StatusHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = StatusHistory
         fields = ["id", "old_status", "new_status", "changed_by", "changed_at"]
+        ordering = ["-changed_at"]  # used when prefetched into PartnerDetailSerializer
 
 
 class RiskLevelHistorySerializer(serializers.ModelSerializer):
@@ -91,6 +196,7 @@ class RiskLevelHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = RiskLevelHistory
         fields = ["id", "old_risk", "new_risk", "changed_by", "changed_at"]
+        ordering = ["-changed_at"]
 
 
 class PartnerSerializer(serializers.ModelSerializer):
@@ -116,6 +222,50 @@ class PartnerSerializer(serializers.ModelSerializer):
         return Partner.objects.create(created_by=user, **validated_data)
 
 
+class PartnerSummarySerializer(serializers.ModelSerializer):
+    """
+    The partner list, read from PartnerSummary: PartnerSerializer's fields
+    plus document/project/MOU counts and the latest status change.
+    """
+
+    id = serializers.UUIDField(source="partner_id", read_only=True)
+    created_by = serializers.CharField(source="created_by_username", read_only=True)
+    departments = serializers.ListField(
+        source="department_names", child=serializers.CharField(), read_only=True
+    )
+    last_status_change = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PartnerSummary
+        fields = [
+            "id",
+            "name",
+            "type",
+            "status",
+            "risk_level",
+            "created_by",
+            "departments",
+            "created_at",
+            "updated_at",
+            "document_count",
+            "project_count",
+            "mou_count",
+            "last_status_change",
+        ]
+        read_only_fields = fields
+
+    def get_last_status_change(self, obj):
+        if obj.last_status_changed_at is None:
+            return None
+        return {
+            "old_status": obj.last_old_status,
+            "new_status": obj.last_new_status,
+            "changed_at": serializers.DateTimeField().to_representation(
+                obj.last_status_changed_at
+            ),
+        }
+
+
 # ----------------------
 # Nested Serializer: Partner with Profile & Documents
 # ----------------------
@@ -162,6 +312,7 @@ class PartnerDepartmentDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = PartnerDepartment
         fields = ["id", "department", "assigned_at"]
+        select_related = ["department"]  # read by get_department
 
     def get_department(self, obj):
         return {"id": str(obj.department.id), "name": obj.department.name}
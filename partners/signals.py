@@ -0,0 +1,220 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from users.models import Department, User
+
+from . import summary
+from .cache import invalidate_partner_detail
+from .models import (
+    MOU,
+    Partner,
+    PartnerDepartment,
+    PartnerDocument,
+    PartnerProfile,
+    ProjectPartner,
+    RiskLevelHistory,
+    StatusHistory,
+)
+
+
+def bump_partner_detail(*partner_ids):
+    """
+    Invalidate now and again once the surrounding transaction commits, so a
+    request that reads in between can't cache pre-commit data under the
+    fresh version.
+    """
+    invalidate_partner_detail(*partner_ids)
+    transaction.on_commit(lambda: invalidate_partner_detail(*partner_ids))
+
+
+@receiver(pre_save, sender=PartnerDocument)
+@receiver(pre_save, sender=MOU)
+@receiver(pre_save, sender=ProjectPartner)
+def remember_partner(sender, instance, **kwargs):
+    """Note which partner an existing row belongs to before it is saved."""
+    if instance._state.adding:
+        return
+    instance._saved_partner_id = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("partner_id", flat=True)
+        .first()
+    )
+
+
+def moved_from(instance):
+    """The partner an update moved `instance` away from, or None."""
+    old = getattr(instance, "_saved_partner_id", None)
+    return old if old is not None and old != instance.partner_id else None
+
+
+@receiver(post_save, sender=Partner)
+@receiver(post_delete, sender=Partner)
+def partner_changed(sender, instance, **kwargs):
+    bump_partner_detail(instance.pk)
+
+
+@receiver(post_save, sender=PartnerProfile)
+@receiver(post_delete, sender=PartnerProfile)
+@receiver(post_save, sender=PartnerDocument)
+@receiver(post_delete, sender=PartnerDocument)
+@receiver(post_save, sender=StatusHistory)
+@receiver(post_delete, sender=StatusHistory)
+@receiver(post_save, sender=RiskLevelHistory)
+@receiver(post_delete, sender=RiskLevelHistory)
+@receiver(post_save, sender=PartnerDepartment)
+@receiver(post_delete, sender=PartnerDepartment)
+def partner_part_changed(sender, instance, **kwargs):
+    bump_partner_detail(instance.partner_id)
+    if sender is PartnerDocument and (old := moved_from(instance)):
+        bump_partner_detail(old)
+
+
+@receiver(m2m_changed, sender=PartnerDepartment)
+def partner_departments_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """partner.departments.add/remove/set/clear and department.partners.*"""
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+    if not reverse:
+        bump_partner_detail(instance.pk)
+    elif action == "pre_clear":
+        bump_partner_detail(*instance.partners.values_list("id", flat=True))
+    elif pk_set:
+        bump_partner_detail(*pk_set)
+
+
+@receiver(post_save, sender=Department)
+def department_renamed(sender, instance, created, **kwargs):
+    # The detail payload shows department names.
+    if not created:
+        bump_partner_detail(*instance.partners.values_list("id", flat=True))
+
+
+def partners_naming(user):
+    """Ids of the partners whose detail payload shows `user`'s username."""
+    return (
+        Partner.objects.filter(created_by=user)
+        .values_list("id", flat=True)
+        .union(
+            PartnerDocument.objects.filter(uploaded_by=user).values_list(
+                "partner_id", flat=True
+            ),
+            StatusHistory.objects.filter(changed_by=user).values_list(
+                "partner_id", flat=True
+            ),
+            RiskLevelHistory.objects.filter(changed_by=user).values_list(
+                "partner_id", flat=True
+            ),
+        )
+    )
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    bump_partner_detail(*partners_naming(instance))
+
+
+@receiver(pre_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Looked up before SET_NULL clears the references, without signals.
+    bump_partner_detail(*partners_naming(instance))
+
+
+# ----------------------
+# Partner list read model (partners.summary)
+# ----------------------
+
+
+@receiver(post_save, sender=Partner)
+def summary_partner_saved(sender, instance, created, **kwargs):
+    summary.partner_saved(instance, created)
+
+
+@receiver(post_save, sender=PartnerDocument)
+@receiver(post_delete, sender=PartnerDocument)
+@receiver(post_save, sender=MOU)
+@receiver(post_delete, sender=MOU)
+def summary_counted_row_changed(sender, instance, created=None, **kwargs):
+    field = "document_count" if sender is PartnerDocument else "mou_count"
+    if created is None:
+        summary.adjust_count(instance.partner_id, field, -1)
+    elif created:
+        summary.adjust_count(instance.partner_id, field, 1)
+    elif old := moved_from(instance):
+        # Reassigned to another partner (e.g. PATCH {"partner": ...}).
+        summary.adjust_count(old, field, -1)
+        summary.adjust_count(instance.partner_id, field, 1)
+
+
+@receiver(post_save, sender=ProjectPartner)
+@receiver(post_delete, sender=ProjectPartner)
+def summary_project_link_changed(sender, instance, **kwargs):
+    summary.refresh_project_count(instance.partner_id)
+    if old := moved_from(instance):
+        summary.refresh_project_count(old)
+
+
+@receiver(post_save, sender=StatusHistory)
+def summary_status_changed(sender, instance, created, **kwargs):
+    if created:
+        summary.status_changed(instance)
+
+
+@receiver(post_delete, sender=StatusHistory)
+def summary_status_deleted(sender, instance, **kwargs):
+    summary.refresh_last_status(instance.partner_id)
+
+
+@receiver(post_save, sender=PartnerDepartment)
+@receiver(post_delete, sender=PartnerDepartment)
+def summary_department_link_changed(sender, instance, **kwargs):
+    summary.refresh_department_names(instance.partner_id)
+
+
+@receiver(m2m_changed, sender=PartnerDepartment)
+def summary_departments_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+    if not reverse:
+        if action != "pre_clear":
+            summary.refresh_department_names(instance.pk)
+    elif action == "pre_clear":
+        # department.partners.clear(): remember who to refresh afterwards.
+        instance._summary_partner_ids = list(
+            instance.partners.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        summary.refresh_department_names(
+            *instance.__dict__.pop("_summary_partner_ids", ())
+        )
+    elif pk_set:
+        summary.refresh_department_names(*pk_set)
+
+
+@receiver(post_save, sender=Department)
+def summary_department_renamed(sender, instance, created, **kwargs):
+    if not created:
+        summary.refresh_department_names(
+            *instance.partners.values_list("id", flat=True)
+        )
+
+
+@receiver(post_save, sender=User)
+def summary_creator_saved(sender, instance, created, update_fields, **kwargs):
+    # Skips saves that can't have renamed the user, e.g. last_login on login.
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    summary.creator_renamed(instance)
+
+
+@receiver(pre_delete, sender=User)
+def summary_creator_deleted(sender, instance, **kwargs):
+    summary.creator_deleted(instance)
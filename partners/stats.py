@@ -0,0 +1,199 @@
+"""
+Aggregates behind /api/partners/stats/ and /api/projects/stats/.
+
+Every count is a COUNT(...) FILTER (WHERE ...) over one scan, so a
+breakdown by type, status and risk level costs one query overall and one
+GROUP BY department query, however many partners there are. On PostgreSQL
+the unfiltered partner breakdown can instead be read from the
+partners_partner_stats materialized view (migration 0008), refreshed by
+`manage.py refresh_stats_views`.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from users.scope import get_department_ids
+
+from .models import MOU, Partner, PartnerDepartment, Project
+
+MATERIALIZED_VIEW = "partners_partner_stats"
+STATS_KEY = "partners:stats:{kind}:{digest}"
+
+# Response key -> (Partner field, choices)
+PARTNER_DIMENSIONS = {
+    "by_type": ("type", Partner.PartnerType.choices),
+    "by_status": ("status", Partner.PartnerStatus.choices),
+    "by_risk_level": ("risk_level", Partner.RiskLevel.choices),
+}
+
+
+def _counts(dimensions, prefix=""):
+    """{"total": COUNT(*), "<key>:<value>": COUNT(*) FILTER (...), ...}"""
+    pk = f"{prefix}pk"
+    aggregates = {"total": Count(pk)}
+    for key, (field, choices) in dimensions.items():
+        for value, _ in choices:
+            aggregates[f"{key}:{value}"] = Count(
+                pk, filter=Q(**{f"{prefix}{field}": value})
+            )
+    return aggregates
+
+
+def _nest(row, dimensions):
+    """Turn the flat "<key>:<value>" columns of `row` into nested dicts."""
+    result = {"total": row["total"]}
+    for key, (_, choices) in dimensions.items():
+        result[key] = {value: row[f"{key}:{value}"] for value, _ in choices}
+    return result
+
+
+def _empty(dimensions):
+    return {
+        "total": 0,
+        **{
+            key: {value: 0 for value, _ in choices}
+            for key, (_, choices) in dimensions.items()
+        },
+    }
+
+
+def partner_stats(partners, department_ids=None):
+    """
+    Counts of `partners` by type, status and risk level, overall and per
+    department. `department_ids` limits the per-department breakdown (None
+    means every department).
+    """
+    stats = _nest(partners.aggregate(**_counts(PARTNER_DIMENSIONS)), PARTNER_DIMENSIONS)
+
+    links = PartnerDepartment.objects.filter(partner__in=partners.values("pk"))
+    if department_ids is not None:
+        links = links.filter(department_id__in=department_ids)
+    rows = (
+        links.order_by("department__name")
+        .values("department_id", "department__name")
+        .annotate(**_counts(PARTNER_DIMENSIONS, prefix="partner__"))
+    )
+    stats["departments"] = [
+        {
+            "id": str(row["department_id"]),
+            "name": row["department__name"],
+            **_nest(row, PARTNER_DIMENSIONS),
+        }
+        for row in rows
+    ]
+    stats["generated_at"] = timezone.now()
+    return stats
+
+
+def project_stats(projects, mous, today=None):
+    """Projects per status, MOUs per status and currently active/expired."""
+    today = today or timezone.localdate()
+    project_dimensions = {"by_status": ("status", Project.STATUS_CHOICES)}
+    mou_dimensions = {"by_status": ("status", MOU.STATUS_CHOICES)}
+
+    stats = _nest(projects.aggregate(**_counts(project_dimensions)), project_dimensions)
+    mou_row = mous.aggregate(
+        **_counts(mou_dimensions),
+        # Running today, or past its end date but never marked expired.
+        active=Count(
+            "pk",
+            filter=Q(status="active", start_date__lte=today, end_date__gte=today),
+        ),
+        expired=Count(
+            "pk", filter=Q(status="expired") | Q(status="active", end_date__lt=today)
+        ),
+    )
+    stats["mous"] = {
+        **_nest(mou_row, mou_dimensions),
+        "active": mou_row["active"],
+        "expired": mou_row["expired"],
+    }
+    stats["generated_at"] = timezone.now()
+    return stats
+
+
+def cached_stats(kind, request, compute):
+    """
+    compute() cached for STATS_CACHE_TIMEOUT seconds per scope (all data for
+    sys admins, else the caller's departments) and query string. Entries
+    are not invalidated; a dashboard can be that far behind.
+    """
+    user = request.user
+    if getattr(user, "is_sys_admin", False):
+        scope = "all"
+    else:
+        scope = ",".join(sorted(str(pk) for pk in get_department_ids(user)))
+    query = sorted(request.query_params.lists())
+    digest = hashlib.sha256(f"{scope}?{query}".encode()).hexdigest()
+    key = STATS_KEY.format(kind=kind, digest=digest)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute()
+        cache.set(key, stats, settings.STATS_CACHE_TIMEOUT)
+    return stats
+
+
+# ----------------------
+# PostgreSQL materialized view
+# ----------------------
+
+
+def has_materialized_view():
+    return (
+        connection.vendor == "postgresql"
+        and MATERIALIZED_VIEW
+        in connection.introspection.table_names(include_views=True)
+    )
+
+
+def materialized_partner_stats():
+    """
+    partner_stats() for every partner, read from the materialized view as of
+    its last refresh.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT s.department_id, d.name, s.type, s.status, s.risk_level,
+                   s.partners, s.refreshed_at
+            FROM {MATERIALIZED_VIEW} s
+            LEFT JOIN users_department d ON d.id = s.department_id
+            ORDER BY d.name
+            """)
+        rows = cursor.fetchall()
+
+    stats = _empty(PARTNER_DIMENSIONS)
+    stats["departments"] = []
+    stats["generated_at"] = None
+    departments = {}
+    for department_id, name, type_, status, risk_level, count, refreshed_at in rows:
+        stats["generated_at"] = refreshed_at
+        if department_id is None:
+            target = stats
+        else:
+            target = departments.get(department_id)
+            if target is None:
+                target = {
+                    "id": str(department_id),
+                    "name": name,
+                    **_empty(PARTNER_DIMENSIONS),
+                }
+                departments[department_id] = target
+                stats["departments"].append(target)
+        target["total"] += count
+        for key, value in (
+            ("by_type", type_),
+            ("by_status", status),
+            ("by_risk_level", risk_level),
+        ):
+            target[key][value] = target[key].get(value, 0) + count
+    return stats
+
+
+def refresh_materialized_views():
+    with connection.cursor() as cursor:
+        cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {MATERIALIZED_VIEW}")
@@ -0,0 +1,212 @@
+"""
+Maintenance of the PartnerSummary read model.
+
+partners.signals calls the incremental functions below as rows are
+written, so the summary changes in the same transaction as the write that
+caused it; the API's writes each run in one (partners.views.AtomicWriteMixin
+and the transition actions). Each is a single UPDATE (the counts and the latest status are
+computed by subqueries inside it). Bulk writes send no signals; their
+callers refresh the affected partners with refresh_summaries().
+rebuild_summaries() recomputes every row, for backfills and to repair
+drift (manage.py rebuild_partner_summaries).
+"""
+
+from django.apps import apps as global_apps
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+# Columns copied verbatim from Partner.
+PARTNER_FIELDS = ("name", "type", "status", "risk_level", "created_at", "updated_at")
+SUMMARY_FIELDS = PARTNER_FIELDS + (
+    "created_by_username",
+    "department_names",
+    "document_count",
+    "project_count",
+    "mou_count",
+    "last_old_status",
+    "last_new_status",
+    "last_status_changed_at",
+)
+
+
+def _model(name, apps=global_apps):
+    return apps.get_model("partners", name)
+
+
+def _count(queryset, field="pk"):
+    """COUNT(DISTINCT field) of `queryset` per partner, as a subquery."""
+    counts = (
+        queryset.filter(partner_id=OuterRef("pk"))
+        .order_by()
+        .values("partner_id")
+        .annotate(n=Count(field, distinct=True))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def _counts(apps=global_apps):
+    return {
+        "document_count": _count(_model("PartnerDocument", apps).objects.all()),
+        # A partner can have several roles in the same project.
+        "project_count": _count(
+            _model("ProjectPartner", apps).objects.all(), "project"
+        ),
+        "mou_count": _count(_model("MOU", apps).objects.all()),
+    }
+
+
+def _last_status(apps=global_apps):
+    latest = (
+        _model("StatusHistory", apps)
+        .objects.filter(partner_id=OuterRef("pk"))
+        .order_by("-changed_at", "-id")
+    )
+    return {
+        "last_old_status": Subquery(latest.values("old_status")[:1]),
+        "last_new_status": Subquery(latest.values("new_status")[:1]),
+        "last_status_changed_at": Subquery(latest.values("changed_at")[:1]),
+    }
+
+
+def _department_names(partner_ids, apps=global_apps):
+    links = (
+        _model("PartnerDepartment", apps)
+        .objects.filter(partner_id__in=partner_ids)
+        .order_by("department__name")
+        .values_list("partner_id", "department__name")
+    )
+    names = {}
+    for partner_id, name in links:
+        names.setdefault(partner_id, []).append(name)
+    return names
+
+
+def refresh_summaries(partner_ids, apps=global_apps):
+    """Recompute (upsert) the summary rows of `partner_ids`."""
+    Partner = _model("Partner", apps)
+    PartnerSummary = _model("PartnerSummary", apps)
+    partner_ids = list(partner_ids)
+    if not partner_ids:
+        return 0
+    rows = (
+        Partner.objects.filter(pk__in=partner_ids)
+        .annotate(
+            created_by_username=F("created_by__username"),
+            **_counts(apps),
+            **_last_status(apps),
+        )
+        .values(
+            "pk", *(field for field in SUMMARY_FIELDS if field != "department_names")
+        )
+    )
+    names = _department_names(partner_ids, apps)
+    summaries = []
+    for row in rows:
+        partner_id = row.pop("pk")
+        summaries.append(
+            PartnerSummary(
+                partner_id=partner_id,
+                department_names=names.get(partner_id, []),
+                **row,
+            )
+        )
+    PartnerSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["partner"],
+        update_fields=list(SUMMARY_FIELDS),
+    )
+    return len(summaries)
+
+
+def rebuild_summaries(batch_size=1000, apps=global_apps):
+    """Recompute every summary row, `batch_size` partners at a time."""
+    Partner = _model("Partner", apps)
+    PartnerSummary = _model("PartnerSummary", apps)
+    total = 0
+    batch = []
+    for partner_id in (
+        Partner.objects.order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=batch_size)
+    ):
+        batch.append(partner_id)
+        if len(batch) >= batch_size:
+            total += refresh_summaries(batch, apps)
+            batch = []
+    total += refresh_summaries(batch, apps)
+    # Left behind by raw deletes that bypassed the cascade.
+    PartnerSummary.objects.exclude(partner__in=Partner.objects.all()).delete()
+    return total
+
+
+# ----------------------
+# Incremental updates (partners.signals)
+# ----------------------
+
+
+def _summaries(partner_id):
+    return _model("PartnerSummary").objects.filter(pk=partner_id)
+
+
+def partner_saved(partner, created):
+    values = {field: getattr(partner, field) for field in PARTNER_FIELDS}
+    if created:
+        # Whoever created the partner usually passed created_by in, so this
+        # reads the cached instance rather than the database.
+        creator = partner.created_by
+        _model("PartnerSummary").objects.create(
+            partner_id=partner.pk,
+            created_by_username=creator.username if creator else None,
+            **values,
+        )
+        return
+    User = partner._meta.get_field("created_by").related_model
+    values["created_by_username"] = Subquery(
+        User.objects.filter(pk=partner.created_by_id).values("username")[:1]
+    )
+    if not _summaries(partner.pk).update(**values):
+        # A partner that predates the read model.
+        refresh_summaries([partner.pk])
+
+
+def adjust_count(partner_id, field, delta):
+    _summaries(partner_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def refresh_project_count(partner_id):
+    _summaries(partner_id).update(project_count=_counts()["project_count"])
+
+
+def status_changed(history):
+    _summaries(history.partner_id).update(
+        last_old_status=history.old_status,
+        last_new_status=history.new_status,
+        last_status_changed_at=history.changed_at,
+    )
+
+
+def refresh_last_status(partner_id):
+    _summaries(partner_id).update(**_last_status())
+
+
+def refresh_department_names(*partner_ids):
+    names = _department_names(partner_ids)
+    for partner_id in set(partner_ids):
+        _summaries(partner_id).update(department_names=names.get(partner_id, []))
+
+
+def creator_renamed(user):
+    PartnerSummary = _model("PartnerSummary")
+    PartnerSummary.objects.filter(partner__created_by=user).update(
+        created_by_username=user.username
+    )
+
+
+def creator_deleted(user):
+    # Partner.created_by is SET_NULL by an UPDATE that sends no signals.
+    PartnerSummary = _model("PartnerSummary")
+    PartnerSummary.objects.filter(partner__created_by=user).update(
+        created_by_username=None
+    )
@@ -0,0 +1,51 @@
+"""Background jobs of the partners app (see jobs.registry)."""
+
+import csv
+from datetime import datetime, time, timedelta
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import enqueue, task
+
+from . import lifecycle
+from .bulk import PartnerImporter, iter_rows
+
+IMPORT_TASK = "partners.import"
+SWEEP_TASK = "partners.sweep_lifecycle"
+
+
+# Rows already written by a failed attempt would be imported twice.
+@task(IMPORT_TASK, max_attempts=1)
+def import_partners(job):
+    """PartnerViewSet.bulk_import with background=true, on the saved file."""
+    name = job.payload["file"]
+    try:
+        if job.created_by is None:
+            raise ValueError("The user who started the import no longer exists.")
+        importer = PartnerImporter(job.created_by, batch_size=job.payload["batch_size"])
+        with default_storage.open(name, "rb") as upload:
+            try:
+                return importer.run(iter_rows(upload, job.payload["format"]))
+            except (UnicodeDecodeError, csv.Error) as exc:
+                raise ValueError(f"Could not read file: {exc}") from exc
+    finally:
+        default_storage.delete(name)
+
+
+@task(SWEEP_TASK)
+def sweep_lifecycle(job):
+    """The daily lifecycle sweep; returns the rows changed per transition."""
+    # Queued first, so a failing sweep doesn't end the schedule.
+    schedule_sweep()
+    return lifecycle.sweep()
+
+
+def schedule_sweep():
+    """Queue the next sweep for shortly after local midnight, unless one is queued."""
+    if Job.objects.filter(name=SWEEP_TASK, status=Job.Status.QUEUED).exists():
+        return None
+    tomorrow = timezone.localdate() + timedelta(days=1)
+    run_at = timezone.make_aware(datetime.combine(tomorrow, time(0, 5)))
+    return enqueue(SWEEP_TASK, run_at=run_at)
@@ -1,3 +1,1227 @@
-from django.test import TestCase
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from jobs.models import Job
+from strategybackend import schema
+from users.models import Department, User
+
+from .cache import stats as detail_cache_stats
+from .models import (
+    MOU,
+    DocumentBlob,
+    DocumentUpload,
+    LifecycleTransition,
+    Partner,
+    PartnerDocument,
+    PartnerProfile,
+    PartnerSummary,
+    Project,
+    ProjectPartner,
+    RiskLevelHistory,
+    StatusHistory,
+)
+from .downloads import storage_name
+from .lifecycle import pending, sweep
+from .partitions import attached_partitions, ensure_partitions, expire_partitions
+from .summary import rebuild_summaries
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        # Scope and detail caches outlive the rolled-back rows.
+        cache.clear()
+        self.admin = User.objects.create_user(
+            "admin", "admin@example.com", "pw123456", is_sys_admin=True
+        )
+
+    def api(self, user=None):
+        client = APIClient()
+        # A fresh instance per client, as each request loads its own user.
+        client.force_authenticate(User.objects.get(pk=(user or self.admin).pk))
+        return client
+
+    def follow(self, url, user=None):
+        """Every result of a paginated list, following `next` links."""
+        client, results = self.api(user), []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            results += response.data["results"]
+            url = response.data["next"]
+        return results
+
+
+class MediaTestCase(APITestCase):
+    """Stores files under a temporary MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(
+            MEDIA_ROOT=media_root,
+            DOCUMENT_UPLOAD_DIR=os.path.join(media_root, ".uploads"),
+        )
+        media.enable()
+        self.addCleanup(media.disable)
+        self.partner = Partner.objects.create(
+            name="Acme", type="NGO", created_by=self.admin
+        )
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Partner.objects.bulk_create(
+            Partner(name=f"p{i:02}", type="NGO") for i in range(23)
+        )
+        # Most rows share a timestamp, so only the id tie-breaker orders them.
+        now = timezone.now()
+        Partner.objects.update(created_at=now)
+        Partner.objects.filter(name__in=["p01", "p02", "p03"]).update(
+            created_at=now - datetime.timedelta(days=1)
+        )
+        # The list reads PartnerSummary, which bulk writes bypass.
+        rebuild_summaries()
+
+    def test_pages_cover_every_row_once(self):
+        names = [p["name"] for p in self.follow("/api/partners/?page_size=5")]
+        self.assertEqual(len(names), 23)
+        self.assertEqual(len(set(names)), 23)
+        self.assertEqual(set(names[-3:]), {"p01", "p02", "p03"})
+
+    def test_previous_returns_the_page_before(self):
+        client = self.api()
+        first = client.get("/api/partners/?page_size=5").data
+        second = client.get(first["next"]).data
+        back = client.get(second["previous"]).data
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNone(back["previous"])
+
+    def test_count_only_when_asked(self):
+        client = self.api()
+        self.assertNotIn("count", client.get("/api/partners/").data)
+        response = client.get("/api/partners/?count=exact&page_size=5")
+        self.assertEqual(response.data["count"], 23)
+
+    def test_explicit_ordering(self):
+        url = "/api/partners/?ordering=created_at&page_size=4"
+        names = [p["name"] for p in self.follow(url)]
+        self.assertEqual(len(set(names)), 23)
+        self.assertEqual(set(names[:3]), {"p01", "p02", "p03"})
+
+    def test_invalid_cursor(self):
+        response = self.api().get("/api/partners/?cursor=garbage")
+        self.assertEqual(response.status_code, 404)
+
+    def test_nullable_ordering_key(self):
+        start = datetime.date(2024, 1, 1)
+        for i in range(7):
+            Project.objects.create(
+                name=f"pr{i}",
+                start_date=start,
+                end_date=None if i % 2 else start + datetime.timedelta(days=i),
+            )
+        for ordering in ("end_date", "-end_date"):
+            projects = self.follow(f"/api/projects/?ordering={ordering}&page_size=2")
+            self.assertEqual(len({p["id"] for p in projects}), 7)
+
+
+class PartnerSummaryTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = datetime.date(2025, 1, 1)
+        self.partner = Partner.objects.create(
+            name="Acme", type="NGO", created_by=self.admin
+        )
+        self.other = Partner.objects.create(name="Other", type="NGO")
+        self.project = Project.objects.create(name="Water", start_date=self.start)
+
+    def counts(self, partner):
+        return PartnerSummary.objects.values_list(
+            "document_count", "mou_count", "project_count"
+        ).get(pk=partner.pk)
+
+    def add_mou(self, partner):
+        return MOU.objects.create(
+            project=self.project,
+            partner=partner,
+            title="MOU",
+            start_date=self.start,
+            end_date=self.start + datetime.timedelta(days=365),
+        )
+
+    def test_counts_follow_creates_and_deletes(self):
+        document = PartnerDocument.objects.create(
+            partner=self.partner, file_type="pdf", file_url="https://example.org/a"
+        )
+        PartnerDocument.objects.create(
+            partner=self.partner, file_type="pdf", file_url="https://example.org/b"
+        )
+        self.add_mou(self.partner)
+        for role in ("lead", "support"):
+            ProjectPartner.objects.create(
+                project=self.project,
+                partner=self.partner,
+                role=role,
+                start_date=self.start,
+            )
+        # Two links to one project count it once.
+        self.assertEqual(self.counts(self.partner), (2, 1, 1))
+        document.delete()
+        self.project.delete()
+        self.assertEqual(self.counts(self.partner), (1, 0, 0))
+
+    def test_counts_follow_a_move_to_another_partner(self):
+        mou = self.add_mou(self.partner)
+        document = PartnerDocument.objects.create(
+            partner=self.partner, file_type="pdf", file_url="https://example.org/a"
+        )
+        link = ProjectPartner.objects.create(
+            project=self.project, partner=self.partner, start_date=self.start
+        )
+        response = self.api().patch(
+            f"/api/mous/{mou.pk}/", {"partner": str(self.other.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        document.partner = link.partner = self.other
+        document.save()
+        link.save()
+        self.assertEqual(self.counts(self.partner), (0, 0, 0))
+        self.assertEqual(self.counts(self.other), (1, 1, 1))
+
+    def test_list_shows_status_departments_and_creator(self):
+        department = Department.objects.create(name="Zeta")
+        self.partner.departments.add(department)
+        self.partner.departments.add(Department.objects.create(name="Alpha"))
+        client = self.api()
+        client.post(
+            f"/api/partners/{self.partner.pk}/status/",
+            {"status": "approved"},
+            format="json",
+        )
+        department.name = "Omega"
+        department.save()
+        self.admin.username = "root"
+        self.admin.save()
+        row = next(
+            p
+            for p in client.get("/api/partners/").data["results"]
+            if p["id"] == str(self.partner.pk)
+        )
+        self.assertEqual(row["status"], "approved")
+        self.assertEqual(row["created_by"], "root")
+        self.assertEqual(row["departments"], ["Alpha", "Omega"])
+
+    def test_failed_summary_update_undoes_the_write(self):
+        with mock.patch(
+            "partners.summary.adjust_count", side_effect=DatabaseError("summary")
+        ):
+            with self.assertRaises(DatabaseError):
+                self.api().post(
+                    f"/api/partners/{self.partner.pk}/documents/",
+                    {"file_type": "pdf", "file_url": "https://example.org/a"},
+                    format="json",
+                )
+        self.assertFalse(PartnerDocument.objects.exists())
+        self.assertEqual(self.counts(self.partner), (0, 0, 0))
+
+    def test_rebuild_repairs_drift(self):
+        PartnerDocument.objects.create(
+            partner=self.partner, file_type="pdf", file_url="https://example.org/a"
+        )
+        PartnerSummary.objects.update(document_count=99)
+        PartnerSummary.objects.filter(pk=self.other.pk).delete()
+        call_command("rebuild_partner_summaries", stdout=StringIO())
+        self.assertEqual(self.counts(self.partner), (1, 0, 0))
+        self.assertEqual(self.counts(self.other), (0, 0, 0))
+
+
+@override_settings(DOCUMENT_UPLOAD_MAX_CHUNK=100_000)
+class ChunkedUploadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = os.urandom(250_000)
+        self.client = self.api()
+        self.uploads = f"/api/partners/{self.partner.pk}/documents/uploads/"
+        response = self.client.post(
+            self.uploads,
+            {"file_name": "../mou report.pdf", "file_type": "pdf", "size": 250_000},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.upload = f"{self.uploads}{response.data['id']}/"
+
+    def put(self, offset, end, **headers):
+        return self.client.generic(
+            "PUT",
+            f"{self.upload}?offset={offset}",
+            self.data[offset:end],
+            content_type="application/octet-stream",
+            **headers,
+        )
+
+    def finalize(self, **data):
+        return self.client.post(f"{self.upload}finalize/", data, format="json")
+
+    def test_chunks_in_any_order_make_one_document(self):
+        last = hashlib.sha256(self.data[200_000:]).hexdigest()
+        self.assertEqual(
+            self.put(200_000, 250_000, HTTP_X_CHUNK_SHA256=last).status_code, 200
+        )
+        status = self.client.get(self.upload).data
+        self.assertEqual(
+            (status["received"], status["missing"]), (50_000, [[0, 200_000]])
+        )
+        self.assertEqual(self.finalize().status_code, 409)
+
+        self.assertEqual(self.put(0, 100_000).status_code, 200)
+        self.assertEqual(self.put(100_000, 200_000).status_code, 200)
+        response = self.finalize(sha256=hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["file_name"], "mou_report.pdf")
+        self.assertEqual(response.data["size"], 250_000)
+
+        document = PartnerDocument.objects.get()
+        with default_storage.open(storage_name(document)) as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertFalse(DocumentUpload.objects.exists())
+        self.assertEqual(os.listdir(settings.DOCUMENT_UPLOAD_DIR), [])
+        self.assertEqual(
+            PartnerSummary.objects.get(pk=self.partner.pk).document_count, 1
+        )
+        self.assertEqual(self.client.get(self.upload).status_code, 404)
+
+    def test_rejects_bad_chunks(self):
+        bad_checksum = self.put(0, 100_000, HTTP_X_CHUNK_SHA256="00" * 32)
+        self.assertEqual(bad_checksum.status_code, 400)
+        self.assertEqual(self.put(0, 200_000).status_code, 400)
+        past_the_end = self.client.generic(
+            "PUT",
+            f"{self.upload}?offset=240000",
+            self.data[:20_000],
+            content_type="application/octet-stream",
+        )
+        self.assertEqual(past_the_end.status_code, 400)
+        self.assertEqual(self.client.get(self.upload).data["received"], 0)
+
+    def test_rejects_a_file_that_does_not_match_its_checksum(self):
+        for offset in range(0, 250_000, 100_000):
+            self.put(offset, offset + 100_000)
+        self.assertEqual(self.finalize(sha256="ab" * 32).status_code, 400)
+        self.assertFalse(PartnerDocument.objects.exists())
+
+    def test_abort_discards_the_partial_file(self):
+        self.put(0, 100_000)
+        self.assertEqual(self.client.delete(self.upload).status_code, 204)
+        self.assertEqual(os.listdir(settings.DOCUMENT_UPLOAD_DIR), [])
+        self.assertFalse(DocumentUpload.objects.exists())
+
+    def test_other_departments_cannot_upload(self):
+        user = User.objects.create_user("member", "member@example.com", "pw")
+        response = self.api(user).post(
+            self.uploads,
+            {"file_name": "x.pdf", "file_type": "pdf", "size": 5},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class DocumentBlobTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        ours, theirs = (Department.objects.create(name=n) for n in ("Ours", "Theirs"))
+        self.member = User.objects.create_user("member", "member@example.com", "pw")
+        self.member.departments.add(ours)
+        self.partner.departments.add(ours)
+        self.other = Partner.objects.create(name="Other", type="NGO")
+        self.other.departments.add(theirs)
+        self.data = b"signed MOU"
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+
+    def upload(self, partner, user=None):
+        return self.api(user).post(
+            f"/api/partners/{partner.pk}/documents/",
+            {"file_type": "pdf", "file": SimpleUploadedFile("mou.pdf", self.data)},
+            format="multipart",
+        )
+
+    def attach(self, partner, user=None, sha256=None):
+        return self.api(user).post(
+            f"/api/partners/{partner.pk}/documents/",
+            {"file_type": "pdf", "sha256": sha256 or self.sha256},
+            format="json",
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.upload(self.partner)
+        second = self.upload(self.other)
+        self.assertEqual(first.status_code, 201, first.content)
+        self.assertEqual(second.data["sha256"], self.sha256)
+        self.assertEqual(DocumentBlob.objects.count(), 1)
+        # Points at the permission-checked download, not at the blob itself.
+        self.assertEqual(second.data["file_url"], second.data["download_url"])
+
+    def test_attach_a_visible_file_by_its_hash(self):
+        self.upload(self.partner, self.member)
+        second = Partner.objects.create(name="Second", type="NGO")
+        second.departments.set(self.partner.departments.all())
+        response = self.attach(second, self.member, self.sha256.upper())
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["size"], len(self.data))
+
+    def test_cannot_attach_a_file_only_other_departments_have(self):
+        self.upload(self.other)
+        response = self.attach(self.partner, self.member)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("sha256", response.data)
+        # A sys admin sees every document.
+        self.assertEqual(self.attach(self.partner).status_code, 201)
+
+    def test_unknown_hash(self):
+        self.assertEqual(self.attach(self.partner, sha256="0" * 64).status_code, 400)
+
+
+class DocumentDownloadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = os.urandom(200_000)
+        response = self.api().post(
+            f"/api/partners/{self.partner.pk}/documents/",
+            {
+                "file_type": "pdf",
+                "file": SimpleUploadedFile(
+                    "mou report.pdf", self.data, "application/pdf"
+                ),
+            },
+            format="multipart",
+        )
+        self.url = response.data["download_url"]
+
+    def get(self, url=None, **headers):
+        return self.api().get(url or self.url, **headers)
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Length"], "200000")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="mou report.pdf"'
+        )
+
+    def test_ranges(self):
+        for header, first, last in [
+            ("bytes=100-199", 100, 199),
+            ("bytes=-10", 199_990, 199_999),
+            ("bytes=199990-", 199_990, 199_999),
+        ]:
+            with self.subTest(header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(
+                    response["Content-Range"], f"bytes {first}-{last}/200000"
+                )
+                self.assertEqual(
+                    b"".join(response.streaming_content), self.data[first : last + 1]
+                )
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE="bytes=300000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */200000")
+
+    def test_falls_back_to_the_whole_file(self):
+        # Several ranges, or a range of a version the client no longer has.
+        self.assertEqual(self.get(HTTP_RANGE="bytes=0-1,5-6").status_code, 200)
+        response = self.get(HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get(self):
+        etag = self.get()["ETag"]
+        self.assertEqual(etag, f'"{hashlib.sha256(self.data).hexdigest()}"')
+        response = self.get(HTTP_IF_NONE_MATCH=f'W/"other", {etag}')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(
+            self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag).status_code, 206
+        )
+
+    @override_settings(DOCUMENT_ACCEL_REDIRECT=True)
+    def test_hands_the_file_to_nginx(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response["X-Accel-Redirect"].startswith("/protected-media/blobs/")
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_legacy_and_linked_documents(self):
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, "partner_documents"))
+        with open(
+            os.path.join(settings.MEDIA_ROOT, "partner_documents", "accord é.txt"), "wb"
+        ) as legacy_file:
+            legacy_file.write(b"legacy")
+        legacy = PartnerDocument.objects.create(
+            partner=self.partner,
+            file_type="txt",
+            file_url="/media/partner_documents/accord%20%C3%A9.txt",
+        )
+        response = self.get(f"/api/documents/{legacy.pk}/download/")
+        self.assertEqual(b"".join(response.streaming_content), b"legacy")
+
+        link = PartnerDocument.objects.create(
+            partner=self.partner, file_type="pdf", file_url="https://example.org/a.pdf"
+        )
+        response = self.get(f"/api/documents/{link.pk}/download/")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], "https://example.org/a.pdf")
+
+        gone = PartnerDocument.objects.create(
+            partner=self.partner,
+            file_type="txt",
+            file_url="/media/partner_documents/gone.txt",
+        )
+        self.assertEqual(
+            self.get(f"/api/documents/{gone.pk}/download/").status_code, 404
+        )
+
+    def test_other_departments_cannot_download(self):
+        user = User.objects.create_user("member", "member@example.com", "pw")
+        self.assertEqual(self.api(user).get(self.url).status_code, 404)
+
+
+class LifecycleSweepTests(TestCase):
+    today = datetime.date(2026, 10, 18)
+
+    def setUp(self):
+        def days(n):
+            return self.today + datetime.timedelta(days=n)
+
+        self.projects = [
+            Project.objects.create(
+                name=str(i), status=status, start_date=start, end_date=end
+            )
+            for i, (status, start, end) in enumerate(
+                [
+                    ("planned", days(-30), days(-1)),  # completed
+                    ("planned", self.today, None),  # ongoing
+                    ("planned", days(1), None),
+                    ("ongoing", days(-30), days(-1)),  # completed
+                    ("ongoing", days(-30), self.today),
+                    ("on_hold", days(-30), days(-1)),
+                ]
+            )
+        ]
+        partner = Partner.objects.create(name="Acme", type="NGO")
+        for title, status, end in [
+            ("ended", "active", days(-1)),  # expired
+            ("ends today", "active", self.today),
+            ("never signed", "pending", days(-5)),
+        ]:
+            MOU.objects.create(
+                project=self.projects[0],
+                partner=partner,
+                title=title,
+                status=status,
+                start_date=days(-200),
+                end_date=end,
+            )
+        for project, end in [(self.projects[0], days(-1)), (self.projects[1], None)]:
+            ProjectPartner.objects.create(
+                project=project, partner=partner, start_date=days(-9), end_date=end
+            )
+
+    def statuses(self):
+        return (
+            [p.status for p in Project.objects.order_by("name")],
+            dict(MOU.objects.values_list("title", "status")),
+            sorted(ProjectPartner.objects.values_list("status", flat=True)),
+        )
+
+    def test_moves_due_rows_and_records_them(self):
+        counts = sweep(self.today, batch_size=1)
+        self.assertEqual(sum(counts.values()), 5)
+        projects, mous, links = self.statuses()
+        self.assertEqual(
+            projects,
+            ["completed", "ongoing", "planned", "completed", "ongoing", "on_hold"],
+        )
+        self.assertEqual(
+            mous,
+            {"ended": "expired", "ends today": "active", "never signed": "pending"},
+        )
+        self.assertEqual(links, ["active", "completed"])
+        self.assertEqual(LifecycleTransition.objects.count(), 5)
+        self.assertTrue(
+            LifecycleTransition.objects.filter(
+                object_id=self.projects[0].pk,
+                old_status="planned",
+                new_status="completed",
+            ).exists()
+        )
+        self.assertEqual(sum(sweep(self.today).values()), 0)
+
+    def test_dry_run_changes_nothing(self):
+        before = self.statuses()
+        # The planned project past both dates is due under two transitions.
+        self.assertEqual(sum(pending(self.today).values()), 6)
+        call_command(
+            "sweep_lifecycle", "--date", str(self.today), "--dry-run", stdout=StringIO()
+        )
+        self.assertEqual(self.statuses(), before)
+
+    def test_schedule_queues_one_daily_job(self):
+        for _ in range(2):
+            call_command("sweep_lifecycle", "--schedule", stdout=StringIO())
+        job = Job.objects.get()
+        self.assertEqual(job.name, "partners.sweep_lifecycle")
+        self.assertEqual(
+            timezone.localtime(job.run_at).date(),
+            timezone.localdate() + datetime.timedelta(days=1),
+        )
+
+
+class BulkTransitionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        ours, theirs = (Department.objects.create(name=n) for n in ("Ours", "Theirs"))
+        self.member = User.objects.create_user("member", "member@example.com", "pw")
+        self.member.departments.add(ours)
+        self.partners = [
+            Partner.objects.create(name=f"p{i}", type="NGO") for i in range(4)
+        ]
+        for partner in self.partners[:3]:
+            partner.departments.add(ours)
+        self.partners[3].departments.add(theirs)
+        self.ids = [str(p.pk) for p in self.partners]
+
+    def post(self, url, data, user=None):
+        return self.api(user).post(url, data, format="json")
+
+    def test_changes_only_what_needs_changing(self):
+        self.partners[2].status = "suspended"
+        self.partners[2].save()
+        missing = "00000000-0000-0000-0000-000000000000"
+        response = self.post(
+            "/api/partners/bulk_change_status/",
+            {"ids": self.ids + ["junk", self.ids[0], missing], "status": "suspended"},
+            self.member,
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["changed"], 2)
+        self.assertEqual(
+            [r["outcome"] for r in response.data["results"]],
+            ["changed", "changed", "unchanged", "not_found", "invalid_id", "not_found"],
+        )
+        self.assertEqual(response.data["results"][0]["old_status"], "pending")
+
+        # Another department's partner is left alone.
+        statuses = dict(Partner.objects.values_list("name", "status"))
+        self.assertEqual(
+            statuses,
+            {"p0": "suspended", "p1": "suspended", "p2": "suspended", "p3": "pending"},
+        )
+        self.assertEqual(
+            StatusHistory.objects.filter(changed_by=self.member).count(), 2
+        )
+        self.assertEqual(
+            set(
+                PartnerSummary.objects.filter(pk__in=self.ids[:2]).values_list(
+                    "status", "last_new_status"
+                )
+            ),
+            {("suspended", "suspended")},
+        )
+
+    def test_changes_risk_levels(self):
+        response = self.post(
+            "/api/partners/bulk_change_risk/", {"ids": self.ids, "risk_level": "high"}
+        )
+        self.assertEqual(response.data["changed"], 4)
+        self.assertEqual(response.data["results"][0]["old_risk"], "low")
+        self.assertEqual(RiskLevelHistory.objects.filter(new_risk="high").count(), 4)
+
+    def test_refreshes_cached_details(self):
+        url = f"/api/partners/{self.ids[0]}/"
+        self.assertEqual(self.api().get(url).data["status"], "pending")
+        self.post(
+            "/api/partners/bulk_change_status/",
+            {"ids": self.ids[:1], "status": "approved"},
+        )
+        self.assertEqual(self.api().get(url).data["status"], "approved")
+
+    def test_rejects_bad_requests(self):
+        for data in (
+            {"ids": [], "status": "approved"},
+            {"ids": self.ids[0], "status": "approved"},
+            {"ids": self.ids, "status": "unknown"},
+            {"ids": ["junk"] * 10_001, "status": "approved"},
+        ):
+            with self.subTest(data=str(data)[:40]):
+                response = self.post("/api/partners/bulk_change_status/", data)
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(StatusHistory.objects.exists())
+
+
+class PartnerDetailCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ours, self.theirs = (
+            Department.objects.create(name=n) for n in ("Ours", "Theirs")
+        )
+        self.partner = Partner.objects.create(name="Acme", type="NGO")
+        self.partner.departments.add(self.ours)
+        self.url = f"/api/partners/{self.partner.pk}/"
+        self.client = self.api()
+
+    def detail(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_repeated_reads_are_cache_hits(self):
+        self.detail()
+        hits = detail_cache_stats.hits
+        self.assertEqual(self.detail()["name"], "Acme")
+        self.assertEqual(detail_cache_stats.hits, hits + 1)
+
+    def test_status_change(self):
+        self.assertEqual(self.detail()["status"], "pending")
+        response = self.client.post(f"{self.url}status/", {"status": "approved"})
+        self.assertEqual(response.status_code, 200, response.content)
+        detail = self.detail()
+        self.assertEqual(detail["status"], "approved")
+        self.assertEqual(len(detail["status_history"]), 1)
+
+    def test_document_add_and_delete(self):
+        self.assertEqual(self.detail()["documents"], [])
+        response = self.client.post(
+            f"{self.url}documents/",
+            {"file_type": "pdf", "file_url": "https://example.org/a.pdf"},
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        documents = self.detail()["documents"]
+        self.assertEqual([d["id"] for d in documents], [response.data["id"]])
+
+        response = self.client.delete(f"/api/documents/{response.data['id']}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.detail()["documents"], [])
+
+    def test_department_reassignment(self):
+        self.assertEqual(self.detail()["departments"], ["Ours"])
+        response = self.client.post(
+            f"{self.url}departments/",
+            {"departments": [str(self.theirs.pk)], "mode": "replace"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.detail()["departments"], ["Theirs"])
+        response = self.client.delete(f"{self.url}departments/{self.theirs.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.detail()["departments"], [])
+
+    def test_cache_stats_for_sys_admins_only(self):
+        member = User.objects.create_user("member", "member@example.com", "pw")
+        member.departments.add(self.ours)
+        response = self.api(member).get("/api/partners/cache-stats/")
+        self.assertEqual(response.status_code, 403)
+
+        self.detail()
+        self.detail()
+        response = self.client.get("/api/partners/cache-stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.data),
+            {"partner_detail", "permissions", "principals", "tokens"},
+        )
+        counters = response.data["partner_detail"]
+        self.assertEqual(
+            counters,
+            {
+                "hits": detail_cache_stats.hits,
+                "misses": detail_cache_stats.misses,
+                "hit_ratio": round(
+                    detail_cache_stats.hits
+                    / (detail_cache_stats.hits + detail_cache_stats.misses),
+                    4,
+                ),
+            },
+        )
+        self.assertGreaterEqual(counters["hits"], 1)
+        self.assertIn("memo_hits", response.data["permissions"])
+
+
+class QueryCountTests(APITestCase):
+    """Reads cost the same number of queries for one row as for many."""
+
+    def setUp(self):
+        super().setUp()
+        self.ours = Department.objects.create(name="Ours")
+        self.member = User.objects.create_user("member", "member@example.com", "pw")
+        self.member.departments.add(self.ours)
+        self.blob = DocumentBlob.objects.create(
+            sha256="0" * 64, size=1, content_type="application/pdf"
+        )
+        self.partner = self.add_partner()
+
+    def add_partner(self):
+        partner = Partner.objects.create(name="p", type="NGO", created_by=self.member)
+        partner.departments.add(self.ours)
+        PartnerProfile.objects.create(partner=partner)
+        self.add_rows(partner)
+        return partner
+
+    def add_rows(self, partner):
+        PartnerDocument.objects.create(
+            partner=partner,
+            file_type="pdf",
+            file_url="https://example.org/a.pdf",
+            uploaded_by=self.member,
+        )
+        PartnerDocument.objects.create(
+            partner=partner,
+            file_type="pdf",
+            file_url="",
+            blob=self.blob,
+            uploaded_by=self.member,
+        )
+        StatusHistory.objects.create(
+            partner=partner,
+            old_status="pending",
+            new_status="approved",
+            changed_by=self.member,
+        )
+        RiskLevelHistory.objects.create(
+            partner=partner, old_risk="low", new_risk="high", changed_by=self.member
+        )
+
+    def client_for_a_cold_read(self):
+        # A fresh user (nothing memoized on it) and nothing cached, so every
+        # read goes to the database.
+        client = self.api(self.member)
+        cache.clear()
+        return client
+
+    def get(self, client, url):
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def assertConstant(self, url, grow):
+        """(one row's data, many rows' data) read with the same query count."""
+        client = self.client_for_a_cold_read()
+        with CaptureQueriesContext(connection) as queries:
+            one = self.get(client, url)
+        grow()
+        client = self.client_for_a_cold_read()
+        with self.assertNumQueries(len(queries)):
+            many = self.get(client, url)
+        return one, many
+
+    def add_partners(self):
+        for _ in range(5):
+            self.add_partner()
+
+    def test_partner_list(self):
+        one, many = self.assertConstant("/api/partners/", self.add_partners)
+        self.assertEqual((len(one["results"]), len(many["results"])), (1, 6))
+
+    def test_partner_detail(self):
+        def grow():
+            for _ in range(5):
+                self.add_rows(self.partner)
+            self.partner.departments.add(Department.objects.create(name="Other"))
+
+        one, many = self.assertConstant(f"/api/partners/{self.partner.pk}/", grow)
+        self.assertEqual((len(one["documents"]), len(many["documents"])), (2, 12))
+        self.assertEqual(len(many["status_history"]), 6)
+        self.assertEqual(len(many["risk_history"]), 6)
+        self.assertEqual(len(many["departments"]), 2)
+        self.assertIsNotNone(many["profile"])
+
+    def test_document_list(self):
+        one, many = self.assertConstant("/api/documents/", self.add_partners)
+        self.assertEqual((len(one["results"]), len(many["results"])), (2, 12))
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ("Acme", "Globex"):
+            Partner.objects.create(name=name, type="NGO")
+
+    def test_csv(self):
+        response = self.api().get("/api/partners/export/?ordering=created_at")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "name", "type"])
+        self.assertEqual([line.split(",")[1] for line in lines[1:]], ["Acme", "Globex"])
+
+    async def test_streams_asynchronously_under_asgi(self):
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.admin)))()
+        response = await self.async_client.get(
+            "/api/partners/export/?file_format=ndjson",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        # A synchronous iterator would be read to the end before sending.
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        names = {json.loads(line)["name"] for line in content.splitlines()}
+        self.assertEqual(names, {"Acme", "Globex"})
+
+
+class PartnerImportTests(APITestCase):
+    def post(self, rows):
+        content = "".join(json.dumps(row) + "\n" for row in rows).encode()
+        return self.api().post(
+            "/api/partners/import/",
+            {"file": SimpleUploadedFile("partners.jsonl", content)},
+            format="multipart",
+        )
+
+    def test_reports_only_the_rows_the_database_rejects(self):
+        bulk_create = Partner.objects.bulk_create
+
+        def reject_bad(partners, *args, **kwargs):
+            partners = list(partners)
+            if any(partner.name == "Bad" for partner in partners):
+                raise DatabaseError("value rejected")
+            return bulk_create(partners, *args, **kwargs)
+
+        rows = [{"name": name, "type": "NGO"} for name in ("A", "B", "Bad", "C")]
+        rows.insert(1, {"name": "Invalid", "type": "unknown"})
+        with mock.patch.object(Partner.objects, "bulk_create", reject_bad):
+            response = self.post(rows)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.data["created"], response.data["failed"]), (3, 2))
+        self.assertEqual([e["row"] for e in response.data["errors"]], [2, 4])
+        self.assertEqual(
+            response.data["errors"][1]["errors"],
+            {"non_field_errors": ["value rejected"]},
+        )
+        self.assertEqual(
+            set(PartnerSummary.objects.values_list("name", flat=True)),
+            {"A", "B", "C"},
+        )
+
+
+class DepartmentAssignmentTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.a, self.b, self.c = (
+            Department.objects.create(name=n) for n in ("A", "B", "C")
+        )
+        self.partner = Partner.objects.create(name="Acme", type="NGO")
+        self.partner.departments.add(self.a, self.b)
+        self.url = f"/api/partners/{self.partner.pk}/departments/"
+
+    def assign(self, departments, **data):
+        return self.api().post(
+            self.url, {"departments": departments, **data}, format="json"
+        )
+
+    def names(self):
+        summary = PartnerSummary.objects.get(pk=self.partner.pk)
+        detail = self.api().get(f"/api/partners/{self.partner.pk}/").data
+        names = sorted(detail["departments"])
+        self.assertEqual(sorted(summary.department_names), names)
+        return names
+
+    def test_add_keeps_existing_links(self):
+        response = self.assign([str(self.b.pk), str(self.c.pk), "junk"])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["assigned"], [str(self.c.pk)])
+        self.assertNotIn("removed", response.data)
+        self.assertEqual(self.names(), ["A", "B", "C"])
+
+    def test_replace_sets_exactly_the_given_departments(self):
+        self.names()
+        missing = "00000000-0000-0000-0000-000000000000"
+        response = self.assign(
+            [str(self.b.pk), str(self.c.pk), missing], mode="replace"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data["assigned"], [str(self.c.pk)])
+        self.assertEqual(response.data["removed"], [str(self.a.pk)])
+        self.assertEqual(self.names(), ["B", "C"])
+
+        # Only removing still refreshes the summary and the cached detail.
+        response = self.assign([str(self.c.pk)], mode="replace")
+        self.assertEqual(
+            (response.data["assigned"], response.data["removed"]),
+            ([], [str(self.b.pk)]),
+        )
+        self.assertEqual(self.names(), ["C"])
+
+        response = self.assign([], mode="replace")
+        self.assertEqual(response.data["removed"], [str(self.c.pk)])
+        self.assertEqual(self.names(), [])
+
+    def test_rejects_bad_requests(self):
+        for data in (
+            {"departments": str(self.c.pk)},
+            {"departments": [], "mode": "set"},
+        ):
+            with self.subTest(data=data):
+                response = self.api().post(self.url, data, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.names(), ["A", "B"])
+
+
+class StatsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ours, self.theirs = (
+            Department.objects.create(name=n) for n in ("Ours", "Theirs")
+        )
+        self.member = User.objects.create_user("member", "member@example.com", "pw")
+        self.member.departments.add(self.ours)
+        for name, type_, status, risk, departments in (
+            ("a", "NGO", "approved", "low", [self.ours]),
+            ("b", "NGO", "pending", "high", [self.ours, self.theirs]),
+            ("c", "GOV", "approved", "high", [self.theirs]),
+            ("d", "GOV", "suspended", "critical", []),
+        ):
+            partner = Partner.objects.create(
+                name=name, type=type_, status=status, risk_level=risk
+            )
+            partner.departments.add(*departments)
+
+    def get(self, url, user=None):
+        response = self.api(user).get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_partner_counts(self):
+        stats = self.get("/api/partners/stats/")
+        self.assertEqual(stats["total"], 4)
+        self.assertEqual(
+            stats["by_type"],
+            {"NGO": 2, "GOV": 2, "EMBASSY": 0, "CORPORATE": 0, "OTHER": 0},
+        )
+        self.assertEqual(
+            stats["by_status"],
+            {"pending": 1, "approved": 2, "suspended": 1, "blacklisted": 0},
+        )
+        self.assertEqual(
+            stats["by_risk_level"], {"low": 1, "medium": 0, "high": 2, "critical": 1}
+        )
+        departments = {d["name"]: d for d in stats["departments"]}
+        self.assertEqual(list(departments), ["Ours", "Theirs"])
+        self.assertEqual(departments["Ours"]["total"], 2)
+        self.assertEqual(departments["Theirs"]["by_type"]["GOV"], 1)
+        self.assertEqual(departments["Theirs"]["by_risk_level"]["high"], 2)
+
+    def test_filters_and_scope_apply(self):
+        stats = self.get("/api/partners/stats/?type=GOV")
+        self.assertEqual((stats["total"], stats["by_status"]["approved"]), (2, 1))
+
+        stats = self.get("/api/partners/stats/", self.member)
+        self.assertEqual(stats["total"], 2)
+        self.assertEqual(stats["by_status"]["pending"], 1)
+        self.assertEqual([d["name"] for d in stats["departments"]], ["Ours"])
+
+    @skipUnless(connection.vendor == "postgresql", "materialized view")
+    @override_settings(STATS_MATERIALIZED_VIEW=True)
+    def test_materialized_view_matches_the_live_counts(self):
+        call_command("refresh_stats_views", stdout=StringIO())
+        stats = self.get("/api/partners/stats/")
+        live = self.get("/api/partners/stats/?search=")
+        for counts in (stats, live):
+            del counts["generated_at"]
+            for department in counts["departments"]:
+                department.pop("id")
+        self.assertEqual(stats, live)
+
+    def test_project_and_mou_counts(self):
+        today = timezone.localdate()
+        partner = Partner.objects.get(name="a")
+        projects = [
+            Project.objects.create(name=f"p{i}", start_date=today, status=status)
+            for i, status in enumerate(("planned", "ongoing", "ongoing"))
+        ]
+        year = datetime.timedelta(days=365)
+        for status, start, end in (
+            ("active", today - year, today + year),  # active
+            ("active", today - 2 * year, today - year),  # lapsed: expired
+            ("expired", today - 2 * year, today - year),
+            ("pending", today, today + year),
+        ):
+            MOU.objects.create(
+                project=projects[0],
+                partner=partner,
+                title="MOU",
+                start_date=start,
+                end_date=end,
+                status=status,
+            )
+        stats = self.get("/api/projects/stats/")
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["by_status"]["ongoing"], 2)
+        mous = stats["mous"]
+        self.assertEqual(mous["total"], 4)
+        self.assertEqual(
+            mous["by_status"],
+            {"active": 2, "expired": 1, "terminated": 0, "pending": 1},
+        )
+        self.assertEqual((mous["active"], mous["expired"]), (1, 2))
+
+
+class SchemaTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "openapi.json")
+        schema_file = override_settings(OPENAPI_SCHEMA_FILE=self.path)
+        schema_file.enable()
+        self.addCleanup(schema_file.disable)
+        # Forget the schema this process has already loaded.
+        patcher = mock.patch.object(schema, "_current", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def generate(self, *args):
+        out = StringIO()
+        call_command("generate_schema", *args, stdout=out)
+        return out.getvalue()
+
+    def test_writes_the_document_once_per_code_version(self):
+        with self.assertRaises(CommandError):
+            self.generate("--check")
+        self.assertIn("Wrote", self.generate())
+        with open(self.path, "rb") as f:
+            document = json.load(f)
+        self.assertEqual(document["info"]["title"], "Strategy Backend API")
+        self.assertTrue(any("/partners/" in path for path in document["paths"]))
+        self.assertIn("up to date", self.generate("--check"))
+        self.assertIn("skipped", self.generate())
+
+        # A file generated from other code is stale.
+        with open(f"{self.path}.sha256", "w") as f:
+            f.write("0" * 64)
+        with self.assertRaises(CommandError):
+            self.generate("--check")
+        self.assertIn("Wrote", self.generate())
+
+    def test_serves_the_file_with_an_etag(self):
+        self.generate()
+        with open(self.path, "rb") as f:
+            body = f.read()
+        response = self.client.get("/swagger.json/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, body)
+        etag = f'"{hashlib.sha256(body).hexdigest()}"'
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get("/swagger.json/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        response = self.client.get("/swagger.json/", headers={"If-None-Match": '"old"'})
+        self.assertEqual(response.status_code, 200)
+
+
+@skipUnless(connection.vendor == "postgresql", "history partitions")
+class HistoryPartitionTests(TestCase):
+    table = StatusHistory._meta.db_table
+
+    def rows(self, partition):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {connection.ops.quote_name(partition)}")
+            return [str(pk) for (pk,) in cursor.fetchall()]
+
+    def test_creates_months_ahead_and_archives_expired_ones(self):
+        partner = Partner.objects.create(name="Acme", type="NGO")
+        history = StatusHistory.objects.create(
+            partner=partner, old_status="pending", new_status="approved"
+        )
+        july = datetime.datetime(2091, 7, 10, tzinfo=datetime.timezone.utc)
+        StatusHistory.objects.filter(pk=history.pk).update(changed_at=july)
+        # No partition for that month yet.
+        self.assertIn(str(history.pk), self.rows(f"{self.table}_default"))
+
+        may = datetime.date(2091, 5, 2)
+        created = ensure_partitions(months_ahead=1, today=may)
+        self.assertEqual(
+            [name for name in created if name.startswith(self.table)],
+            [f"{self.table}_p2091{month:02}" for month in (5, 6, 7)],
+        )
+        self.assertEqual(self.rows(f"{self.table}_p209107"), [str(history.pk)])
+        self.assertEqual(self.rows(f"{self.table}_default"), [])
+        self.assertEqual(ensure_partitions(months_ahead=1, today=may), [])
+
+        # Run the deferred foreign key checks of the rows above, as their
+        # commit would; PostgreSQL won't drop a table that has some pending.
+        connection.check_constraints()
+        september = datetime.date(2091, 9, 20)
+        ensure_partitions(months_ahead=0, today=september)
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        archives = expire_partitions(2, archive_dir, today=september)
+        archived = os.path.join(archive_dir, f"{self.table}_p209107.csv.gz")
+        self.assertIn(archived, archives)
+        with gzip.open(archived, "rt") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(str(history.pk), lines[1])
+        self.assertNotIn(f"{self.table}_p209107", attached_partitions(self.table))
+        self.assertFalse(StatusHistory.objects.filter(pk=history.pk).exists())
+        # The retention window is kept.
+        self.assertIn(f"{self.table}_p209109", attached_partitions(self.table))
+
+
+class ProjectIdMigrationTests(TransactionTestCase):
+    """Projects created while ids were integers, migrated to UUIDs."""
+
+    before = [("partners", "0002_project_projectpartner")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_integer_ids_become_zero_padded_uuids(self):
+        leaves = MigrationExecutor(connection).loader.graph.leaf_nodes()
+        self.addCleanup(self.migrate, leaves)
+        apps = self.migrate(self.before)
+        Partner = apps.get_model("partners", "Partner")
+        Project = apps.get_model("partners", "Project")
+        partner = Partner.objects.create(name="Acme", type="NGO")
+        project = Project.objects.create(
+            id=42, name="Water", start_date=datetime.date(2024, 1, 1)
+        )
+        apps.get_model("partners", "ProjectPartner").objects.create(
+            id=7, project=project, partner_id=partner.pk, start_date=project.start_date
+        )
+
+        # 0003 (the original on SQLite), then 0013 repairs what it left.
+        self.migrate(leaves)
+        link = ProjectPartner.objects.select_related("project").get()
+        self.assertEqual(link.pk, uuid.UUID(int=7))
+        self.assertEqual(link.project.pk, uuid.UUID(int=42))
+        self.assertEqual(link.project.name, "Water")
@@ -0,0 +1,260 @@
+"""
+Resumable, chunked uploads of partner documents.
+
+    POST   .../documents/uploads/                     {file_name, file_type, size}
+    PUT    .../documents/uploads/{id}/?offset=N       raw bytes of one chunk
+    GET    .../documents/uploads/{id}/                what has been received
+    POST   .../documents/uploads/{id}/finalize/       {sha256?} -> PartnerDocument
+    DELETE .../documents/uploads/{id}/                abort
+
+Each chunk is read from the request in small pieces and written with
+pwrite() at its offset into a sparse staging file, hashing as it goes, so
+neither memory nor temp files grow with the chunk and chunks may arrive in
+any order or in parallel. A chunk whose X-Chunk-SHA256 header doesn't match
+(or that ends early) is dropped and must be sent again. Finalize checks that
+the chunks cover the whole file, computes its SHA-256 in one sequential
+pass, moves the staging file into content-addressed storage
+(partners.blobs; dropped instead if that content is already stored) and
+only then creates the PartnerDocument row.
+"""
+
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils.text import get_valid_filename
+from rest_framework import exceptions, status
+
+from .blobs import blob_url, store_blob
+from .models import DocumentUpload, DocumentUploadChunk, PartnerDocument
+
+BUFFER_SIZE = 64 * 1024
+
+
+class UploadError(exceptions.APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = "upload_error"
+
+
+class UploadIncomplete(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The upload is missing chunks."
+    default_code = "upload_incomplete"
+
+    def __init__(self, missing):
+        super().__init__()
+        # Left as numbers; APIException would turn them into strings.
+        self.detail = {"detail": self.detail, "missing": missing}
+
+
+class StagedFile(File):
+    """
+    A staging file handed to storage. FileSystemStorage moves files that
+    expose temporary_file_path() instead of copying them.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def staging_path(upload):
+    return os.path.join(settings.DOCUMENT_UPLOAD_DIR, f"{upload.pk}.part")
+
+
+def start_upload(partner, user, file_name, file_type, size):
+    if size <= 0 or size > settings.DOCUMENT_UPLOAD_MAX_SIZE:
+        raise exceptions.ValidationError(
+            {"size": f"Must be between 1 and {settings.DOCUMENT_UPLOAD_MAX_SIZE}."}
+        )
+    upload = DocumentUpload.objects.create(
+        partner=partner,
+        created_by=user,
+        file_name=get_valid_filename(os.path.basename(file_name)) or "document",
+        file_type=file_type,
+        size=size,
+    )
+    os.makedirs(settings.DOCUMENT_UPLOAD_DIR, exist_ok=True)
+    # Sparse: chunks fill it in at their offsets, in any order.
+    with open(staging_path(upload), "wb") as staging:
+        staging.truncate(size)
+    return upload
+
+
+def write_chunk(upload, offset, length, stream, expected_sha256=None):
+    """Write `length` bytes read from `stream` at `offset`; returns the chunk."""
+    if offset < 0 or length <= 0 or offset + length > upload.size:
+        raise exceptions.ValidationError(
+            {"offset": f"Chunk [{offset}, {offset + length}) is outside the file."}
+        )
+    if length > settings.DOCUMENT_UPLOAD_MAX_CHUNK:
+        raise UploadError(
+            f"Chunks are limited to {settings.DOCUMENT_UPLOAD_MAX_CHUNK} bytes."
+        )
+
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        fd = os.open(staging_path(upload), os.O_WRONLY)
+    except FileNotFoundError:
+        # Finalized or aborted meanwhile.
+        raise exceptions.NotFound("Upload not found.")
+    try:
+        while written < length:
+            piece = stream.read(min(BUFFER_SIZE, length - written))
+            if not piece:
+                break
+            os.pwrite(fd, piece, offset + written)
+            digest.update(piece)
+            written += len(piece)
+    finally:
+        os.close(fd)
+
+    error = None
+    if written != length:
+        error = f"Chunk ended after {written} of {length} bytes."
+    elif expected_sha256 and expected_sha256.lower() != digest.hexdigest():
+        error = "Chunk checksum mismatch."
+    if error:
+        # The bytes written may be anything: forget every chunk they
+        # overlapped so that range is reported missing again.
+        end = offset + max(written, 1)
+        upload.chunks.filter(offset__lt=end, offset__gt=offset - F("size")).delete()
+        raise UploadError(error)
+
+    chunk, _ = DocumentUploadChunk.objects.update_or_create(
+        upload=upload,
+        offset=offset,
+        defaults={"size": length, "sha256": digest.hexdigest()},
+    )
+    DocumentUpload.objects.filter(pk=upload.pk).update(updated_at=chunk.received_at)
+    return chunk
+
+
+def received_ranges(chunks):
+    """Merge chunks into sorted, non-overlapping [start, end) ranges."""
+    ranges = []
+    for chunk in sorted(chunks, key=lambda chunk: chunk.offset):
+        end = chunk.offset + chunk.size
+        if ranges and chunk.offset <= ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], end)
+        else:
+            ranges.append([chunk.offset, end])
+    return ranges
+
+
+def missing_ranges(size, ranges):
+    missing = []
+    position = 0
+    for start, end in ranges:
+        if start > position:
+            missing.append([position, start])
+        position = max(position, end)
+    if position < size:
+        missing.append([position, size])
+    return missing
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as staged:
+        while piece := staged.read(1024 * 1024):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def finalize_upload(upload, user, expected_sha256=None):
+    """Turn a complete upload into a PartnerDocument; returns (document, sha256)."""
+    with transaction.atomic():
+        # Serializes concurrent finalize calls for the same upload.
+        upload = DocumentUpload.objects.select_for_update().get(pk=upload.pk)
+        missing = missing_ranges(upload.size, received_ranges(upload.chunks.all()))
+        if missing:
+            raise UploadIncomplete(missing)
+
+        path = staging_path(upload)
+        sha256 = file_sha256(path)
+        if expected_sha256 and expected_sha256.lower() != sha256:
+            raise exceptions.ValidationError(
+                {"sha256": f"File checksum mismatch (received {sha256})."}
+            )
+
+        with open(path, "rb") as staged:
+            blob = store_blob(StagedFile(staged), sha256, file_name=upload.file_name)
+        document = PartnerDocument.objects.create(
+            partner_id=upload.partner_id,
+            file_type=upload.file_type,
+            file_url=blob_url(blob),
+            file_name=upload.file_name,
+            blob=blob,
+            uploaded_by=user,
+        )
+        upload.delete()
+    # Still there if the content was already stored or storage copied it.
+    discard_staging_file(path)
+    return document, sha256
+
+
+def discard_staging_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def abort_upload(upload):
+    path = staging_path(upload)
+    upload.delete()
+    discard_staging_file(path)
+
+
+def expire_uploads(before):
+    """Abort uploads that received nothing since `before`; returns how many."""
+    count = 0
+    for upload in DocumentUpload.objects.filter(updated_at__lt=before).iterator():
+        abort_upload(upload)
+        count += 1
+    return count
+
+
+def remove_orphaned_staging_files(before):
+    """
+    Delete staging files last written before `before` that belong to no
+    upload (left by crashes or by storage that copied instead of moving).
+    """
+    try:
+        entries = [
+            entry
+            for entry in os.scandir(settings.DOCUMENT_UPLOAD_DIR)
+            if entry.is_file() and entry.stat().st_mtime < before.timestamp()
+        ]
+    except FileNotFoundError:
+        return 0
+    upload_ids = [
+        entry.name.removesuffix(".part")
+        for entry in entries
+        if is_upload_id(entry.name.removesuffix(".part"))
+    ]
+    live = {
+        str(pk)
+        for pk in DocumentUpload.objects.filter(pk__in=upload_ids).values_list(
+            "pk", flat=True
+        )
+    }
+    count = 0
+    for entry in entries:
+        if entry.name.removesuffix(".part") not in live:
+            discard_staging_file(entry.path)
+            count += 1
+    return count
+
+
+def is_upload_id(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
@@ -1,8 +1,16 @@
+import csv
+import uuid
+
 from psycopg import IntegrityError
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from rest_framework import viewsets, filters, status
+from rest_framework.exceptions import NotFound
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import (
     MOU,
+    DocumentUpload,
     Partner,
     PartnerDocument,
     PartnerProfile,
@@ -10,16 +18,21 @@ from .models import (
     StatusHistory,
     RiskLevelHistory,
     PartnerDepartment,
+    PartnerSummary,
     ProjectPartner,
 )
 from users.models import Department
+from users.scope import get_department_ids
 
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from .serializers import (
+    DocumentUploadSerializer,
     MOUSerializer,
     PartnerDocumentSerializer,
     PartnerSerializer,
     PartnerDetailSerializer,
+    PartnerSummarySerializer,
     PartnerProfileSerializer,
     StatusHistorySerializer,
     RiskLevelHistorySerializer,
@@ -28,16 +41,82 @@ from .serializers import (
     ProjectSerializer,
     PartnershipProjectSerializer,
 )
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
+from users.authentication import token_cache
+from users.authz import stats as permission_cache_stats
+from users.principal import stats as principal_cache_stats
+from jobs.registry import enqueue
+from jobs.views import accepted
+
+from .bulk import (
+    IMPORT_FORMATS,
+    MAX_TRANSITION_IDS,
+    PartnerImporter,
+    bulk_transition,
+    guess_format,
+    iter_rows,
+)
+from .cache import (
+    aget_cached_detail,
+    aset_cached_detail,
+    get_cached_detail,
+    set_cached_detail,
+)
+from .cache import stats as detail_cache_stats
+from .export import StreamingExportMixin
+from .filters import DepartmentScopeFilter
 from .permissions import IsSysAdminOrDepartmentUser
+from .search import RankedSearchFilter
+from .signals import bump_partner_detail
+from .stats import (
+    cached_stats,
+    has_materialized_view,
+    materialized_partner_stats,
+    partner_stats,
+    project_stats,
+)
+from .summary import refresh_department_names
+from .tasks import IMPORT_TASK
+from . import uploads
+from .downloads import serve_document
+from strategybackend.asyncviews import AsyncReadViewSetMixin, afetch
+from strategybackend.prefetch import PrefetchPlannerMixin, plan_queryset
 
 
-class PartnerViewSet(viewsets.ModelViewSet):
+class AtomicWriteMixin:
+    """
+    Run create, update and destroy in one transaction together with the
+    partners.signals handlers they trigger, so a PartnerSummary update that
+    fails takes the write back with it. Detail cache bumps go out again on
+    commit (see bump_partner_detail).
+    """
+
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
+
+
+class PartnerViewSet(
+    AtomicWriteMixin,
+    AsyncReadViewSetMixin,
+    StreamingExportMixin,
+    PrefetchPlannerMixin,
+    viewsets.ModelViewSet,
+):
     """
     Partner CRUD:
     - POST → create partner
-    - GET → list partners
+    - GET → list partners (from the PartnerSummary read model)
     - GET /id → retrieve partner with nested info
     - PUT/PATCH → update partner
     - DELETE → soft delete
@@ -45,19 +124,43 @@ class PartnerViewSet(viewsets.ModelViewSet):
 
     queryset = Partner.objects.all()
     filter_backends = [
+        DepartmentScopeFilter,
         DjangoFilterBackend,
-        filters.SearchFilter,
+        RankedSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = ["type", "status", "risk_level"]
     search_fields = ["name"]
     ordering_fields = ["created_at", "updated_at"]
+    department_scope_field = "pk"
 
     permission_classes = [IsSysAdminOrDepartmentUser]
+    import_batch_size = 500
+    async_actions = (
+        "list",
+        "retrieve",
+        "status_history",
+        "risk_history",
+        "list_departments",
+    )
+    # Served from PartnerSummary: one table, no joins or per-row subqueries.
+    summary_actions = ("list", "export")
+
+    def uses_summary(self):
+        return (
+            settings.PARTNER_LIST_FROM_SUMMARY and self.action in self.summary_actions
+        )
+
+    def get_queryset(self):
+        if self.uses_summary():
+            return PartnerSummary.objects.all()
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return PartnerDetailSerializer
+        if self.uses_summary():
+            return PartnerSummarySerializer
         return PartnerSerializer
 
     def perform_create(self, serializer):
@@ -68,6 +171,132 @@ class PartnerViewSet(viewsets.ModelViewSet):
         instance.status = "suspended"
         instance.save()
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        The detail payload is cached per partner under a version stamp that
+        partners.signals bumps whenever the partner or anything it shows
+        changes. Scoping and object permissions are still checked on every
+        request against a bare Partner row.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(Partner.objects.all())
+        partner = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, partner)
+
+        payload, version = get_cached_detail(partner.pk)
+        if payload is None:
+            instance = self.get_queryset().get(pk=partner.pk)
+            payload = self.get_serializer(instance).data
+            set_cached_detail(partner.pk, version, payload)
+        return Response(payload)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        partner = await self.aget_object(Partner.objects.all())
+        payload, version = await aget_cached_detail(partner.pk)
+        if payload is None:
+            instance = await self.get_queryset().aget(pk=partner.pk)
+            payload = self.get_serializer(instance).data
+            await aset_cached_detail(partner.pk, version, payload)
+        return Response(payload)
+
+    @action(detail=False, methods=["get"], url_path="cache-stats")
+    def cache_stats(self, request):
+        """
+        GET /api/partners/cache-stats/  (sys admins only)
+        Per-process hit/miss counters of the detail, permission, principal
+        and verified-token caches.
+        """
+        if not request.user.is_sys_admin:
+            return Response(
+                {"detail": "Only sys admins can view cache statistics."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(
+            {
+                "partner_detail": detail_cache_stats.as_dict(),
+                "permissions": permission_cache_stats.as_dict(),
+                "principals": principal_cache_stats.as_dict(),
+                "tokens": token_cache.stats.as_dict(),
+            }
+        )
+
+    @action(detail=False, methods=["get"], url_path="stats")
+    def stats(self, request):
+        """
+        GET /api/partners/stats/
+        Partner counts by type, status and risk level, overall and per
+        department, over the partners the caller can see (list filters and
+        ?search= apply). Cached for STATS_CACHE_TIMEOUT seconds.
+        """
+        user = request.user
+
+        def compute():
+            if (
+                settings.STATS_MATERIALIZED_VIEW
+                and user.is_sys_admin
+                and not request.query_params
+                and has_materialized_view()
+            ):
+                return materialized_partner_stats()
+            department_ids = None if user.is_sys_admin else get_department_ids(user)
+            return partner_stats(
+                self.filter_queryset(Partner.objects.all()), department_ids
+            )
+
+        return Response(cached_stats("partners", request, compute))
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def bulk_import(self, request):
+        """
+        POST /api/partners/import/  (multipart: file, optional format=csv|jsonl)
+        Stream the file row by row, validate each row and insert in batches.
+        Columns: partner fields, profile fields, and `departments` (IDs).
+        With background=true the file is saved and imported by a job
+        instead: 202 with the job, whose result is the report.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"detail": "file is required."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        fmt = request.data.get("format") or guess_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response(
+                {"detail": "format must be one of: " + ", ".join(IMPORT_FORMATS)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.data.get("background") in ("true", "True", "1"):
+            name = default_storage.save(f"imports/{uuid.uuid4()}.{fmt}", upload)
+            job = enqueue(
+                IMPORT_TASK,
+                {"file": name, "format": fmt, "batch_size": self.import_batch_size},
+                user=request.user,
+            )
+            return accepted(job)
+
+        importer = PartnerImporter(request.user, batch_size=self.import_batch_size)
+        try:
+            report = importer.run(iter_rows(upload, fmt))
+        except (UnicodeDecodeError, csv.Error) as exc:
+            return Response(
+                {"detail": f"Could not read file: {exc}", **importer.report()},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        code = (
+            status.HTTP_201_CREATED
+            if report["created"]
+            else status.HTTP_400_BAD_REQUEST
+        )
+        return Response(report, status=code)
+
     # --------------------------
     @action(detail=True, methods=["get", "post", "put", "patch"], url_path="profile")
     def profile(self, request, pk=None):
@@ -134,15 +363,49 @@ class PartnerViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         partner.status = new_status
-        partner.save()
-        StatusHistory.objects.create(
-            partner=partner,
-            old_status=old_status,
-            new_status=new_status,
-            changed_by=request.user,
-        )
+        # One transaction for the partner, its history and its summary row.
+        with transaction.atomic():
+            partner.save()
+            StatusHistory.objects.create(
+                partner=partner,
+                old_status=old_status,
+                new_status=new_status,
+                changed_by=request.user,
+            )
         return Response({"id": partner.id, "status": partner.status})
 
+    def transition_many(self, request, field, choices):
+        ids = request.data.get("ids")
+        new_value = request.data.get(field)
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {"detail": "ids must be a non-empty list of partner IDs."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > MAX_TRANSITION_IDS:
+            return Response(
+                {"detail": f"At most {MAX_TRANSITION_IDS} ids per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if new_value not in dict(choices):
+            return Response(
+                {"detail": f"Invalid {field}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        # The partners this user may change: the same scope as get_object().
+        partners = DepartmentScopeFilter().filter_queryset(
+            request, Partner.objects.all(), self
+        )
+        return Response(bulk_transition(partners, ids, field, new_value, request.user))
+
+    @action(detail=False, methods=["post"], url_path="bulk_change_status")
+    def bulk_change_status(self, request):
+        """
+        POST /api/partners/bulk_change_status/  {"ids": [...], "status": "suspended"}
+        Change the status of many partners at once; returns an outcome per
+        ID (changed / unchanged / not_found / invalid_id).
+        """
+        return self.transition_many(request, "status", Partner.PartnerStatus.choices)
+
     @action(detail=True, methods=["get"], url_path="status-history")
     def status_history(self, request, pk=None):
         """
@@ -150,10 +413,20 @@ class PartnerViewSet(viewsets.ModelViewSet):
         Return all status changes for the partner
         """
         partner = self.get_object()
-        history = partner.status_history.all().order_by("-changed_at")
+        history = plan_queryset(
+            partner.status_history.order_by("-changed_at"), StatusHistorySerializer
+        )
         serializer = StatusHistorySerializer(history, many=True)
         return Response(serializer.data)
 
+    async def astatus_history(self, request, pk=None):
+        partner = await self.aget_object()
+        history = plan_queryset(
+            partner.status_history.order_by("-changed_at"), StatusHistorySerializer
+        )
+        serializer = StatusHistorySerializer(await afetch(history), many=True)
+        return Response(serializer.data)
+
     # ----------------------
     # --- RISK LEVEL ENDPOINTS ---
     @action(detail=True, methods=["post"], url_path="change_risk")
@@ -168,57 +441,120 @@ class PartnerViewSet(viewsets.ModelViewSet):
         # Save current risk before updating
         old_level = partner.risk_level
         partner.risk_level = new_level
-        partner.save()
-
-        # Log history
-        RiskLevelHistory.objects.create(
-            partner=partner,
-            old_risk=old_level,
-            new_risk=new_level,
-            changed_by=request.user,
-        )
+        # One transaction for the partner, its history and its summary row.
+        with transaction.atomic():
+            partner.save()
+
+            # Log history
+            RiskLevelHistory.objects.create(
+                partner=partner,
+                old_risk=old_level,
+                new_risk=new_level,
+                changed_by=request.user,
+            )
 
         return Response({"message": "Risk level updated"}, status=200)
 
+    @action(detail=False, methods=["post"], url_path="bulk_change_risk")
+    def bulk_change_risk(self, request):
+        """
+        POST /api/partners/bulk_change_risk/  {"ids": [...], "risk_level": "high"}
+        Change the risk level of many partners at once; outcomes as for
+        bulk_change_status.
+        """
+        return self.transition_many(request, "risk_level", Partner.RiskLevel.choices)
+
     @action(detail=True, methods=["get"])
     def risk_history(self, request, pk=None):
         partner = self.get_object()
-        history = partner.risk_history.all()  # Use correct related_name
+        history = plan_queryset(
+            partner.risk_history.order_by("-changed_at"), RiskLevelHistorySerializer
+        )
         serializer = RiskLevelHistorySerializer(history, many=True)
         return Response(serializer.data)
 
+    async def arisk_history(self, request, pk=None):
+        partner = await self.aget_object()
+        history = plan_queryset(
+            partner.risk_history.order_by("-changed_at"), RiskLevelHistorySerializer
+        )
+        serializer = RiskLevelHistorySerializer(await afetch(history), many=True)
+        return Response(serializer.data)
+
     @action(detail=True, methods=["post"], url_path="departments")
     def assign_departments(self, request, pk=None):
+        """
+        POST /api/partners/{id}/departments/
+        {"departments": [...], "mode": "add" | "replace"}
+        "add" (default) links the given departments; "replace" also unlinks
+        every department not in the list. Unknown IDs are skipped.
+        """
         partner = self.get_object()
         dept_ids = request.data.get("departments", [])
         if not isinstance(dept_ids, list):
             return Response({"error": "departments must be a list"}, status=400)
+        mode = request.data.get("mode", "add")
+        if mode not in ("add", "replace"):
+            return Response({"error": "mode must be 'add' or 'replace'"}, status=400)
 
-        assigned = []
+        requested = set()
         for dept_id in dept_ids:
             try:
-                department = Department.objects.get(id=dept_id)
-            except Department.DoesNotExist:
+                requested.add(uuid.UUID(str(dept_id)))
+            except ValueError:
                 continue  # Skip invalid department
-
-            obj, created = PartnerDepartment.objects.get_or_create(
-                partner=partner, department=department
-            )
-            if created:
-                assigned.append(str(department.id))
-
-        return Response(
-            {"message": "Departments assigned successfully", "assigned": assigned},
-            status=201,
+        wanted = set(
+            Department.objects.filter(id__in=requested).values_list("id", flat=True)
         )
+        # Prefetched by get_object(), so this costs no query.
+        current = {department.id for department in partner.departments.all()}
+
+        assigned = wanted - current
+        removed = current - wanted if mode == "replace" else set()
+        with transaction.atomic():
+            PartnerDepartment.objects.bulk_create(
+                [
+                    PartnerDepartment(partner=partner, department_id=department_id)
+                    for department_id in assigned
+                ],
+                ignore_conflicts=True,
+            )
+            if removed:
+                PartnerDepartment.objects.filter(
+                    partner=partner, department_id__in=removed
+                ).delete()
+            # bulk_create() sends no signals.
+            if assigned:
+                bump_partner_detail(partner.pk)
+                refresh_department_names(partner.pk)
+
+        payload = {
+            "message": "Departments assigned successfully",
+            "assigned": sorted(str(department_id) for department_id in assigned),
+        }
+        if mode == "replace":
+            payload["removed"] = sorted(str(department_id) for department_id in removed)
+        return Response(payload, status=201)
 
     @action(detail=True, methods=["get"], url_path="list_departments")
     def list_departments(self, request, pk=None):
         partner = self.get_object()
-        assignments = partner.partnerdepartment_set.all()
+        assignments = plan_queryset(
+            partner.partnerdepartment_set.all(), PartnerDepartmentDetailSerializer
+        )
         serializer = PartnerDepartmentDetailSerializer(assignments, many=True)
         return Response(serializer.data, status=200)
 
+    async def alist_departments(self, request, pk=None):
+        partner = await self.aget_object()
+        assignments = plan_queryset(
+            partner.partnerdepartment_set.all(), PartnerDepartmentDetailSerializer
+        )
+        serializer = PartnerDepartmentDetailSerializer(
+            await afetch(assignments), many=True
+        )
+        return Response(serializer.data, status=200)
+
     @action(detail=True, methods=["delete"], url_path="departments/(?P<dept_id>[^/.]+)")
     def unassign_department(self, request, pk=None, dept_id=None):
         partner = self.get_object()
@@ -234,39 +570,177 @@ class PartnerViewSet(viewsets.ModelViewSet):
             return Response({"error": "Assignment not found"}, status=404)
 
 
-class PartnerDocumentViewSet(viewsets.ModelViewSet):
+class PartnerDocumentViewSet(
+    AtomicWriteMixin, PrefetchPlannerMixin, viewsets.ModelViewSet
+):
     """
     Partner Document CRUD:
     - POST → upload document
     - GET → list documents
     - GET /id → retrieve document
     - DELETE → delete document
+    - GET /id/download → the file itself (see partners.downloads)
+    - uploads/ → resumable chunked upload (see partners.uploads)
     """
 
     queryset = PartnerDocument.objects.all()
     serializer_class = PartnerDocumentSerializer
     permission_classes = [IsSysAdminOrDepartmentUser]
+    filter_backends = [DepartmentScopeFilter]
+    ordering = ["-uploaded_at"]
 
     def get_queryset(self):
-        # Correctly return a queryset for the PartnerDocument model.
+        queryset = super().get_queryset()
         partner_id = self.kwargs.get("partner_pk")
         if partner_id:
             # Filters the queryset to only include documents for the specified partner.
-            return PartnerDocument.objects.filter(partner_id=partner_id)
+            return queryset.filter(partner_id=partner_id)
         # Fallback for listing all documents if not nested.
-        return PartnerDocument.objects.all()
+        return queryset
 
     def perform_create(self, serializer):
         partner_id = self.kwargs.get("partner_pk")
         partner = Partner.objects.get(id=partner_id)
         serializer.save(uploaded_by=self.request.user, partner=partner)
 
+    def perform_content_negotiation(self, request, force=False):
+        # Whatever a download's Accept header says, the file is the answer
+        # (errors still render as JSON).
+        return super().perform_content_negotiation(
+            request, force=force or self.action == "download"
+        )
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None, **kwargs):
+        """
+        GET /api/partners/{id}/documents/{doc_id}/download/
+        Streams the file to anyone allowed to see the document (handed to
+        nginx with X-Accel-Redirect when DOCUMENT_ACCEL_REDIRECT is on).
+        Supports Range and If-None-Match; link-only documents redirect to
+        their URL.
+        """
+        document = self.get_object()
+        try:
+            return serve_document(request, document)
+        except FileNotFoundError:
+            raise NotFound("The document's file is missing.")
+
+    # --------------------------
+    # Resumable uploads
+    # --------------------------
+    def get_partner(self):
+        partner_id = self.kwargs.get("partner_pk")
+        if partner_id is None:
+            # Only on the nested partners/{id}/documents/ route.
+            raise NotFound()
+        partner = get_object_or_404(Partner.objects.all(), pk=partner_id)
+        self.check_object_permissions(self.request, partner)
+        return partner
+
+    def get_upload(self, upload_id):
+        upload = get_object_or_404(
+            DocumentUpload.objects.prefetch_related("chunks"),
+            pk=upload_id,
+            partner_id=self.kwargs.get("partner_pk"),
+        )
+        self.check_object_permissions(self.request, upload)
+        return upload
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="uploads",
+        serializer_class=DocumentUploadSerializer,
+    )
+    def start_upload(self, request, **kwargs):
+        """
+        POST /api/partners/{id}/documents/uploads/
+        {"file_name": ..., "file_type": ..., "size": <bytes>}
+        Then PUT each chunk to uploads/{upload_id}/?offset=<byte offset>
+        (raw body, optional X-Chunk-SHA256 header) and POST
+        uploads/{upload_id}/finalize/.
+        """
+        partner = self.get_partner()
+        serializer = DocumentUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = uploads.start_upload(
+            partner, request.user, **serializer.validated_data
+        )
+        return Response(
+            DocumentUploadSerializer(upload).data, status=status.HTTP_201_CREATED
+        )
+
+    @action(
+        detail=False,
+        methods=["get", "put", "delete"],
+        url_path=r"uploads/(?P<upload_id>[0-9a-f-]{36})",
+        serializer_class=DocumentUploadSerializer,
+    )
+    def upload(self, request, upload_id=None, **kwargs):
+        """
+        GET    → received bytes and the [start, end) ranges still missing
+        PUT    → write one chunk at ?offset=; chunks may be sent in parallel
+        DELETE → abort the upload
+        """
+        upload = self.get_upload(upload_id)
+        if request.method == "GET":
+            return Response(DocumentUploadSerializer(upload).data)
+        if request.method == "DELETE":
+            uploads.abort_upload(upload)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        try:
+            offset = int(request.query_params["offset"])
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "offset query parameter and Content-Length are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # The body is read from the stream, never parsed into request.data.
+        chunk = uploads.write_chunk(
+            upload,
+            offset,
+            length,
+            request.stream,
+            request.headers.get("X-Chunk-SHA256"),
+        )
+        return Response(
+            {"offset": chunk.offset, "size": chunk.size, "sha256": chunk.sha256}
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path=r"uploads/(?P<upload_id>[0-9a-f-]{36})/finalize",
+        serializer_class=DocumentUploadSerializer,
+    )
+    def finalize_upload(self, request, upload_id=None, **kwargs):
+        """
+        POST .../uploads/{upload_id}/finalize/  {"sha256": optional}
+        Creates the PartnerDocument once every byte has arrived; 409 with
+        the missing ranges otherwise.
+        """
+        upload = self.get_upload(upload_id)
+        document, sha256 = uploads.finalize_upload(
+            upload, request.user, request.data.get("sha256")
+        )
+        payload = PartnerDocumentSerializer(document).data
+        payload["sha256"] = sha256
+        return Response(payload, status=status.HTTP_201_CREATED)
+
 
 # ----------------------
 # Project ViewSet
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(
+    AtomicWriteMixin,
+    AsyncReadViewSetMixin,
+    StreamingExportMixin,
+    PrefetchPlannerMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     lookup_field = "id"
@@ -275,32 +749,67 @@ class ProjectViewSet(viewsets.ModelViewSet):
     permission_classes = [IsSysAdminOrDepartmentUser]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        RankedSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = ["status"]
     search_fields = ["name", "description"]
     ordering_fields = ["start_date", "end_date", "created_at", "updated_at"]
+    async_actions = ("list_partners",)
 
     def perform_create(self, serializer):
         serializer.save()
 
+    @action(detail=False, methods=["get"], url_path="stats")
+    def stats(self, request):
+        """
+        GET /api/projects/stats/
+        Projects per status (list filters and ?search= apply) and their MOUs
+        per status and currently active/expired, limited to the caller's
+        departments. Cached for STATS_CACHE_TIMEOUT seconds.
+        """
+
+        def compute():
+            projects = self.filter_queryset(Project.objects.all())
+            mous = DepartmentScopeFilter().filter_queryset(
+                request, MOU.objects.filter(project__in=projects.values("pk")), self
+            )
+            return project_stats(projects, mous)
+
+        return Response(cached_stats("projects", request, compute))
+
     @action(detail=True, methods=["get"], url_path="partners")
     def list_partners(self, request, id=None):
         project = self.get_object()
         # Use the correct related_name from the model
-        partnerships = project.project_partners.all()
+        partnerships = plan_queryset(
+            project.project_partners.all(), PartnershipProjectSerializer
+        )
         serializer = PartnershipProjectSerializer(partnerships, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    async def alist_partners(self, request, id=None):
+        project = await self.aget_object()
+        partnerships = plan_queryset(
+            project.project_partners.all(), PartnershipProjectSerializer
+        )
+        serializer = PartnershipProjectSerializer(await afetch(partnerships), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
-class ProjectPartnerViewSet(viewsets.ModelViewSet):
+class ProjectPartnerViewSet(
+    AtomicWriteMixin,
+    StreamingExportMixin,
+    PrefetchPlannerMixin,
+    viewsets.ModelViewSet,
+):
     queryset = ProjectPartner.objects.all()
     serializer_class = PartnershipProjectSerializer
     permission_classes = [IsSysAdminOrDepartmentUser]
     lookup_field = "id"
     lookup_value_regex = "[0-9a-f-]{36}"
     filter_backends = [
+        DepartmentScopeFilter,
         DjangoFilterBackend,
         filters.SearchFilter,
         filters.OrderingFilter,
@@ -322,7 +831,13 @@ class ProjectPartnerViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="by-partner/(?P<partner_id>[^/.]+)")
     def list_projects_for_partner(self, request, partner_id=None):
-        partnerships = self.queryset.filter(partner_id=partner_id)
+        partnerships = self.filter_queryset(self.get_queryset()).filter(
+            partner_id=partner_id
+        )
+        page = self.paginate_queryset(partnerships)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(partnerships, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -338,20 +853,37 @@ class ProjectPartnerViewSet(viewsets.ModelViewSet):
                 {"detail": "Invalid role."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        partnerships = self.queryset.filter(project_id=project_id, role=role)
+        partnerships = self.filter_queryset(self.get_queryset()).filter(
+            project_id=project_id, role=role
+        )
+        page = self.paginate_queryset(partnerships)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(partnerships, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class MOUViewSet(viewsets.ModelViewSet):
+class MOUViewSet(
+    AtomicWriteMixin,
+    AsyncReadViewSetMixin,
+    StreamingExportMixin,
+    PrefetchPlannerMixin,
+    viewsets.ModelViewSet,
+):
     queryset = MOU.objects.all()
     serializer_class = MOUSerializer
     permission_classes = [IsSysAdminOrDepartmentUser]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [DepartmentScopeFilter, RankedSearchFilter]
     search_fields = ["title", "partner__name", "project__name"]
+    ordering = ["-start_date"]
+    async_actions = ("list",)
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation (manage.py generate_schema) has no request.
+            return qs.none()
         project_id = self.request.query_params.get("project_id")
         partner_id = self.request.query_params.get("partner_id")
         if project_id:
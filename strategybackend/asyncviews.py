@@ -0,0 +1,164 @@
+# strategybackend/asyncviews.py
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+
+async def afetch(queryset, chunk_size=2000):
+    """Evaluate `queryset` with the async ORM (prefetches included)."""
+    return [obj async for obj in queryset.aiterator(chunk_size=chunk_size)]
+
+
+class AsyncReadViewSetMixin:
+    """
+    Viewset mixin that serves the actions listed in `async_actions` as
+    native async views when settings.ASYNC_VIEWS is on (strategybackend.asgi
+    turns it on).
+
+    Each listed action needs an `a<action>` coroutine (`alist`, `aretrieve`
+    are provided here). Authentication, permission checks and queries are
+    awaited, so a request waiting on the database doesn't hold a thread.
+    Authenticators and permissions are awaited through their
+    `aauthenticate` / `ahas_permission` / `ahas_object_permission` methods
+    when they have them and run in a thread otherwise. Every other action
+    goes through the regular synchronous dispatch in a thread.
+
+    With ASYNC_VIEWS off (WSGI) the viewset behaves exactly as before.
+    """
+
+    async_actions = ()
+    async_dispatch = False
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if not settings.ASYNC_VIEWS:
+            return super().as_view(actions, **initkwargs)
+        view = super().as_view(actions, async_dispatch=True, **initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        # Keeps cls/actions/initkwargs/csrf_exempt for routers and drf_yasg.
+        return update_wrapper(async_view, view)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.async_dispatch:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if action not in self.async_actions:
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+        handler = getattr(self, f"a{action}")
+
+        # Mirrors APIView.dispatch().
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        if self.get_throttles():
+            await sync_to_async(self.check_throttles)(request)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None)
+            if authenticate is None:
+                authenticate = sync_to_async(authenticator.authenticate)
+            try:
+                user_auth_tuple = await authenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            check = getattr(permission, "ahas_permission", None)
+            if check is None:
+                check = sync_to_async(permission.has_permission)
+            if not await check(request, self):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            check = getattr(permission, "ahas_object_permission", None)
+            if check is None:
+                check = sync_to_async(permission.has_object_permission)
+            if not await check(request, self, obj):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def afilter_queryset(self, queryset):
+        # Filter backends build lazy querysets but may touch the database
+        # while doing so (scope lookups, search index probes).
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def aget_object(self, queryset=None):
+        if queryset is None:
+            queryset = self.get_queryset()
+        queryset = await self.afilter_queryset(queryset)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        await self.acheck_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        paginate = getattr(self.paginator, "apaginate_queryset", None)
+        if paginate is None:
+            paginate = sync_to_async(self.paginator.paginate_queryset)
+        return await paginate(queryset, self.request, view=self)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(await afetch(queryset), many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
@@ -0,0 +1,302 @@
+# strategybackend/pagination.py
+import base64
+import binascii
+import json
+import operator
+from collections import namedtuple
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import reduce
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple("Cursor", ["values", "reverse"])
+Key = namedtuple("Key", ["name", "descending", "nullable"])
+
+
+def _encode_value(value):
+    # Keep full precision: DjangoJSONEncoder truncates microseconds, which
+    # would make two rows created in the same millisecond collide.
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset (seek) pagination for every list endpoint.
+
+    - Orders by whatever OrderingFilter resolved (or the view's `ordering`,
+      or `-created_at`) and always appends the primary key as tie-breaker,
+      so pages are stable even when many rows share a timestamp.
+    - Pages are fetched with `WHERE (key) > (last key) LIMIT n+1`, so the
+      cost of page 1000 is the same as page 1.
+    - Cursors are opaque base64 tokens; clients only follow `next`/`previous`.
+    - Search results annotated with `search_rank` are ordered by relevance
+      unless the client passed an explicit ?ordering=.
+    - `?count=exact` adds a COUNT(*), `?count=estimate` uses the planner's
+      row estimate on PostgreSQL (exact count elsewhere). No count by default.
+    """
+
+    ordering = "-created_at"
+    rank_annotation = "search_rank"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    count_query_param = "count"
+    count_modes = ("exact", "estimate")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        window = self._prepare(queryset, request, view)
+        if window is None:
+            return None
+        self.count = self.get_count(queryset, request)
+        return self._set_page(list(window))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views (strategybackend.asyncviews)."""
+        window = self._prepare(queryset, request, view)
+        if window is None:
+            return None
+        self.count = await sync_to_async(self.get_count)(queryset, request)
+        return self._set_page(
+            [obj async for obj in window.aiterator(chunk_size=self.page_size + 1)]
+        )
+
+    def _prepare(self, queryset, request, view):
+        """Parse the request and return the (unevaluated) page window."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.keys = self.get_keys(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_seek_filter(self.cursor))
+        return queryset[: self.page_size + 1]
+
+    def _set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    # ----------------------
+    # Ordering
+    # ----------------------
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                if request.query_params.get(backend.ordering_param):
+                    ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering and self.rank_annotation in queryset.query.annotations:
+            ordering = ["-" + self.rank_annotation]
+        if not ordering:
+            ordering = getattr(view, "ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        return list(ordering)
+
+    def get_keys(self, request, queryset, view):
+        opts = queryset.model._meta
+        keys = []
+        for field in self.get_ordering(request, queryset, view):
+            name = field.lstrip("-")
+            if name == opts.pk.name:
+                name = "pk"
+            nullable = name not in queryset.query.annotations and self._is_nullable(
+                opts, name
+            )
+            keys.append(Key(name, field.startswith("-"), nullable))
+        if not any(key.name == "pk" for key in keys):
+            keys.append(Key("pk", keys[0].descending, False))
+        return keys
+
+    @staticmethod
+    def _is_nullable(opts, name):
+        if name == "pk":
+            return False
+        try:
+            return opts.get_field(name).null
+        except FieldDoesNotExist:
+            # Related lookups (a__b) may hit NULL through an outer join.
+            return True
+
+    def get_order_by(self, reverse=False):
+        order_by = []
+        for key in self.keys:
+            descending = key.descending != reverse
+            if not key.nullable:
+                order_by.append(f"-{key.name}" if descending else key.name)
+                continue
+            # NULLs always sort last in the forward direction.
+            nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+            expression = F(key.name)
+            order_by.append(
+                expression.desc(**nulls) if descending else expression.asc(**nulls)
+            )
+        return order_by
+
+    def get_seek_filter(self, cursor):
+        """
+        Rows strictly after (or before, for a reverse cursor) the cursor
+        position, expanded as (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        terms = []
+        equal = Q()
+        for key, value in zip(self.keys, cursor.values):
+            beyond = self._beyond(key, value, cursor.reverse)
+            if beyond is not None:
+                terms.append(equal & beyond)
+            if value is None:
+                equal &= Q(**{f"{key.name}__isnull": True})
+            else:
+                equal &= Q(**{key.name: value})
+        if not terms:
+            return Q(pk__in=[])
+        return reduce(operator.or_, terms)
+
+    @staticmethod
+    def _beyond(key, value, reverse):
+        if not reverse:
+            if value is None:
+                return None
+            lookup = "lt" if key.descending else "gt"
+            condition = Q(**{f"{key.name}__{lookup}": value})
+            if key.nullable:
+                condition |= Q(**{f"{key.name}__isnull": True})
+            return condition
+        if value is None:
+            return Q(**{f"{key.name}__isnull": False})
+        lookup = "gt" if key.descending else "lt"
+        return Q(**{f"{key.name}__{lookup}": value})
+
+    # ----------------------
+    # Cursors
+    # ----------------------
+    def _ordering_signature(self):
+        return [("-" if key.descending else "") + key.name for key in self.keys]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            values = payload["v"]
+            reverse = bool(payload.get("r"))
+            signature = payload["o"]
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if signature != self._ordering_signature() or len(values) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(values=values, reverse=reverse)
+
+    def encode_cursor(self, cursor):
+        payload = {"o": self._ordering_signature(), "v": cursor.values}
+        if cursor.reverse:
+            payload["r"] = 1
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        encoded = base64.urlsafe_b64encode(data).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, instance):
+        values = []
+        for key in self.keys:
+            value = instance
+            for attr in key.name.split("__"):
+                value = getattr(value, attr, None) if value is not None else None
+            values.append(_encode_value(value))
+        return values
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(self._position(self.page[-1]), False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(self._position(self.page[0]), True))
+
+    # ----------------------
+    # Counting
+    # ----------------------
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode not in self.count_modes:
+            return None
+        if mode == "estimate":
+            estimate = self.estimate_count(queryset)
+            if estimate is not None:
+                return estimate
+        return queryset.count()
+
+    def estimate_count(self, queryset):
+        """Planner row estimate from EXPLAIN; avoids scanning the table."""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    # ----------------------
+    # Response
+    # ----------------------
+    def get_paginated_response(self, data):
+        payload = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"] = {
+            "type": "integer",
+            "example": 123,
+            "description": f"Only present when ?{self.count_query_param}= is set.",
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include a total: 'exact' or 'estimate'.",
+                "schema": {"type": "string", "enum": list(self.count_modes)},
+            }
+        )
+        return parameters
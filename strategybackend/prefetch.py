@@ -0,0 +1,174 @@
+# strategybackend/prefetch.py
+from collections import namedtuple
+from functools import lru_cache
+
+from django.db.models import ForeignObjectRel, Prefetch
+from rest_framework import serializers
+
+# select: tuple of select_related lookups
+# prefetch: tuple of PlannedPrefetch
+Plan = namedtuple("Plan", ["select", "prefetch"])
+PlannedPrefetch = namedtuple("PlannedPrefetch", ["lookup", "model", "ordering", "plan"])
+
+EMPTY_PLAN = Plan((), ())
+
+
+def _get_relation(model, attr):
+    """Return the relation reachable as `model.<attr>`, or None."""
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        if isinstance(field, ForeignObjectRel):
+            name = field.get_accessor_name()
+        else:
+            name = field.name
+        if name == attr:
+            return field
+    return None
+
+
+def _is_pk_only(field, attrs):
+    # PrimaryKeyRelatedField on a local FK reads `<fk>_id`, no join needed.
+    return (
+        isinstance(field, serializers.RelatedField)
+        and len(attrs) == 1
+        and field.use_pk_only_optimization()
+    )
+
+
+def _nested_model_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.ModelSerializer):
+        return field
+    return None
+
+
+def _prefixed(lookup, plan):
+    select = tuple(f"{lookup}__{name}" for name in plan.select)
+    prefetch = tuple(
+        item._replace(lookup=f"{lookup}__{item.lookup}") for item in plan.prefetch
+    )
+    return select, prefetch
+
+
+def _plan_field(field, model, select, prefetch):
+    attrs = field.source.split(".")
+    path = []
+    current = model
+    for index, attr in enumerate(attrs):
+        relation = _get_relation(current, attr)
+        if relation is None:
+            break
+        lookup = "__".join(path + [attr])
+        is_last = index == len(attrs) - 1
+        nested = _nested_model_serializer(field) if is_last else None
+
+        if relation.many_to_many or relation.one_to_many:
+            if nested is not None:
+                meta = getattr(nested, "Meta", None)
+                prefetch.append(
+                    PlannedPrefetch(
+                        lookup,
+                        relation.related_model,
+                        tuple(getattr(meta, "ordering", ())),
+                        _plan_serializer(nested, relation.related_model),
+                    )
+                )
+            else:
+                prefetch.append(PlannedPrefetch(lookup, None, (), None))
+            return
+
+        if is_last:
+            if _is_pk_only(field, attrs):
+                return
+            select.append(lookup)
+            if nested is not None:
+                inner_select, inner_prefetch = _prefixed(
+                    lookup, _plan_serializer(nested, relation.related_model)
+                )
+                select.extend(inner_select)
+                prefetch.extend(inner_prefetch)
+            return
+
+        path.append(attr)
+        current = relation.related_model
+
+    if path:
+        # Dotted source ending on a plain attribute, e.g. "project.name".
+        select.append("__".join(path))
+
+
+def _plan_serializer(serializer, model):
+    meta = getattr(serializer, "Meta", None)
+    select = list(getattr(meta, "select_related", ()))
+    prefetch = [
+        PlannedPrefetch(lookup, None, (), None)
+        for lookup in getattr(meta, "prefetch_related", ())
+    ]
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        _plan_field(field, model, select, prefetch)
+
+    # A Prefetch() with a queryset wins over a bare lookup for the same path.
+    unique = {}
+    for item in prefetch:
+        if item.lookup not in unique or item.plan is not None:
+            unique[item.lookup] = item
+    return Plan(tuple(dict.fromkeys(select)), tuple(unique.values()))
+
+
+@lru_cache(maxsize=None)
+def get_plan(serializer_class):
+    """
+    Work out select_related/prefetch_related lookups from the fields a
+    serializer declares. Cached per serializer class.
+
+    Nested `many=True` serializers become Prefetch objects whose queryset is
+    planned recursively and ordered by the nested serializer's
+    `Meta.ordering`. SerializerMethodFields can't be inspected, so a
+    serializer may list extra lookups in `Meta.select_related` /
+    `Meta.prefetch_related`.
+    """
+    meta = getattr(serializer_class, "Meta", None)
+    model = getattr(meta, "model", None)
+    if model is None:
+        return EMPTY_PLAN
+    return _plan_serializer(serializer_class(), model)
+
+
+def apply_plan(queryset, plan):
+    if plan.select:
+        queryset = queryset.select_related(*plan.select)
+    lookups = []
+    for item in plan.prefetch:
+        if item.plan is None and not item.ordering:
+            lookups.append(item.lookup)
+            continue
+        inner = item.model._default_manager.all()
+        if item.plan is not None:
+            inner = apply_plan(inner, item.plan)
+        if item.ordering:
+            inner = inner.order_by(*item.ordering)
+        lookups.append(Prefetch(item.lookup, queryset=inner))
+    if lookups:
+        queryset = queryset.prefetch_related(*lookups)
+    return queryset
+
+
+def plan_queryset(queryset, serializer_class):
+    """Return `queryset` with the joins/prefetches `serializer_class` needs."""
+    return apply_plan(queryset, get_plan(serializer_class))
+
+
+class PrefetchPlannerMixin:
+    """
+    Viewset mixin: whatever get_queryset() returns is planned for the
+    serializer class of the current action, so listing costs a fixed
+    number of queries regardless of page size.
+    """
+
+    def get_queryset(self):
+        return plan_queryset(super().get_queryset(), self.get_serializer_class())
@@ -0,0 +1,113 @@
+# strategybackend/schema.py
+import hashlib
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+import drf_yasg
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+API_INFO = openapi.Info(
+    title="Strategy Backend API",
+    default_version="v1",
+    description="API documentation for Strategy Backend",
+    terms_of_service="https://www.example.com/terms/",
+    contact=openapi.Contact(email="support@example.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+# body: rendered JSON bytes, etag: sha256 of body, code_hash: see code_hash()
+Schema = namedtuple("Schema", ["body", "etag", "code_hash"])
+
+_lock = threading.Lock()
+_current = None
+
+
+def _source_files():
+    """Python sources that can change the schema: URLconfs, views, serializers..."""
+    base = Path(settings.BASE_DIR)
+    roots = {base / settings.ROOT_URLCONF.split(".")[0]}
+    # Project apps only; installed packages are covered by the versions.
+    roots.update(
+        Path(config.path)
+        for config in apps.get_app_configs()
+        if Path(config.path).parent == base
+    )
+    for root in sorted(roots):
+        for path in sorted(root.rglob("*.py")):
+            parts = path.relative_to(root).parts
+            if "migrations" in parts or "management" in parts:
+                continue
+            yield path
+
+
+@lru_cache(maxsize=None)
+def code_hash():
+    """
+    Fingerprint of everything the schema is generated from. Computed once
+    per process; a deploy with changed code gets a new process anyway.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"drf_yasg={drf_yasg.__version__};".encode())
+    digest.update(f"rest_framework={rest_framework.__version__};".encode())
+    base = Path(settings.BASE_DIR)
+    for path in _source_files():
+        digest.update(str(path.relative_to(base)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _hash_file(path):
+    return path.with_name(path.name + ".sha256")
+
+
+def _schema(body, source_hash):
+    return Schema(body, hashlib.sha256(body).hexdigest(), source_hash)
+
+
+def generate_schema():
+    """Introspect the URLconf and render the public schema as JSON bytes."""
+    generator = OpenAPISchemaGenerator(API_INFO)
+    schema = generator.get_schema(request=None, public=True)
+    body = OpenAPICodecJson(validators=[]).encode(schema)
+    return _schema(body, code_hash())
+
+
+def read_schema_file(path=None):
+    """The schema written by `manage.py generate_schema`, or None if missing or stale."""
+    path = Path(path or settings.OPENAPI_SCHEMA_FILE)
+    try:
+        source_hash = _hash_file(path).read_text().strip()
+        if source_hash != code_hash():
+            return None
+        return _schema(path.read_bytes(), source_hash)
+    except OSError:
+        return None
+
+
+def write_schema_file(schema, path=None):
+    path = Path(path or settings.OPENAPI_SCHEMA_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(schema.body)
+    # Written last: a crash in between leaves a file that reads as stale.
+    _hash_file(path).write_text(schema.code_hash + "\n")
+
+
+def get_schema():
+    """
+    The schema served by /swagger.json/. Loaded from the pre-generated file
+    when it matches the running code, otherwise built once in-process.
+    """
+    global _current
+    if _current is not None:
+        return _current
+    with _lock:
+        if _current is None:
+            _current = read_schema_file() or generate_schema()
+    return _current
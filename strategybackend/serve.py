@@ -0,0 +1,345 @@
+# strategybackend/serve.py
+"""
+Production server entry point: python -m strategybackend.serve [--asgi]
+
+Runs gunicorn with worker/thread counts sized from the CPUs and memory
+available to the container, the Django app preloaded in the master so
+workers share it copy-on-write, and workers recycled after a jittered
+number of requests. WSGI mode uses gthread workers; ASGI mode uses uvicorn
+workers (and with them the async read views, see strategybackend.asyncviews).
+Prints a report of every decision before starting; --dry-run stops there.
+Runs a single worker while Django's cache is per-process (see
+users.checks), as cache invalidations would only reach one of them.
+
+Every option has an environment variable so containers can be tuned
+without changing the command.
+"""
+
+import argparse
+import math
+import os
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from gunicorn.app.base import BaseApplication
+
+# One line of the startup report.
+Choice = namedtuple("Choice", ["setting", "value", "reason"])
+
+# Memory kept free for the master, the kernel and anything else in the
+# container, and growth allowance of a worker over its size right after
+# the app is loaded.
+MEMORY_HEADROOM = 0.25
+WORKER_GROWTH = 1.5
+DEFAULT_WORKER_MB = 160
+
+
+def _read(path):
+    try:
+        return Path(path).read_text().strip()
+    except OSError:
+        return None
+
+
+def detect_cpus():
+    """(cpus, source): cgroup CPU quota if set, else the CPUs we may run on."""
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = os.cpu_count() or 1
+
+    quota = None
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")  # cgroup v2: "<quota> <period>"
+    if cpu_max and not cpu_max.startswith("max"):
+        limit, period = cpu_max.split()
+        quota = int(limit) / int(period)
+    else:  # cgroup v1
+        limit = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if limit and period and int(limit) > 0:
+            quota = int(limit) / int(period)
+
+    if quota is not None and quota < available:
+        return max(1, math.ceil(quota)), f"cgroup quota {quota:g}"
+    return available, "scheduler affinity"
+
+
+def detect_memory():
+    """(bytes, source): cgroup memory limit if set, else physical memory."""
+    physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for path in (
+        "/sys/fs/cgroup/memory.max",  # cgroup v2
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",  # cgroup v1
+    ):
+        value = _read(path)
+        if value and value.isdigit() and int(value) < physical:
+            return int(value), "cgroup limit"
+    return physical, "physical memory"
+
+
+def current_rss():
+    """Resident memory of this process in bytes (Linux), or None."""
+    status = _read("/proc/self/status") or ""
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+def configure_environment(mode):
+    """
+    Set what the settings read from the environment for `mode`. Must run
+    before anything imports them: without preload the master still reads
+    the settings (uses_process_local_cache) before any worker imports
+    strategybackend.asgi, which sets ASYNC_VIEWS too late for them.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "strategybackend.settings")
+    if mode == "asgi":
+        os.environ.setdefault("ASYNC_VIEWS", "True")
+
+
+def uses_process_local_cache():
+    from users.checks import uses_process_local_cache
+
+    return uses_process_local_cache()
+
+
+def load_application(mode):
+    configure_environment(mode)
+    if mode == "asgi":
+        from strategybackend.asgi import application
+    else:
+        from strategybackend.wsgi import application
+
+    # Nothing should have connected yet, but forked workers must never
+    # share a connection opened by the master.
+    from django.db import connections
+
+    connections.close_all()
+    return application
+
+
+def plan(options, cpus, memory, app_rss, shared_cache=True):
+    """Return (gunicorn settings, report lines)."""
+    cpus, cpu_source = cpus
+    memory, memory_source = memory
+    asgi = options.mode == "asgi"
+    report = [
+        Choice("cpus", cpus, cpu_source),
+        Choice("memory", f"{memory // 2**20} MiB", memory_source),
+    ]
+
+    if app_rss:
+        worker_bytes = int(app_rss * WORKER_GROWTH)
+        report.append(
+            Choice(
+                "worker size",
+                f"~{worker_bytes // 2**20} MiB",
+                f"app RSS after preload {app_rss // 2**20} MiB x {WORKER_GROWTH}",
+            )
+        )
+    else:
+        worker_bytes = DEFAULT_WORKER_MB * 2**20
+        report.append(
+            Choice("worker size", f"~{DEFAULT_WORKER_MB} MiB", "assumed (no preload)")
+        )
+
+    # An event loop per core is enough for ASGI; sync workers block on I/O,
+    # so WSGI gets the usual 2 x cores + 1.
+    by_cpu = cpus if asgi else 2 * cpus + 1
+    by_memory = max(1, int(memory * (1 - MEMORY_HEADROOM)) // worker_bytes)
+    if options.workers:
+        workers, reason = options.workers, "set by --workers/WEB_CONCURRENCY"
+    else:
+        workers = max(1, min(by_cpu, by_memory))
+        reason = (
+            f"min({'cores' if asgi else '2 x cores + 1'} = {by_cpu}, "
+            f"fits in {int((1 - MEMORY_HEADROOM) * 100)}% of memory = {by_memory})"
+        )
+    if workers > 1 and not shared_cache:
+        workers = 1
+        reason = "per-process cache; set CACHE_BACKEND to a shared one for more"
+    report.append(Choice("workers", workers, reason))
+
+    settings = {
+        "bind": options.bind,
+        "workers": workers,
+        "preload_app": options.preload,
+        "max_requests": options.max_requests,
+        "max_requests_jitter": options.max_requests_jitter,
+        "timeout": options.timeout,
+        "graceful_timeout": options.graceful_timeout,
+        "keepalive": options.keepalive,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+    if asgi:
+        settings["worker_class"] = "uvicorn_worker.UvicornWorker"
+        report.append(
+            Choice(
+                "worker class",
+                "uvicorn",
+                "ASGI: one event loop per worker, async read views",
+            )
+        )
+        capacity = (
+            "many in flight per worker",
+            "bounded by the event loop and the database pool",
+        )
+    else:
+        settings["worker_class"] = "gthread"
+        settings["threads"] = options.threads
+        report.append(
+            Choice(
+                "worker class",
+                f"gthread x {options.threads} threads",
+                "WSGI: a slow request ties up one thread, not a whole worker",
+            )
+        )
+        capacity = (f"{workers * options.threads} requests", "workers x threads")
+    report.append(Choice("concurrency", *capacity))
+
+    report.append(
+        Choice(
+            "preload",
+            "on" if options.preload else "off",
+            (
+                "app imported once in the master, shared copy-on-write"
+                if options.preload
+                else "each worker imports the app"
+            ),
+        )
+    )
+    report.append(
+        Choice(
+            "max requests",
+            f"{options.max_requests} + 0..{options.max_requests_jitter}",
+            "recycle workers to cap memory growth; jitter staggers restarts",
+        )
+    )
+    report.append(
+        Choice(
+            "keep-alive",
+            f"{options.keepalive}s",
+            "reuse connections from nginx between requests",
+        )
+    )
+    report.append(
+        Choice("timeout", f"{options.timeout}s", "kill workers stuck longer than this")
+    )
+
+    # Heartbeat files on a tmpfs, so a slow disk can't make workers look dead.
+    if Path("/dev/shm").is_dir():
+        settings["worker_tmp_dir"] = "/dev/shm"
+    return settings, report
+
+
+def format_report(options, report):
+    width = max(len(choice.setting) for choice in report)
+    value_width = max(len(str(choice.value)) for choice in report)
+    lines = [f"strategybackend.serve: {options.mode.upper()} on {options.bind}"]
+    for choice in report:
+        lines.append(
+            f"  {choice.setting:<{width}}  {str(choice.value):<{value_width}}  "
+            f"{choice.reason}"
+        )
+    return "\n".join(lines)
+
+
+class StrategyApplication(BaseApplication):
+    def __init__(self, application, settings):
+        self.application = application
+        self.settings = settings
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.settings.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if self.application is None:
+            self.application = load_application(
+                "asgi" if "uvicorn" in self.settings["worker_class"] else "wsgi"
+            )
+        return self.application
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m strategybackend.serve",
+        description="Run the API under gunicorn with workers sized for this machine.",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--asgi", dest="mode", action="store_const", const="asgi")
+    mode.add_argument("--wsgi", dest="mode", action="store_const", const="wsgi")
+    parser.set_defaults(mode=os.getenv("SERVE_MODE", "wsgi").lower())
+    parser.add_argument("--bind", default=os.getenv("BIND", "0.0.0.0:8000"))
+    parser.add_argument("--workers", type=int, default=_env_int("WEB_CONCURRENCY", 0))
+    parser.add_argument("--threads", type=int, default=_env_int("GUNICORN_THREADS", 4))
+    parser.add_argument(
+        "--max-requests", type=int, default=_env_int("MAX_REQUESTS", 1000)
+    )
+    parser.add_argument(
+        "--max-requests-jitter",
+        type=int,
+        default=_env_int("MAX_REQUESTS_JITTER", 0),
+        help="Defaults to 10%% of --max-requests.",
+    )
+    parser.add_argument("--timeout", type=int, default=_env_int("TIMEOUT", 60))
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=_env_int("GRACEFUL_TIMEOUT", 30)
+    )
+    parser.add_argument("--keepalive", type=int, default=_env_int("KEEPALIVE", 5))
+    parser.add_argument(
+        "--no-preload",
+        dest="preload",
+        action="store_false",
+        default=os.getenv("PRELOAD", "True") == "True",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the report and exit."
+    )
+    options = parser.parse_args(argv)
+    if options.mode not in ("wsgi", "asgi"):
+        parser.error("SERVE_MODE must be 'wsgi' or 'asgi'")
+    if not options.max_requests_jitter:
+        options.max_requests_jitter = options.max_requests // 10
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    configure_environment(options.mode)
+    application = None
+    app_rss = None
+    if options.preload:
+        application = load_application(options.mode)
+        app_rss = current_rss()
+
+    shared_cache = not uses_process_local_cache()
+    settings, report = plan(
+        options, detect_cpus(), detect_memory(), app_rss, shared_cache
+    )
+    print(format_report(options, report), flush=True)
+    if not shared_cache:
+        print(
+            "Warning: Django's cache (LocMemCache) is per-process, so only one "
+            "worker is started. Set CACHE_BACKEND/CACHE_LOCATION to a shared "
+            "cache such as redis to run more.",
+            file=sys.stderr,
+            flush=True,
+        )
+    if options.dry_run:
+        return 0
+    StrategyApplication(application, settings).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
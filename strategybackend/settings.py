@@ -3,6 +3,8 @@ from pathlib import Path
 from datetime import timedelta  # import this library top of the settings.py file
 from dotenv import load_dotenv
 
+from strategybackend.database import database_config
+
 load_dotenv()  # Load environment variables from .env file
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -30,11 +32,13 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # search lookups; harmless on SQLite
     "users",  # Custom user app
     "rest_framework",
     "rest_framework_simplejwt",
     "corsheaders",  # For handling CORS
     "partners",
+    "jobs",  # Background jobs (manage.py run_workers)
     "django_extensions",
     "drf_yasg",
 ]
@@ -74,22 +78,9 @@ WSGI_APPLICATION = "strategybackend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-# DATABASES = {
-#     "default": {
-#         "ENGINE": "django.db.backends.postgresql",
-#         "NAME": os.environ.get("POSTGRES_DB"),
-#         "USER": os.environ.get("POSTGRES_USER"),
-#         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
-#         "HOST": os.environ.get("POSTGRES_HOST"),
-#         "PORT": os.environ.get("POSTGRES_PORT", 5432),
-#     }
-# }
-
+# DATABASE_URL or POSTGRES_* (pooled), else SQLite; see strategybackend/database.py
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": database_config(BASE_DIR),
 }
 
 # Password validation
@@ -112,15 +103,17 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.JWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_PAGINATION_CLASS": "strategybackend.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
 }
 
 REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = [
-    "rest_framework_simplejwt.authentication.JWTAuthentication",
+    "users.authentication.JWTAuthentication",
 ]
 
 SIMPLE_JWT = {
@@ -129,8 +122,56 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_LIFETIME": timedelta(days=30),
     "SLIDING_TOKEN_REFRESH_LIFETIME_LATE_USER": timedelta(days=1),
     "SLIDING_TOKEN_LIFETIME_LATE_USER": timedelta(days=30),
+    # Issue access tokens through users.tokens (see JWT_EMBED_PRINCIPAL).
+    "TOKEN_OBTAIN_SERIALIZER": "users.tokens.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.TokenRefreshSerializer",
+}
+
+# users.authentication: how many verified tokens each process remembers
+# (until they expire), and whether access tokens carry the user's principal
+# (is_active, is_sys_admin, department IDs, ...). Embedded principals save a
+# cache lookup per request but changes to the user only reach requests when
+# the access token is refreshed.
+JWT_VERIFY_CACHE_SIZE = int(os.getenv("JWT_VERIFY_CACHE_SIZE", 10000))
+JWT_EMBED_PRINCIPAL = os.getenv("JWT_EMBED_PRINCIPAL", "False") == "True"
+
+
+# Caches
+# Defaults to a per-process cache, fine for a single process (runserver).
+# Anything more (several gunicorn workers, run_workers) needs a shared backend
+# such as redis (docker-compose.prod.yml), or invalidations only reach one
+# process: strategybackend.serve refuses to start several workers without
+# it and `manage.py check --deploy` reports it (users.E001).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "strategybackend"),
+    }
 }
 
+# Seconds a user's department IDs stay cached (invalidated on change).
+DEPARTMENT_SCOPE_CACHE_TIMEOUT = int(os.getenv("DEPARTMENT_SCOPE_CACHE_TIMEOUT", 300))
+# Seconds a user's effective permission set stays cached (users.authz).
+PERMISSION_CACHE_TIMEOUT = int(os.getenv("PERMISSION_CACHE_TIMEOUT", 300))
+# Seconds a user's principal (users.principal) stays cached.
+PRINCIPAL_CACHE_TIMEOUT = int(os.getenv("PRINCIPAL_CACHE_TIMEOUT", 300))
+# Seconds a rendered partner detail payload stays cached (partners.cache).
+PARTNER_DETAIL_CACHE_TIMEOUT = int(os.getenv("PARTNER_DETAIL_CACHE_TIMEOUT", 600))
+# Serve the partner list and export from the PartnerSummary read model
+# (partners.summary) instead of joining Partner with its related tables.
+PARTNER_LIST_FROM_SUMMARY = os.getenv("PARTNER_LIST_FROM_SUMMARY", "True") == "True"
+# Seconds /api/partners/stats/ and /api/projects/stats/ responses are cached
+# (partners.stats), and whether sys admins' unfiltered partner stats are read
+# from the PostgreSQL materialized view (refresh with refresh_stats_views).
+STATS_CACHE_TIMEOUT = int(os.getenv("STATS_CACHE_TIMEOUT", 60))
+STATS_MATERIALIZED_VIEW = os.getenv("STATS_MATERIALIZED_VIEW", "False") == "True"
+
+# Serve the read endpoints with native async views (strategybackend.asyncviews).
+# Turned on by strategybackend/asgi.py; WSGI keeps the synchronous views.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -149,6 +190,52 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"  # For Render collectstatic
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Staging files of resumable document uploads (partners.uploads); must be on
+# the same filesystem as MEDIA_ROOT so finalizing moves rather than copies.
+DOCUMENT_UPLOAD_DIR = Path(os.getenv("DOCUMENT_UPLOAD_DIR", MEDIA_ROOT / ".uploads"))
+# Largest document accepted by a resumable upload (bytes, default 2 GiB).
+DOCUMENT_UPLOAD_MAX_SIZE = int(os.getenv("DOCUMENT_UPLOAD_MAX_SIZE", 2 * 1024**3))
+# Largest single chunk (bytes, default 16 MiB); keep nginx's
+# client_max_body_size above it.
+DOCUMENT_UPLOAD_MAX_CHUNK = int(os.getenv("DOCUMENT_UPLOAD_MAX_CHUNK", 16 * 1024**2))
+# Hash uploaded files while they stream in, for content-addressed storage
+# (partners.blobs).
+FILE_UPLOAD_HANDLERS = [
+    "partners.blobs.HashingMemoryFileUploadHandler",
+    "partners.blobs.HashingTemporaryFileUploadHandler",
+]
+# Behind nginx, hand document downloads to it with X-Accel-Redirect to this
+# internal location (nginx/default.conf) instead of streaming them from a
+# worker.
+DOCUMENT_ACCEL_REDIRECT = os.getenv("DOCUMENT_ACCEL_REDIRECT", "False") == "True"
+DOCUMENT_ACCEL_REDIRECT_LOCATION = os.getenv(
+    "DOCUMENT_ACCEL_REDIRECT_LOCATION", "/protected-media/"
+)
+
+# Background jobs (jobs app): worker processes started by run_workers and
+# how often an idle worker polls the queue (seconds).
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+# Attempts per job unless its task says otherwise; the wait before a retry
+# doubles from JOB_RETRY_BACKOFF up to JOB_RETRY_BACKOFF_MAX seconds.
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_BACKOFF = int(os.getenv("JOB_RETRY_BACKOFF", 10))
+JOB_RETRY_BACKOFF_MAX = int(os.getenv("JOB_RETRY_BACKOFF_MAX", 3600))
+# A running job's worker refreshes it every JOB_HEARTBEAT_INTERVAL seconds;
+# one without a heartbeat for JOB_TIMEOUT seconds is assumed to have lost
+# its worker and is queued again.
+JOB_HEARTBEAT_INTERVAL = int(os.getenv("JOB_HEARTBEAT_INTERVAL", 30))
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", 300))
+
+# Monthly partitions of the status / risk level history (PostgreSQL):
+# months created ahead by `manage.py history_partitions`, months of history
+# kept (0 keeps everything), and where older months are archived as
+# gzipped CSV before their partitions are dropped.
+HISTORY_PARTITIONS_AHEAD = int(os.getenv("HISTORY_PARTITIONS_AHEAD", 3))
+HISTORY_RETENTION_MONTHS = int(os.getenv("HISTORY_RETENTION_MONTHS", 0))
+HISTORY_ARCHIVE_DIR = Path(
+    os.getenv("HISTORY_ARCHIVE_DIR", BASE_DIR / "archive" / "history")
+)
 
 
 # Default primary key field type
@@ -165,4 +252,14 @@ SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"}
     },
+    # The UIs load the cached document instead of generating their own.
+    "SPEC_URL": "schema-json",
+}
+REDOC_SETTINGS = {
+    "SPEC_URL": "schema-json",
 }
+
+# Written by `manage.py generate_schema`, served by /swagger.json/.
+OPENAPI_SCHEMA_FILE = Path(
+    os.getenv("OPENAPI_SCHEMA_FILE", BASE_DIR / "schema" / "openapi.json")
+)
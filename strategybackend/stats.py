@@ -0,0 +1,25 @@
+# strategybackend/stats.py
+from django.db import connections
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from strategybackend.database import pool_stats
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    GET /api/db-pool-stats/  (sys admins only)
+    Connection pool counters of this worker process, per database alias
+    (null when the database isn't pooled).
+    """
+
+    def get(self, request):
+        if not request.user.is_sys_admin:
+            return Response(
+                {"detail": "Only sys admins can view pool statistics."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(
+            {alias: pool_stats(connections[alias]) for alias in connections}
+        )
@@ -1,26 +1,46 @@
 # strategybackend/swagger_urls.py
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from django.http import HttpResponse
 from django.urls import path
+from django.views.decorators.http import condition, require_safe
+from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from strategybackend.schema import API_INFO, get_schema
 
+# The UI pages only render the HTML shell (their own schema is empty); the
+# browser then fetches the document from schema-json, see SPEC_URL in
+# SWAGGER_SETTINGS / REDOC_SETTINGS.
 schema_view = get_schema_view(
-    openapi.Info(
-        title="Strategy Backend API",
-        default_version="v1",
-        description="API documentation for Strategy Backend",
-        terms_of_service="https://www.example.com/terms/",
-        contact=openapi.Contact(email="support@example.com"),
-        license=openapi.License(name="MIT License"),
-    ),
+    API_INFO,
     public=True,
     permission_classes=(permissions.AllowAny,),
 )
 
+
+@require_safe
+@condition(etag_func=lambda request: get_schema().etag)
+def schema_json(request):
+    """
+    Pre-generated OpenAPI document (manage.py generate_schema), built once
+    per process if the file is missing or older than the code. Clients
+    revalidate with If-None-Match and get a 304 while it is unchanged.
+    """
+    response = HttpResponse(get_schema().body, content_type="application/json")
+    response["Cache-Control"] = "public, no-cache"
+    return response
+
+
 swagger_urls = [
     path(
-        "swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="swagger-ui"
+        "swagger/",
+        schema_view.as_cached_view(renderer_classes=[SwaggerUIRenderer]),
+        name="swagger-ui",
+    ),
+    path("swagger.json/", schema_json, name="schema-json"),
+    path(
+        "redoc/",
+        schema_view.as_cached_view(renderer_classes=[ReDocRenderer]),
+        name="redoc",
     ),
-    path("swagger.json/", schema_view.without_ui(cache_timeout=0), name="schema-json"),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="redoc"),
 ]
@@ -1,6 +1,7 @@
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib import admin
 from django.urls import path, include
+from strategybackend.stats import DatabasePoolStatsView
 from strategybackend.swagger_urls import swagger_urls
 from django.views.generic import RedirectView
 from django.contrib.auth import views as auth_views
@@ -11,6 +12,12 @@ urlpatterns = [
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/", include("users.urls")),
     path("api/", include("partners.urls")),
+    path("api/", include("jobs.urls")),
+    path(
+        "api/db-pool-stats/",
+        DatabasePoolStatsView.as_view(),
+        name="db_pool_stats",
+    ),
     # Add authentication URLs to fix the 404 error
     path(
         "accounts/login/",
@@ -0,0 +1,165 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .authz import CacheStats
+from .principal import aget_principal_data, build_principal, get_principal_data
+from .tokens import PRINCIPAL_CLAIM
+
+
+class VerifiedTokenCache:
+    """
+    Per-process LRU of validated tokens keyed by the SHA-256 of the raw
+    token. An entry is only returned until the token's own expiry, so a
+    cached verification never outlives what verifying again would accept.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                token, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return token
+                del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+    def set(self, key, token, expires_at):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (token, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache(settings.JWT_VERIFY_CACHE_SIZE)
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    simplejwt's JWTAuthentication without database round-trips.
+
+    - Verifying a token (signature, expiry, type) is done once per token and
+      remembered in `token_cache` until the token expires.
+    - request.user is a principal (users.principal): a User with only the
+      fields authorization needs and the department IDs pre-set, read from
+      the access token itself when it embeds them (JWT_EMBED_PRINCIPAL) or
+      else from the principal cache.
+
+    Has an async counterpart, used by the async views
+    (strategybackend.asyncviews).
+    """
+
+    def get_validated_token(self, raw_token):
+        key = token_cache.key(raw_token)
+        validated_token = token_cache.get(key)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.set(key, validated_token, validated_token["exp"])
+        return validated_token
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+    def embedded_principal(self, validated_token, user_id):
+        if not settings.JWT_EMBED_PRINCIPAL:
+            return None
+        data = validated_token.get(PRINCIPAL_CLAIM)
+        if data is None or data.get("id") != str(user_id):
+            return None
+        return data
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which principals don't carry.
+            return super().get_user(validated_token)
+        user_id = self.get_user_id(validated_token)
+        data = self.embedded_principal(validated_token, user_id)
+        if data is None:
+            data = get_principal_data(user_id)
+        return self.principal_user(data, validated_token)
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if api_settings.CHECK_REVOKE_TOKEN:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                ) from e
+            self.check_user(user, validated_token)
+            return user
+
+        data = self.embedded_principal(validated_token, user_id)
+        if data is None:
+            data = await aget_principal_data(user_id)
+        return self.principal_user(data, validated_token)
+
+    def principal_user(self, data, validated_token):
+        if data is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user = build_principal(data)
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token):
+        # Same checks simplejwt applies in get_user().
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Invalidations bump or delete these keys, so every process must share the
+# cache (see users.checks); a per-process cache only forgets in one of them.
+VERSION_KEY = "users:authz:version"
+PERMISSIONS_KEY = "users:authz:permissions:{version}:{user_id}"
+
+
+class CacheStats:
+    """Per-process hit/miss counters of a cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+class PermissionStats(CacheStats):
+    """
+    CacheStats that also counts lookups answered by the per-request memo,
+    which never reach the cache and so are not cache hits.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.memo_hits = 0
+
+    def as_dict(self):
+        return {**super().as_dict(), "memo_hits": self.memo_hits}
+
+
+stats = PermissionStats()
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def _permissions_key(user_id):
+    return PERMISSIONS_KEY.format(version=_version(), user_id=user_id)
+
+
+def get_cached_permissions(user):
+    """
+    Effective permission names for `user` as a frozenset.
+
+    Memoized on the instance for the rest of the request and in the cache
+    under a versioned key; see users.signals for invalidation.
+    """
+    permissions = getattr(user, "_all_permissions", None)
+    if permissions is not None:
+        stats.memo_hits += 1
+        return permissions
+
+    key = _permissions_key(user.pk)
+    permissions = cache.get(key)
+    if permissions is None:
+        stats.misses += 1
+        permissions = frozenset(user.resolve_permissions())
+        cache.set(key, permissions, settings.PERMISSION_CACHE_TIMEOUT)
+    else:
+        stats.hits += 1
+    user._all_permissions = permissions
+    return permissions
+
+
+def invalidate_user_permissions(*user_ids):
+    """Drop the cached permission set of specific users."""
+    version = _version()
+    cache.delete_many(
+        [PERMISSIONS_KEY.format(version=version, user_id=pk) for pk in user_ids]
+    )
+
+
+def invalidate_all_permissions():
+    """Role or department definitions changed: orphan every cached entry."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Cache backends whose entries live inside one process: a deletion there
+# never reaches the other web workers or run_workers.
+PROCESS_LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def uses_process_local_cache():
+    return settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cached principals, department scopes, permissions and partner details
+    are invalidated by deleting cache keys, which only works when every
+    process shares the cache.
+    """
+    if settings.DEBUG or not uses_process_local_cache():
+        return []
+    return [
+        Error(
+            "The default cache is per-process, so invalidations of cached "
+            "users and partner details only reach the process that made the "
+            "change; others keep serving stale access until the entries expire.",
+            hint=(
+                "Set CACHE_BACKEND and CACHE_LOCATION to a shared cache (e.g. "
+                "django.core.cache.backends.redis.RedisCache) when running more "
+                "than one web worker or run_workers."
+            ),
+            id="users.E001",
+        )
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_user_permissions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="role",
+            name="level",
+            field=models.CharField(
+                choices=[
+                    ("employee", "Employee"),
+                    ("manager", "Manager"),
+                    ("ceo", "CEO"),
+                ],
+                default="employee",
+                max_length=20,
+            ),
+        ),
+    ]
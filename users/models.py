@@ -55,21 +55,41 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="user_created_idx"),
+        ]
+
+    def _role_ids(self):
+        # The user's own role plus every role granted through a department.
+        department_ids = User.departments.through.objects.filter(
+            user_id=self.pk
+        ).values("department_id")
+        department_roles = Department.roles.through.objects.filter(
+            department_id__in=department_ids
+        ).values("role_id")
+        return models.Q(id=self.role_id) | models.Q(id__in=department_roles)
+
     def get_all_roles(self):
-        roles = set()
-        if self.role:
-            roles.add(self.role)
-        for department in self.departments.all():
-            for role in department.roles.all():
-                roles.add(role)
-        return roles
+        return set(Role.objects.filter(self._role_ids()))
+
+    def resolve_permissions(self):
+        """
+        Names of the permissions granted by the user's roles, in a single
+        query (uncached).
+        """
+        role_ids = Role.objects.filter(self._role_ids()).values("id")
+        granted = Role.permissions.through.objects.filter(
+            role_id__in=role_ids
+        ).values("permission_id")
+        return set(
+            Permission.objects.filter(id__in=granted).values_list("name", flat=True)
+        )
 
     def get_all_permissions(self, obj=...):
-        permissions = set()
-        for role in self.get_all_roles():
-            for permission in role.permissions.all():
-                permissions.add(permission.name)
-        return permissions
+        from .authz import get_cached_permissions
+
+        return set(get_cached_permissions(self))
 
     def __str__(self):
         return self.username
@@ -0,0 +1,112 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .authz import CacheStats
+from .models import User
+
+PRINCIPAL_KEY = "users:principal:{user_id}"
+
+# User fields carried by a principal; everything else is deferred and loaded
+# from the database only if something actually reads it.
+PRINCIPAL_FIELDS = (
+    "id",
+    "username",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "is_sys_admin",
+    "role_id",
+)
+
+stats = CacheStats()
+
+
+def _key(user_id):
+    return PRINCIPAL_KEY.format(user_id=user_id)
+
+
+def build_principal(data):
+    """
+    A User instance for request.user built from principal data.
+
+    Only PRINCIPAL_FIELDS are loaded (the rest are deferred, so reading
+    them costs a query and saving writes just the loaded fields) and the
+    department IDs are pre-set for users.scope, so authorizing the request
+    needs no query at all.
+    """
+    fields = [f for f in User._meta.concrete_fields if f.attname in data]
+    user = User.from_db(
+        DEFAULT_DB_ALIAS,
+        [f.attname for f in fields],
+        [f.to_python(data[f.attname]) for f in fields],
+    )
+    user._department_ids = frozenset(uuid.UUID(pk) for pk in data["department_ids"])
+    return user
+
+
+def _serialize(row, department_ids):
+    # JSON-safe, so the same data can be embedded in a token.
+    data = {
+        field: str(value) if isinstance(value, uuid.UUID) else value
+        for field, value in row.items()
+    }
+    data["department_ids"] = sorted(str(pk) for pk in department_ids)
+    return data
+
+
+def _departments(user_id):
+    return User.departments.through.objects.filter(user_id=user_id).values_list(
+        "department_id", flat=True
+    )
+
+
+def get_principal_data(user_id):
+    """
+    Principal data of `user_id` from the cache, or None if there is no such
+    user. A miss costs two queries; users.signals drops the entry when the
+    user or their departments change.
+    """
+    key = _key(user_id)
+    data = cache.get(key)
+    if data is not None:
+        stats.hits += 1
+        return data
+    stats.misses += 1
+    row = User.objects.filter(pk=user_id).values(*PRINCIPAL_FIELDS).first()
+    if row is None:
+        return None
+    data = _serialize(row, _departments(user_id))
+    cache.set(key, data, settings.PRINCIPAL_CACHE_TIMEOUT)
+    return data
+
+
+async def aget_principal_data(user_id):
+    key = _key(user_id)
+    data = await cache.aget(key)
+    if data is not None:
+        stats.hits += 1
+        return data
+    stats.misses += 1
+    row = await User.objects.filter(pk=user_id).values(*PRINCIPAL_FIELDS).afirst()
+    if row is None:
+        return None
+    data = _serialize(row, [pk async for pk in _departments(user_id)])
+    await cache.aset(key, data, settings.PRINCIPAL_CACHE_TIMEOUT)
+    return data
+
+
+def get_principal(user_id):
+    data = get_principal_data(user_id)
+    return None if data is None else build_principal(data)
+
+
+async def aget_principal(user_id):
+    data = await aget_principal_data(user_id)
+    return None if data is None else build_principal(data)
+
+
+def invalidate_principals(*user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
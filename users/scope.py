@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Invalidated by users.signals deleting the key, which only reaches other
+# processes through a shared cache (see users.checks).
+CACHE_KEY = "users:department_ids:{}"
+
+
+def _cache_key(user_id):
+    return CACHE_KEY.format(user_id)
+
+
+def get_department_ids(user):
+    """
+    Department IDs the user belongs to, as a frozenset.
+
+    Resolved at most once per request (memoized on the user instance) and
+    shared across requests through the cache until membership changes.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    department_ids = getattr(user, "_department_ids", None)
+    if department_ids is not None:
+        return department_ids
+
+    key = _cache_key(user.pk)
+    department_ids = cache.get(key)
+    if department_ids is None:
+        department_ids = frozenset(user.departments.values_list("id", flat=True))
+        cache.set(key, department_ids, settings.DEPARTMENT_SCOPE_CACHE_TIMEOUT)
+    user._department_ids = department_ids
+    return department_ids
+
+
+async def aget_department_ids(user):
+    """Async counterpart of get_department_ids(), sharing its memo and cache."""
+    if not user.is_authenticated:
+        return frozenset()
+    department_ids = getattr(user, "_department_ids", None)
+    if department_ids is not None:
+        return department_ids
+
+    key = _cache_key(user.pk)
+    department_ids = await cache.aget(key)
+    if department_ids is None:
+        department_ids = frozenset(
+            [pk async for pk in user.departments.values_list("id", flat=True)]
+        )
+        await cache.aset(key, department_ids, settings.DEPARTMENT_SCOPE_CACHE_TIMEOUT)
+    user._department_ids = department_ids
+    return department_ids
+
+
+def invalidate_department_ids(*user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
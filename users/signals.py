@@ -0,0 +1,82 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .authz import invalidate_all_permissions, invalidate_user_permissions
+from .models import Department, Permission, Role, User
+from .principal import invalidate_principals
+from .scope import invalidate_department_ids
+
+
+@receiver(m2m_changed, sender=User.departments.through)
+def department_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached department scopes when User.departments changes."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        # user.departments.add/remove/set/clear
+        instance.__dict__.pop("_department_ids", None)
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        # department.users.clear()
+        user_ids = list(instance.users.values_list("id", flat=True))
+    else:
+        # department.users.add/remove
+        user_ids = list(pk_set)
+    invalidate_department_ids(*user_ids)
+    invalidate_principals(*user_ids)
+
+
+@receiver(pre_delete, sender=Department)
+def department_deleted(sender, instance, **kwargs):
+    # Cascade deletes of the through rows don't send m2m_changed.
+    user_ids = list(instance.users.values_list("id", flat=True))
+    invalidate_department_ids(*user_ids)
+    invalidate_principals(*user_ids)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Drop the cached principal (users.principal) request.user is built
+    # from: is_active, is_sys_admin, role, ... may have changed.
+    invalidate_principals(instance.pk)
+
+
+# ----------------------
+# Effective permission cache (users.authz)
+# ----------------------
+
+
+@receiver(m2m_changed, sender=User.departments.through)
+def user_grants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        instance.__dict__.pop("_all_permissions", None)
+        invalidate_user_permissions(instance.pk)
+    else:
+        # Reverse clear doesn't say which users were affected.
+        invalidate_all_permissions()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # User.role may have changed.
+    if not created:
+        instance.__dict__.pop("_all_permissions", None)
+        invalidate_user_permissions(instance.pk)
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(m2m_changed, sender=Department.roles.through)
+def role_grants_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_all_permissions()
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_delete, sender=Role)
+@receiver(post_delete, sender=Department)
+def grant_definitions_changed(sender, **kwargs):
+    invalidate_all_permissions()
@@ -1,3 +1,266 @@
-from django.test import TestCase
+import base64
+import json
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from partners.models import Partner, PartnerDocument
+
+from .authentication import JWTAuthentication, token_cache
+from .authz import get_cached_permissions
+from .authz import stats as permission_stats
+from .checks import PROCESS_LOCAL_CACHES, check_shared_cache
+from .models import Department, Permission, Role, User
+from .scope import get_department_ids
+from .tokens import PRINCIPAL_CLAIM, RefreshToken
+
+
+class DepartmentScopeTests(TestCase):
+    def setUp(self):
+        # The scope cache outlives the rolled-back rows.
+        cache.clear()
+        self.ours = Department.objects.create(name="Ours")
+        self.theirs = Department.objects.create(name="Theirs")
+        self.user = User.objects.create_user("member", "member@example.com", "pw")
+        self.user.departments.add(self.ours)
+        self.partner = Partner.objects.create(name="Visible", type="NGO")
+        self.partner.departments.add(self.ours)
+        self.other = Partner.objects.create(name="Hidden", type="NGO")
+        self.other.departments.add(self.theirs)
+
+    def get(self, url):
+        client = APIClient()
+        # A fresh instance per request, as authentication would load.
+        client.force_authenticate(User.objects.get(pk=self.user.pk))
+        return client.get(url)
+
+    def test_lists_only_own_departments_partners(self):
+        names = [p["name"] for p in self.get("/api/partners/").data["results"]]
+        self.assertEqual(names, ["Visible"])
+
+    def test_other_departments_objects_are_hidden(self):
+        self.assertEqual(self.get(f"/api/partners/{self.partner.pk}/").status_code, 200)
+        self.assertEqual(self.get(f"/api/partners/{self.other.pk}/").status_code, 404)
+        document = PartnerDocument.objects.create(
+            partner=self.other, file_type="pdf", file_url="https://example.org/a.pdf"
+        )
+        self.assertEqual(self.get(f"/api/documents/{document.pk}/").status_code, 404)
+
+    def test_scope_follows_membership_changes(self):
+        url = f"/api/partners/{self.other.pk}/"
+        self.assertEqual(self.get(url).status_code, 404)
+        self.theirs.users.add(self.user)
+        self.assertEqual(self.get(url).status_code, 200)
+        self.user.departments.remove(self.theirs)
+        self.assertEqual(self.get(url).status_code, 404)
+        self.user.departments.set([self.theirs])
+        self.assertEqual(self.get(url).status_code, 200)
+        self.theirs.delete()
+        self.assertEqual(get_department_ids(User.objects.get(pk=self.user.pk)), set())
+
+    def test_scope_is_resolved_once_per_request(self):
+        user = User.objects.get(pk=self.user.pk)
+        cache.clear()
+        with self.assertNumQueries(1):
+            get_department_ids(user)
+            get_department_ids(user)
+        # Later requests share it through the cache.
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            get_department_ids(user)
+
+
+class AuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user("member", "member@example.com", "pw")
+
+    def token(self, user=None):
+        return RefreshToken.for_user(user or self.user).access_token
+
+    def authenticate(self, token):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        user, _ = JWTAuthentication().authenticate(request)
+        return user
+
+    def test_cached_token_needs_no_query(self):
+        token = str(self.token())
+        self.authenticate(token)
+        hits = token_cache.stats.hits
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(token).pk, self.user.pk)
+        self.assertEqual(token_cache.stats.hits, hits + 1)
+
+    def test_expired_token_is_rejected_after_caching(self):
+        token = self.token()
+        token.set_exp(lifetime=timedelta(seconds=1))
+        token = str(token)
+        self.authenticate(token)
+        time.sleep(max(0, AccessToken(token)["exp"] - time.time()) + 0.1)
+        with self.assertRaises(InvalidToken):
+            self.authenticate(token)
+
+    def test_deactivated_user_is_rejected_after_caching(self):
+        token = str(self.token())
+        self.authenticate(token)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_password_change_revokes_a_cached_token(self):
+        # simplejwt modules hold their api_settings from import time.
+        with mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True):
+            token = str(self.token())
+            self.authenticate(token)
+            self.user.set_password("new")
+            self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate(token)
+
+    def test_changes_after_login_reach_the_next_request(self):
+        response = APIClient().post(
+            "/api/token/", {"username": "member", "password": "pw"}
+        )
+        token = response.data["access"]
+        user = self.authenticate(token)
+        self.assertEqual((user.role_id, user._department_ids), (None, frozenset()))
+
+        department = Department.objects.create(name="Ours")
+        self.user.departments.add(department)
+        role = Role.objects.create(name="Manager", level="manager")
+        self.user.role = role
+        self.user.save()
+        user = self.authenticate(token)
+        self.assertEqual(user.role_id, role.pk)
+        self.assertEqual(user._department_ids, {department.pk})
+
+        department.delete()
+        self.assertEqual(self.authenticate(token)._department_ids, frozenset())
+
+    @override_settings(JWT_EMBED_PRINCIPAL=True)
+    def test_tampered_principal_claim_is_refused(self):
+        token = str(self.token())
+        self.assertFalse(self.authenticate(token).is_sys_admin)
+        header, payload, signature = token.split(".")
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        claims[PRINCIPAL_CLAIM]["is_sys_admin"] = True
+        payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+        with self.assertRaises(InvalidToken):
+            self.authenticate(f"{header}.{payload.decode()}.{signature}")
+
+    @override_settings(JWT_EMBED_PRINCIPAL=True)
+    def test_principal_claim_of_another_user_is_ignored(self):
+        admin = User.objects.create_user(
+            "admin", "admin@example.com", "pw", is_sys_admin=True
+        )
+        token = self.token()
+        token[PRINCIPAL_CLAIM] = self.token(admin)[PRINCIPAL_CLAIM]
+        user = self.authenticate(str(token))
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertFalse(user.is_sys_admin)
+
+
+class PermissionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = Permission.objects.create(name="view")
+        self.edit = Permission.objects.create(name="edit")
+        self.role = Role.objects.create(name="Viewer")
+        self.role.permissions.add(self.view)
+        self.user = User.objects.create_user(
+            "member", "member@example.com", "pw", role=self.role
+        )
+
+    def permissions(self):
+        # A fresh instance per call, as each request would load.
+        return get_cached_permissions(User.objects.get(pk=self.user.pk))
+
+    def test_resolved_once_per_request_then_cached(self):
+        user = User.objects.get(pk=self.user.pk)
+        before = permission_stats.as_dict()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_cached_permissions(user), {"view"})
+            self.assertEqual(user.get_all_permissions(), {"view"})
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_permissions(user), {"view"})
+        after = permission_stats.as_dict()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["memo_hits"] - before["memo_hits"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_direct_user_permissions_are_not_granted(self):
+        self.user.permissions.add(self.edit)
+        self.assertEqual(self.permissions(), {"view"})
+
+    def test_role_permission_changes(self):
+        self.assertEqual(self.permissions(), {"view"})
+        self.role.permissions.add(self.edit)
+        self.assertEqual(self.permissions(), {"view", "edit"})
+        self.role.permissions.remove(self.view)
+        self.assertEqual(self.permissions(), {"edit"})
+        self.role.permissions.clear()
+        self.assertEqual(self.permissions(), set())
+
+    def test_user_role_change(self):
+        editor = Role.objects.create(name="Editor")
+        editor.permissions.add(self.edit)
+        self.assertEqual(self.permissions(), {"view"})
+        self.user.role = editor
+        self.user.save()
+        self.assertEqual(self.permissions(), {"edit"})
+        editor.delete()
+        self.assertEqual(self.permissions(), set())
+
+    def test_department_role_changes(self):
+        editor = Role.objects.create(name="Editor")
+        editor.permissions.add(self.edit)
+        department = Department.objects.create(name="Ours")
+        department.roles.add(editor)
+        self.assertEqual(self.permissions(), {"view"})
+        self.user.departments.add(department)
+        self.assertEqual(self.permissions(), {"view", "edit"})
+        department.roles.remove(editor)
+        self.assertEqual(self.permissions(), {"view"})
+        department.roles.add(editor)
+        self.assertEqual(self.permissions(), {"view", "edit"})
+        department.delete()
+        self.assertEqual(self.permissions(), {"view"})
+
+    def test_permission_rename_and_delete(self):
+        self.assertEqual(self.permissions(), {"view"})
+        self.view.name = "read"
+        self.view.save()
+        self.assertEqual(self.permissions(), {"read"})
+        self.view.delete()
+        self.assertEqual(self.permissions(), set())
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(DEBUG=False)
+    def test_process_local_cache_is_an_error_outside_debug(self):
+        locmem = {"default": {"BACKEND": PROCESS_LOCAL_CACHES[0]}}
+        redis = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://cache:6379",
+            }
+        }
+        with override_settings(CACHES=locmem):
+            errors = check_shared_cache(None)
+        self.assertEqual([e.id for e in errors], ["users.E001"])
+        with override_settings(CACHES=redis):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES=locmem, DEBUG=True):
+            self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,37 @@
+from django.conf import settings
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.settings import api_settings
+
+from .principal import get_principal_data
+
+# Access-token claim carrying the principal (users.principal) when
+# settings.JWT_EMBED_PRINCIPAL is on.
+PRINCIPAL_CLAIM = "principal"
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token whose access tokens embed the user's principal data, so
+    users.authentication can authenticate them without even a cache lookup.
+
+    The claim is taken fresh from the principal cache each time an access
+    token is issued (on login and on refresh), so it is at most one access
+    token lifetime old.
+    """
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        if settings.JWT_EMBED_PRINCIPAL:
+            data = get_principal_data(self[api_settings.USER_ID_CLAIM])
+            if data is not None:
+                access[PRINCIPAL_CLAIM] = data
+        return access
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
@@ -14,20 +14,25 @@ from .permissions import IsSysAdminOrSelf
 from users import permissions
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from .authentication import JWTAuthentication
+from strategybackend.prefetch import PrefetchPlannerMixin
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsSysAdminOrSelf]
-    authentication_classes = [JWTAuthentication]  # Add this line
+    authentication_classes = [JWTAuthentication]
 
     def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation (manage.py generate_schema) has no request.
+            return queryset.none()
         user = self.request.user
         if user.is_sys_admin:
-            return User.objects.all()
-        return User.objects.filter(id=user.id)
+            return queryset
+        return queryset.filter(id=user.id)
 
     def destroy(self, request, *args, **kwargs):
         user = self.get_object()
@@ -38,7 +43,7 @@ class UserViewSet(viewsets.ModelViewSet):
         )
 
 
-class AdminCreateViewSet(viewsets.ModelViewSet):
+class AdminCreateViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     # permission_classes = [IsAuthenticated]
@@ -60,9 +65,10 @@ class AdminCreateViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
+    ordering = ["name"]
     permission_classes = [IsSysAdminOrSelf]
 
     def get_permissions(self):
@@ -71,9 +77,10 @@ class RoleViewSet(viewsets.ModelViewSet):
         return [permissions.IsSysAdminOrSelf()]
 
 
-class PermissionViewSet(viewsets.ModelViewSet):
+class PermissionViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = Permission.objects.all()
     serializer_class = PermissionSerializer
+    ordering = ["name"]
     permission_classes = [IsSysAdminOrSelf]
 
     def get_permissions(self):
@@ -82,9 +89,10 @@ class PermissionViewSet(viewsets.ModelViewSet):
         return [permissions.IsSysAdminOrSelf()]
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(PrefetchPlannerMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    ordering = ["name"]
     permission_classes = [IsAuthenticated, IsSysAdminOrSelf]
 
     def get_permissions(self):